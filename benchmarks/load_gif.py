@@ -0,0 +1,132 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Compare the throughput of the old and new GIF-to-PygAnimation
+conversion used by :func:`hypatia.util.load_gif`.
+
+The old conversion copied each frame out of PIL with ``tostring()``
+(``tobytes()`` here, because ``tostring()`` no longer exists) and
+copied it again with ``pygame.image.fromstring()``. The new one
+shares the buffer with ``pygame.image.frombuffer()`` and shares
+repeated frames.
+
+Run from the project root:
+
+    $ python benchmarks/load_gif.py
+
+"""
+
+import os
+import sys
+import timeit
+import zipfile
+from io import BytesIO
+
+import pygame
+import pyganim
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import util
+
+
+RESOURCES = os.path.join(os.path.dirname(__file__), '..', 'demo',
+                         'resources', 'walkabouts')
+REPEAT = 5
+NUMBER = 20
+
+
+def old_load_gif(path_or_bytesio):
+    """The conversion load_gif() used to do."""
+
+    pil_gif = Image.open(path_or_bytesio)
+    frames = []
+
+    try:
+
+        while 1:
+            duration = pil_gif.info['duration'] / 1000.0
+            image_as_string = pil_gif.convert('RGBA').tobytes()
+            frame = pygame.image.fromstring(image_as_string,
+                                            pil_gif.size,
+                                            'RGBA')
+            frames.append((frame, duration))
+            pil_gif.seek(pil_gif.tell() + 1)
+
+    except EOFError:
+
+        pass  # end of sequence
+
+    gif = pyganim.PygAnimation(frames)
+    gif.anchor(pyganim.CENTER)
+
+    return gif
+
+
+def sample_gifs():
+    """Every GIF in the demo's walkabout resources."""
+
+    gifs = []
+
+    for zip_name in sorted(os.listdir(RESOURCES)):
+
+        with zipfile.ZipFile(os.path.join(RESOURCES, zip_name)) as zip_file:
+
+            for file_name in zip_file.namelist():
+
+                if file_name.endswith('.gif'):
+                    gifs.append(zip_file.read(file_name))
+
+    return gifs
+
+
+def synthetic_gif(size=(256, 256), frame_count=16):
+    """A larger GIF than any of the demo's, where the cost of
+    copying frame buffers dominates.
+
+    """
+
+    frames = []
+
+    for frame_index in range(frame_count):
+        frame = Image.new('P', size)
+        frame.putdata([(x + frame_index) % 256
+                       for x in range(size[0] * size[1])])
+        frames.append(frame)
+
+    gif_file = BytesIO()
+    frames[0].save(gif_file, 'GIF', save_all=True,
+                   append_images=frames[1:], duration=40)
+
+    return gif_file.getvalue()
+
+
+def gifs_per_second(load_function, gifs):
+    """Best-of-REPEAT throughput of load_function over gifs."""
+
+    def load_all():
+
+        for gif in gifs:
+            load_function(BytesIO(gif))
+
+    best = min(timeit.repeat(load_all, repeat=REPEAT, number=NUMBER))
+
+    return len(gifs) * NUMBER / best
+
+
+def main():
+    workloads = (('demo walkabouts', sample_gifs()),
+                 ('256x256, 16 frames', [synthetic_gif()]))
+
+    for workload_name, gifs in workloads:
+        old = gifs_per_second(old_load_gif, gifs)
+        new = gifs_per_second(util.load_gif, gifs)
+        print(workload_name)
+        print('  old load_gif: %10.1f GIFs/s' % old)
+        print('  new load_gif: %10.1f GIFs/s' % new)
+        print('  speedup:      %10.2fx' % (new / old))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Time :func:`hypatia.physics.move_actors` moving many roaming
+actors at once on a map with walls, against moving each actor on
+its own, one collision check per rect, like
+:meth:`hypatia.player.HumanPlayer.move` does.
+
+Run from the project root:
+
+    $ python benchmarks/move_actors.py
+
+"""
+
+import os
+import sys
+import random
+import timeit
+
+import numpy
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import physics
+
+
+TILE_SIZE = (16, 16)
+MAP_TILES = (200, 200)
+ACTOR_COUNTS = (100, 1000, 5000)
+SECONDS = 1 / 60.0
+REPEAT = 5
+
+
+def roaming_actors(count):
+    """A store of count actors with random velocities spread over a
+    map with a wall on every fifth row.
+
+    """
+
+    random.seed(0)
+    impassability = numpy.zeros(MAP_TILES[::-1], dtype=bool)
+    impassability[::5, :] = True
+    table = physics.summed_area_table(impassability)
+    store = physics.ActorStore()
+    open_rows = [y for y in range(MAP_TILES[1]) if y % 5]
+
+    for __ in range(count):
+        position = (random.randrange(MAP_TILES[0]) * TILE_SIZE[0],
+                    random.choice(open_rows) * TILE_SIZE[1])
+        velocity = (random.uniform(-40, 40), random.uniform(-40, 40))
+        store.add(position, (6, 8), velocity=velocity)
+
+    slots = store.slots()
+    store.solid[slots] = True
+    walls = [pygame.Rect(x * TILE_SIZE[0], y * TILE_SIZE[1], *TILE_SIZE)
+             for y, x in zip(*numpy.nonzero(impassability))]
+
+    return store, slots, table, walls
+
+
+def move_one_at_a_time(store, slots, walls):
+    """Move each actor on its own, checking its new rect against the
+    walls and every other actor.
+
+    """
+
+    for slot in slots:
+        x, y = store.positions[slot] + store.velocities[slot] * SECONDS
+        rect = pygame.Rect((x, y), store.sizes[slot])
+        others = [pygame.Rect(store.positions[other], store.sizes[other])
+                  for other in slots if other != slot]
+
+        if rect.collidelist(walls) == -1 and rect.collidelist(others) == -1:
+            store.positions[slot] = (x, y)
+
+
+def main():
+
+    for count in ACTOR_COUNTS:
+        store, slots, table, walls = roaming_actors(count)
+        batched = min(timeit.repeat(
+            lambda: physics.move_actors(store, slots, SECONDS, table,
+                                        TILE_SIZE),
+            repeat=REPEAT, number=1,
+        ))
+        print('%5d actors' % count)
+        print('  move_actors():     %8.2f ms/tick' % (batched * 1000))
+
+        # one at a time is quadratic; only time the smaller counts
+        if count <= 1000:
+            one_at_a_time = min(timeit.repeat(
+                lambda: move_one_at_a_time(store, slots, walls),
+                repeat=1, number=1,
+            ))
+            print('  one at a time:     %8.2f ms/tick' %
+                  (one_at_a_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
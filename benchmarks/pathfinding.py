@@ -0,0 +1,111 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Time :class:`hypatia.pathfinding.Pathfinder` answering path
+requests between random tiles of a map with scattered walls: searched
+from scratch, from its cache, and from its cache while tiles are
+being edited. Then time a crowd heading for one goal finding its way
+with a :class:`hypatia.pathfinding.FlowField`, against searching a
+path for each of them.
+
+Run from the project root:
+
+    $ python benchmarks/pathfinding.py
+
+"""
+
+import os
+import sys
+import random
+import timeit
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import tiles
+from hypatia import pathfinding
+
+
+DEMO = os.path.join(os.path.dirname(__file__), '..', 'demo')
+MAP_TILES = (64, 64)
+WALL_CHANCE = 0.25
+REQUESTS = 200
+CROWD = 200
+
+# passable and impassable tiles of the debug tilesheet
+FLOOR = 11
+WALL = 99
+
+
+def walled_tilemap():
+    """A tilemap of MAP_TILES with about WALL_CHANCE of its tiles
+    being walls.
+
+    """
+
+    random_state = numpy.random.RandomState(0)
+    walls = random_state.rand(MAP_TILES[1], MAP_TILES[0]) < WALL_CHANCE
+    tile_ids = numpy.where(walls, WALL, FLOOR).tolist()
+
+    return tiles.TileMap('debug', [tile_ids])
+
+
+def main():
+    os.chdir(DEMO)
+    random.seed(0)
+    tilemap = walled_tilemap()
+    open_tiles = [(x, y) for y, x in
+                  zip(*numpy.nonzero(~tilemap.impassability))]
+    requests = [tuple(random.sample(open_tiles, 2))
+                for __ in range(REQUESTS)]
+
+    def request_all(pathfinder):
+
+        for start, goal in requests:
+            pathfinder.find_path(start, goal)
+
+    pathfinder = pathfinding.Pathfinder(tilemap)
+    searched = timeit.timeit(lambda: request_all(pathfinder), number=1)
+    cached = timeit.timeit(lambda: request_all(pathfinder), number=1)
+
+    # one tile edit between each round of requests
+    coords = [(x, y) for y in range(MAP_TILES[1])
+              for x in range(MAP_TILES[0])]
+
+    def edit_and_request_all():
+        tilemap.set_tile(random.choice(coords), 0,
+                         random.choice((FLOOR, WALL)))
+        request_all(pathfinder)
+
+    pathfinder.hits = pathfinder.misses = 0
+    editing = timeit.timeit(edit_and_request_all, number=10) / 10
+
+    print('%d requests on a %dx%d map' % ((REQUESTS,) + MAP_TILES))
+    print('  searched:        %8.3f ms/request' %
+          (searched * 1000 / REQUESTS))
+    print('  cached:          %8.3f ms/request' % (cached * 1000 / REQUESTS))
+    print('  while editing:   %8.3f ms/request (%d%% from the cache)' %
+          (editing * 1000 / REQUESTS,
+           100 * pathfinder.hits / (pathfinder.hits + pathfinder.misses)))
+
+    # everyone heads for the same goal
+    goal = open_tiles[0]
+    crowd = random.sample(open_tiles, CROWD)
+    blocked = tilemap.impassability.ravel().tolist()
+    per_actor = timeit.timeit(
+        lambda: [pathfinding.search(blocked, MAP_TILES[0], MAP_TILES[1],
+                                    start, goal) for start in crowd],
+        number=1,
+    )
+    shared = min(timeit.repeat(
+        lambda: pathfinding.FlowField(tilemap, goal).release(),
+        repeat=5, number=1,
+    ))
+    print('%d actors heading for one goal' % CROWD)
+    print('  a path each:     %8.2f ms' % (per_actor * 1000))
+    print('  one flow field:  %8.2f ms' % (shared * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Report how much blit time :func:`hypatia.render.prepare_surface`
+saves on the demo scene's surfaces: its tile layers, animated tile
+frames and walkabout frames.
+
+Each surface is timed blitting onto a display-format surface as
+loaded, then prepared without RLE acceleration, then prepared with
+it. Times are totals over every surface of a kind.
+
+Run from the project root:
+
+    $ python benchmarks/prepare_surfaces.py
+
+"""
+
+import os
+import sys
+import collections
+
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import game
+from hypatia import render
+
+
+DEMO = os.path.join(os.path.dirname(__file__), '..', 'demo')
+VIEWPORT_SIZE = (256, 240)
+REPEAT = 200
+
+
+def scene_surfaces(scene):
+    """(description, surface) of every surface the demo scene
+    draws each frame.
+
+    """
+
+    surfaces = [('tile layer', layer)
+                for layer in scene.tilemap.layer_images]
+
+    for animation in scene.tilemap.tilesheet.animated_tiles.values():
+        surfaces.extend(('animated tile', frame)
+                        for frame in animation._images)
+
+    walkabouts = ([scene.human_player.walkabout] +
+                  scene.human_player.walkabout.child_walkabouts +
+                  [npc.walkabout for npc in scene.npcs])
+
+    for walkabout in walkabouts:
+
+        for directions in walkabout.animations.values():
+
+            for animation in directions.values():
+                surfaces.extend(('walkabout frame', frame)
+                                for frame in animation._images)
+
+    return surfaces
+
+
+def main():
+    os.chdir(DEMO)
+    pygame.init()
+    pygame.display.set_mode(VIEWPORT_SIZE)
+    target = pygame.Surface(VIEWPORT_SIZE).convert()
+    scene = game.Scene.from_tmx_resource('debug')
+
+    # kind -> [count, as loaded, prepared, prepared with RLE]
+    totals = collections.OrderedDict()
+
+    for description, surface in scene_surfaces(scene):
+        key = (description, render.classify_surface(surface))
+        total = totals.setdefault(key, [0, 0.0, 0.0, 0.0])
+        total[0] += 1
+        total[1] += render.time_blits(surface, target, REPEAT)
+        total[2] += render.time_blits(render.prepare_surface(surface, False),
+                                      target, REPEAT)
+        total[3] += render.time_blits(render.prepare_surface(surface),
+                                      target, REPEAT)
+
+    print('%-32s %5s %10s %10s %10s' % ('surface (kind)', 'count',
+                                        'loaded', 'prepared', 'with RLE'))
+
+    for (description, kind), total in totals.items():
+        count, loaded, prepared, prepared_rle = total
+        print('%-32s %5d %8.1fus %8.1fus %8.1fus' %
+              ('%s (%s)' % (description, kind), count, loaded * 1e6,
+               prepared * 1e6, prepared_rle * 1e6))
+
+    loaded, prepared_rle = (sum(total[1] for total in totals.values()),
+                            sum(total[3] for total in totals.values()))
+    print('total saved: %.1fus per blit of each (%.2fx faster)' %
+          ((loaded - prepared_rle) * 1e6, loaded / prepared_rle))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Time the frames of walking across a large map with
+:class:`hypatia.streaming.WorldStreamer` loading regions in the
+background, against materializing each region on the frame it
+comes into view.
+
+Run from the project root:
+
+    $ python benchmarks/streaming.py
+
+"""
+
+import os
+import sys
+import time
+
+import numpy
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import streaming
+
+
+MAP_TILES = (1024, 64)
+CHUNK_SIZE = (16, 16)
+VIEWPORT_SIZE = (320, 240)
+SPEED = 240
+SECONDS = 1 / 60.0
+FRAMES = 600
+
+
+def walk(update):
+    """Walk the viewport east, calling update(rect, velocity) every
+    frame and pacing frames to SECONDS. Returns each frame's time.
+
+    """
+
+    rect = pygame.Rect((0, 256), VIEWPORT_SIZE)
+    frame_times = []
+
+    for frame in range(FRAMES):
+        rect.left = int(frame * SPEED * SECONDS)
+        started = time.time()
+        update(rect, (SPEED, 0))
+        elapsed = time.time() - started
+        frame_times.append(elapsed)
+        time.sleep(max(SECONDS - elapsed, 0))
+
+    return frame_times
+
+
+def report(name, frame_times):
+    frame_times = numpy.array(frame_times) * 1000
+    print('%s' % name)
+    print('  mean %6.2f ms   worst %6.2f ms   frames over %.1f ms: %d' %
+          (frame_times.mean(), frame_times.max(), SECONDS * 1000,
+           (frame_times > SECONDS * 1000).sum()))
+
+
+def main():
+    os.chdir(os.path.join(os.path.dirname(__file__), '..', 'demo'))
+    numpy.random.seed(0)
+    tile_ids = numpy.where(numpy.random.random((1,) + MAP_TILES[::-1]) <
+                           0.1, 99, 11).astype(numpy.int16)
+    source = streaming.TileArrayChunks('debug', tile_ids, CHUNK_SIZE)
+
+    loaded = {}
+
+    def load_in_view(rect, velocity):
+
+        for chunk_coord in source.chunks_in_rect(rect):
+
+            if chunk_coord not in loaded:
+                loaded[chunk_coord] = source.materialize(chunk_coord)
+
+    report('on the frame a region comes into view', walk(load_in_view))
+
+    streamer = streaming.WorldStreamer(source)
+    streamer.update(pygame.Rect((0, 256), VIEWPORT_SIZE))
+    streamer.wait()
+    report('WorldStreamer', walk(streamer.update))
+    streamer.stop()
+
+
+if __name__ == '__main__':
+    main()
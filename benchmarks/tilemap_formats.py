@@ -0,0 +1,140 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Compare the size of a large map as tilemap.txt and tilemap.bin
+(:class:`hypatia.tiles.BinaryTilemap`), and the time it takes to
+read its tile IDs from each, without stitching a TileMap.
+
+Also compares reading and writing tilemap.txt a tile ID at a time,
+like TileMap.from_string() and TileMap.to_string() used to, against
+:func:`hypatia.tiles.read_tilemap_text` and
+:func:`hypatia.tiles.write_tilemap_text`.
+
+Run from the project root:
+
+    $ python benchmarks/tilemap_formats.py
+
+"""
+
+import os
+import sys
+import timeit
+import tempfile
+
+import numpy
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hypatia import tiles
+
+
+MAP_TILES = (512, 512, 3)
+REPEAT = 3
+
+
+def large_map():
+    """Random tile IDs from the debug tilesheet, as tilemap.txt and
+    the planes of tilemap.bin.
+
+    """
+
+    numpy.random.seed(0)
+    width, height, depth = MAP_TILES
+    tile_ids = numpy.random.randint(-1, 120, (depth, height, width))
+    tile_ids = tile_ids.astype(numpy.int16)
+    map_string = 'debug\n' + '\n\n'.join(
+        '\n'.join(' '.join('%03d' % tile_id for tile_id in row)
+                  for row in layer)
+        for layer in tile_ids.tolist()
+    )
+    planes = {
+              'tile_ids': tile_ids,
+              'impassability': tile_ids[0] == 99,
+              'opacity': tile_ids[0] < 8,
+             }
+
+    return map_string, tiles.BinaryTilemap('debug', planes)
+
+
+def read_text(map_string):
+    """Parse tile IDs the way TileMap.from_string() used to."""
+
+    tilesheet_name, layers_string = map_string.split('\n', 1)
+
+    return [[[int(tile_id) for tile_id in row.split(' ')]
+             for row in layer_string.split('\n')]
+            for layer_string in layers_string.strip('\n').split('\n\n')]
+
+
+def write_text(tile_ids):
+    """Format tile IDs the way TileMap.to_string() used to."""
+
+    return 'debug\n' + '\n\n'.join(
+        '\n'.join(' '.join('%02d' % tile_id for tile_id in row)
+                  for row in layer)
+        for layer in tile_ids
+    )
+
+
+def read_text_file(path):
+
+    with open(path) as text_file:
+
+        return tiles.read_tilemap_text(text_file)
+
+
+def write_text_file(path, tile_ids):
+
+    with open(path, 'w') as text_file:
+        tiles.write_tilemap_text(text_file, 'debug', tile_ids, 2)
+
+
+def main():
+    map_string, binary = large_map()
+    tile_ids = binary.planes['tile_ids']
+    tile_id_lists = tile_ids.tolist()
+    compressed = binary.to_bytes()
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'tilemap.bin')
+    text_path = os.path.join(directory, 'tilemap.txt')
+    write_text_file(text_path, tile_ids)
+
+    with open(path, 'wb') as binary_file:
+        binary_file.write(binary.to_bytes(compress=False))
+
+    print('%dx%dx%d tiles' % MAP_TILES)
+    print('  tilemap.txt:                 %8d bytes' % len(map_string))
+    print('  tilemap.bin, compressed:     %8d bytes' % len(compressed))
+    print('  tilemap.bin, uncompressed:   %8d bytes' %
+          os.path.getsize(path))
+
+    timings = (
+               ('tilemap.txt', lambda: read_text(map_string)),
+               ('tilemap.txt, streaming', lambda: read_text_file(text_path)),
+               ('tilemap.bin, compressed',
+                lambda: tiles.BinaryTilemap.read(compressed)),
+               ('tilemap.bin, memory-mapped',
+                lambda: tiles.BinaryTilemap.read(path)),
+              )
+
+    for name, read in timings:
+        seconds = min(timeit.repeat(read, repeat=REPEAT, number=1))
+        print('  read %-26s %8.2f ms' % (name + ':', seconds * 1000))
+
+    timings = (
+               ('tilemap.txt', lambda: write_text(tile_id_lists)),
+               ('tilemap.txt, streaming',
+                lambda: write_text_file(text_path, tile_ids)),
+              )
+
+    for name, write in timings:
+        seconds = min(timeit.repeat(write, repeat=REPEAT, number=1))
+        print('  write %-25s %8.2f ms' % (name + ':', seconds * 1000))
+
+    os.remove(path)
+    os.remove(text_path)
+    os.rmdir(directory)
+
+
+if __name__ == '__main__':
+    main()
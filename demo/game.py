@@ -32,7 +32,7 @@ VIEWPORT_X, VIEWPORT_Y = 256, 240
 
 # init
 viewport_size = (VIEWPORT_X, VIEWPORT_Y)
-scene = game.Scene.from_tmx_resource('debug')
+scene = game.Scene.from_tmx_resource_async('debug')
 game = game.Game(scene=scene, viewport_size=viewport_size)
 game.start_loop()
 
@@ -53,6 +53,7 @@ class Actor(object):
     Attributes:
         walkabout (animations.Walkabout): --
         direction (constants.Direction): --
+        velocity (physics.Velocity): --
 
     See Also:
         :mod:`actor`
@@ -77,6 +78,36 @@ class Actor(object):
         self.say_text = say_text
         self.velocity = velocity or physics.Velocity()
 
+        if walkabout is not None:
+            walkabout.store.solid[walkabout.slot] = True
+
+    @property
+    def velocity(self):
+        """An instance of :class:`physics.Velocity`
+
+        If this actor has a walkabout, the velocity is kept in the
+        walkabout's :class:`physics.ActorStore` slot, alongside its
+        position, and this is a :class:`physics.StoredVelocity` view
+        of it. Setting this copies the new velocity into the slot.
+
+        """
+
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, velocity):
+
+        if self.walkabout is None:
+            self._velocity = velocity
+
+            return None
+
+        stored_velocity = physics.StoredVelocity(self.walkabout.store,
+                                                 self.walkabout.slot)
+        stored_velocity.x = velocity.x
+        stored_velocity.y = velocity.y
+        self._velocity = stored_velocity
+
     @property
     def direction(self):
         """An instance of :class:`constants.Direction`
@@ -167,7 +198,7 @@ class Actor(object):
 
             return False
 
-    def talk(self, npcs, dialogbox):
+    def talk(self, scene, dialogbox):
         """Trigger another actor's :meth:`actor.Actor.say()` if
         they are immediately *in front* of this actor.
 
@@ -175,34 +206,18 @@ class Actor(object):
             * :attribute:`animations.Walkabout.direction`
             * :attribute:`Actor.direction`
             * :meth:`actor.Actor.say()`
+            * :meth:`game.Scene.actors_in_front()`
 
         Args:
-            npcs (List[player.Npc]): NPCs to check for
-                collisions immediately in front of this
-                actor.
+            scene (game.Scene): The scene whose actors to check
+                for immediately in front of this actor.
             dialogbox (dialog.DialogBox): The dialogbox which
                 another actor will print to if they have
                 something to say.
 
         """
 
-        # get the current direction, check a bit in front with a rect
-        # to talk to npc if collide
         facing = self.walkabout.direction
 
-        if facing is constants.Direction.north:
-            disposition = (0, -1)
-        elif facing is constants.Direction.east:
-            disposition = (1, 0)
-        elif facing is constants.Direction.south:
-            disposition = (0, 1)
-        elif facing is constants.Direction.west:
-            disposition = (-1, 0)
-
-        talk_rect = self.walkabout.rect.copy()
-        talk_rect.move_ip(disposition)
-
-        for npc in npcs:
-
-            if npc.walkabout.rect.colliderect(talk_rect):
-                npc.say(facing, dialogbox)
+        for other in scene.actors_in_front(self):
+            other.say(facing, dialogbox)
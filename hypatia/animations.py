@@ -35,23 +35,37 @@ See Also:
 import os
 import copy
 import glob
+import shutil
+import zipfile
 import itertools
 import collections
+from io import BytesIO
 
 try:
     import ConfigParser as configparser
+    from cStringIO import StringIO
 except ImportError:
     import configparser
+    from io import StringIO
 
+import numpy
 import pygame
 import pyganim
 from PIL import Image
 
 from hypatia import util
 from hypatia import render
+from hypatia import physics
 from hypatia import constants
 
 
+# the color which marks an anchor's position in a frame
+ANCHOR_COLOR = (255, 136, 255)
+
+# (WalkaboutData, action, direction) of animations for warm_up()
+_warm_up_queue = collections.deque()
+
+
 class BadWalkabout(Exception):
     """The supplied directory has no files which match ``*.gif.`` The
     walkabout resource specified does not contain any GIFs.
@@ -166,6 +180,33 @@ class AnimAnchors(object):
 
         return AnimAnchors(anchors, anchor_point_groups)
 
+    def to_config(self):
+        """The inverse of :meth:`AnimAnchors.from_config`.
+
+        Returns:
+            configparser: a section per anchor group, whose options
+                are frame indexes and values are "x,y".
+
+        Example:
+            >>> anchors = AnimAnchors({'head_anchor': [AnchorPoint(0, 2)]},
+            ...                       ['head_anchor'])
+            >>> anchors.to_config().get('head_anchor', '0')
+            '0,2'
+
+        """
+
+        config = configparser.ConfigParser()
+
+        for anchor_point_group in self.anchor_groups:
+            config.add_section(anchor_point_group)
+
+            for frame_index, anchor_point in enumerate(
+                    self.anchor_points[anchor_point_group]):
+                config.set(anchor_point_group, str(frame_index),
+                           '%d,%d' % (anchor_point.x, anchor_point.y))
+
+        return config
+
     def get_anchor_point(self, anchor_point_group, frame_index):
         """Return an :class:`AnchorPoint` corresponding to group name
         and frame index.
@@ -274,71 +315,71 @@ class AnchorPoint(object):
                 self.y - other_anchor_point.y)
 
 
-class Walkabout(object):
-    """Sprite animations for a character which walks around.
+class WalkaboutData(object):
+    """The frames and anchors of a walkabout resource, loaded once and
+    shared by every :class:`Walkabout` using that resource.
 
-    Contextually-aware graphical representation.
+    Walkabouts only read from this, and each keeps its own playback
+    state (action, direction, frame time, position), so 200 villagers
+    using the same walkabout resource mean one zip read, one set of
+    GIF decodes and one set of frame surfaces.
 
-    The walkabout sprites specified to be therein
-    walkabout_directory, are files with an action__direction.gif
-    filename convention.
-
-    Blits its children relative to its own anchor.
+    Constants:
+        CACHE (dict): walkabout resource name -> WalkaboutData
 
     Attributes:
+        name (str): the walkabout resource name.
         resource (Resource): --
         animations (dict): 2D dictionary [action][direction] whose
             values are PygAnimations.
-        animation_anchors (dict): 2D dictionary [action][direction]
-            whose values are AnimAnchors.
-        rect (pygame.Rect): position on tilemap
-        size (tuple): the size of the animation in pixels.
-        action (constants.Action): --
-        direction (constnts.Direction): --
-        topleft_float (x,y tuple): --
-        position_rect
+        animation_anchors (dict|None): 2D dictionary [action][direction]
+            whose values are AnimAnchors, or None if any animation
+            is missing its anchors.
+        actions (list): the action of each animation.
+        directions (list): the direction of each animation.
+        size (tuple): the size of the (last loaded) animation in pixels.
+        is_setup (bool): True once :meth:`WalkaboutData.runtime_setup`
+            has run.
+        prepared (set): (action, direction) of every animation which
+            has been converted to the display's format and played.
+
+    Example:
+        >>> WalkaboutData.load('debug') is WalkaboutData.load('debug')
+        True
 
     """
 
-    def __init__(self, directory, position=None, children=None):
-        """
+    CACHE = {}
+
+    def __init__(self, name):
+        """Load the walkabout resource. Use :meth:`WalkaboutData.load`
+        instead, to share the data.
 
         Args:
-            directory (str): directory containing (animated)
-            walkabout GIFs. Assumed parent is data/walkabouts/
-            position (tuple): (x, y) coordinates (integers)
-                referring to absolute pixel coordinate.
-            children (list|None): Walkabout objects drawn relative to
-                this Walkabout instance.
+            name (str): walkabout resource name, e.g., debug.
 
-        Example:
-            >>> hat = Walkabout('hat')
-            >>> Walkabout('debug', position=(44, 55), children=[hat])
-            <hypatia.animations.Walkabout object at 0x...>
+        Raises:
+            BadWalkabout: the resource has no GIFs.
 
         """
 
-        # the attributes we're generating
+        self.name = name
         self.animations = {}
         self.animation_anchors = {}
         self.actions = []
         self.directions = []
-        self.size = None  # will be removed in future?
-
-        if not position:
-            position = (0, 0)
-
-        topleft_float = (float(position[0]), float(position[1]))
+        self.is_setup = False
+        self.prepared = set()
 
         # specify the files to load
         # how will i glob a resource
-        resource = util.Resource('walkabouts', directory)
+        resource = util.Resource('walkabouts', name)
         sprite_files = resource.get_type('.gif')
 
         # no sprites matching pattern!
         if not sprite_files:
 
-            raise BadWalkabout(directory)
+            raise BadWalkabout(name)
 
         for sprite_path in sprite_files.keys():
             file_name, file_ext = os.path.splitext(sprite_path)
@@ -381,14 +422,386 @@ class Walkabout(object):
             else:
                 self.animation_anchors = None
 
-        # ... set the rest of the attribs
         self.resource = resource
         self.size = animation.getMaxSize()
-        self.rect = pygame.Rect(position, self.size)
-        self.topleft_float = topleft_float
+
+    @classmethod
+    def load(cls, name):
+        """Return the shared data for the walkabout resource name,
+        loading it the first time it's asked for.
+
+        Args:
+            name (str): walkabout resource name, e.g., debug.
+
+        Returns:
+            WalkaboutData: --
+
+        """
+
+        if name not in cls.CACHE:
+            cls.CACHE[name] = WalkaboutData(name)
+
+        return cls.CACHE[name]
+
+    def runtime_setup(self):
+        """Queue every animation to be prepared by :func:`warm_up`,
+        once, no matter how many walkabouts share them.
+
+        Nothing is converted or played here; an animation which is
+        drawn before :func:`warm_up` gets to it is prepared right
+        then, see :meth:`WalkaboutData.prepare`.
+
+        """
+
+        if self.is_setup:
+
+            return None
+
+        for action, directions in self.animations.items():
+
+            for direction in directions:
+                _warm_up_queue.append((self, action, direction))
+
+        self.is_setup = True
+
+    def prepare(self, action, direction):
+        """Return an animation, converting it to the display's format
+        and playing it the first time it's asked for.
+
+        Args:
+            action (constants.Action): --
+            direction (constants.Direction): --
+
+        Returns:
+            pyganim.PygAnimation: --
+
+        Raises:
+            KeyError: there's no animation for action and direction.
+
+        """
+
+        animation = self.animations[action][direction]
+
+        if (action, direction) in self.prepared:
+
+            return animation
+
+        # only counts as prepared once there's a display to convert to
+        if pygame.display.get_surface() is not None:
+            convert_animation(animation)
+            self.prepared.add((action, direction))
+
+        animation.play()
+
+        return animation
+
+
+class CompositeFrames(object):
+    """A parent walkabout's frames with its children's frames already
+    drawn on, for every action, direction and frame index, along with
+    where each composite goes relative to the parent's top left.
+
+    Drawing an accessorized walkabout, like the human player with a
+    hat, then takes one blit and no anchor lookups.
+
+    Composites are shared by every walkabout with the same walkabout
+    resource and the same children's walkabout resources.
+
+    Note:
+        Each child is composited using its frame at the time of the
+        parent's frame, i.e., as if the child's animation were in step
+        with the parent's. Children follow the parent's action and
+        direction.
+
+    Constants:
+        CACHE (dict): (parent walkabout resource name, tuple of
+            children walkabout resource names) -> CompositeFrames
+
+    Attributes:
+        frames (dict): 2D dictionary [action][direction] whose values
+            are lists of composited surfaces, one per parent frame.
+        offsets (dict): 2D dictionary [action][direction] whose values
+            are lists of (x, y) offsets from the parent's top left to
+            the top left of the composited surface, one per parent
+            frame.
+
+    Example:
+        >>> walkabout = Walkabout('debug', children=[Walkabout('hat')])
+        >>> composite_frames = CompositeFrames.load(walkabout)
+        >>> composite_frames.get(constants.Action.stand,
+        ...                      constants.Direction.south, 0)
+        (<Surface(...)>, (0, -1))
+
+    """
+
+    CACHE = {}
+
+    def __init__(self, walkabout, anchor_group='head_anchor'):
+        """Composite walkabout's children onto its frames. Use
+        :meth:`CompositeFrames.load` instead, to share the composites.
+
+        Actions and directions which the parent or any child is missing
+        an animation or anchors for aren't composited.
+
+        Args:
+            walkabout (Walkabout): a set up walkabout with children.
+            anchor_group (str): the anchors to line children up by.
+
+        """
+
+        self.frames = {}
+        self.offsets = {}
+
+        if walkabout.animation_anchors is None:
+
+            return None
+
+        children = walkabout.child_walkabouts
+
+        for action, directions in walkabout.animations.items():
+
+            for direction, animation in directions.items():
+
+                try:
+                    parent_anchors = (walkabout.animation_anchors
+                                      [action][direction])
+                    child_animations = [child[action][direction]
+                                        for child in children]
+                    child_anchors = [(child.animation_anchors
+                                      [action][direction])
+                                     for child in children]
+                except (KeyError, TypeError):
+
+                    continue
+
+                frames = []
+                offsets = []
+
+                for frame_index, start_time in enumerate(
+                        animation._startTimes[:-1]):
+                    parent_frame = animation.getFrame(frame_index)
+                    parent_anchor = parent_anchors.get_anchor_point(
+                        anchor_group,
+                        frame_index,
+                    )
+                    layers = [(parent_frame, (0, 0))]
+
+                    for child_animation, anchors in zip(child_animations,
+                                                        child_anchors):
+                        child_anchor = anchors.get_anchor_point(anchor_group,
+                                                                frame_index)
+                        child_start_times = child_animation._startTimes
+                        child_frame_index = pyganim.findStartTime(
+                            child_start_times,
+                            start_time % child_start_times[-1],
+                        )
+                        layers.append((child_animation
+                                       .getFrame(child_frame_index),
+                                       parent_anchor - child_anchor))
+
+                    surface, offset = composite_layers(layers)
+                    frames.append(surface)
+                    offsets.append(offset)
+
+                self.frames.setdefault(action, {})[direction] = frames
+                self.offsets.setdefault(action, {})[direction] = offsets
+
+    @classmethod
+    def load(cls, walkabout):
+        """Return the shared composites for walkabout and its children,
+        compositing them the first time they're asked for.
+
+        Args:
+            walkabout (Walkabout): --
+
+        Returns:
+            CompositeFrames: --
+
+        """
+
+        key = (walkabout.data.name,
+               tuple(child.data.name for child in walkabout.child_walkabouts))
+
+        if key not in cls.CACHE:
+            cls.CACHE[key] = CompositeFrames(walkabout)
+
+        return cls.CACHE[key]
+
+    def get(self, action, direction, frame_index):
+        """Return a composited frame and its offset.
+
+        Args:
+            action (constants.Action): --
+            direction (constants.Direction): --
+            frame_index (int): the parent's frame index.
+
+        Returns:
+            tuple|None: (pygame.Surface, (x, y) offset from the parent's
+                top left), or None if that action and direction weren't
+                composited.
+
+        """
+
+        try:
+            frames = self.frames[action][direction]
+            offsets = self.offsets[action][direction]
+        except KeyError:
+
+            return None
+
+        return frames[frame_index], offsets[frame_index]
+
+
+class Walkabout(object):
+    """Sprite animations for a character which walks around.
+
+    Contextually-aware graphical representation.
+
+    The walkabout sprites specified to be therein
+    walkabout_directory, are files with an action__direction.gif
+    filename convention.
+
+    Blits its children relative to its own anchor.
+
+    The animations and anchors come from :class:`WalkaboutData`, and
+    are shared with every other walkabout of the same resource. They
+    must not be modified. Only the playback state, position and size
+    belong to this walkabout.
+
+    The position, size and direction live in a slot of a
+    :class:`physics.ActorStore`; the attributes for them read and
+    write the store's arrays.
+
+    Attributes:
+        data (WalkaboutData): the shared frames and anchors.
+        store (physics.ActorStore): where the position, size and
+            direction are kept.
+        slot (int): this walkabout's index into the store's arrays.
+        resource (Resource): --
+        animations (dict): 2D dictionary [action][direction] whose
+            values are PygAnimations.
+        animation_anchors (dict): 2D dictionary [action][direction]
+            whose values are AnimAnchors.
+        rect (pygame.Rect): position on tilemap. A new rect each time
+            it's read; set it to move the walkabout.
+        size (tuple): the size of the animation in pixels.
+        action (constants.Action): --
+        direction (constnts.Direction): --
+        frame_time_offset (float): added to the shared animations'
+            elapsed time when picking this walkabout's current frame,
+            so walkabouts sharing animations needn't be in step.
+        topleft_float (x,y tuple): --
+        position_rect
+        composite (bool): whether :meth:`Walkabout.runtime_setup`
+            composites the children onto this walkabout's frames.
+        composite_frames (CompositeFrames|None): the composited frames
+            drawn instead of this walkabout and its children, once
+            set up.
+
+    """
+
+    def __init__(self, directory, position=None, children=None,
+                 composite=False, store=None):
+        """
+
+        Args:
+            directory (str): directory containing (animated)
+            walkabout GIFs. Assumed parent is data/walkabouts/
+            position (tuple): (x, y) coordinates (integers)
+                referring to absolute pixel coordinate.
+            children (list|None): Walkabout objects drawn relative to
+                this Walkabout instance.
+            composite (bool): pre-render this walkabout's frames with
+                its children already drawn on, at
+                :meth:`Walkabout.runtime_setup`. See
+                :class:`CompositeFrames`.
+            store (physics.ActorStore|None): defaults to
+                :meth:`physics.ActorStore.default`.
+
+        Example:
+            >>> hat = Walkabout('hat')
+            >>> Walkabout('debug', position=(44, 55), children=[hat])
+            <hypatia.animations.Walkabout object at 0x...>
+
+        """
+
+        if not position:
+            position = (0, 0)
+
+        data = WalkaboutData.load(directory)
+
+        # the shared, read-only attributes
+        self.data = data
+        self.resource = data.resource
+        self.animations = data.animations
+        self.animation_anchors = data.animation_anchors
+        self.actions = data.actions
+        self.directions = data.directions
+
+        # ... set the rest of the attribs
+        # an empty store is falsy, so no "store or ..."
+        if store is None:
+            store = physics.ActorStore.default()
+
+        self.store = store
+        self.slot = self.store.add(position=position, size=data.size)
         self.action = constants.Action.stand
-        self.direction = constants.Direction.south
+        self.frame_time_offset = 0
         self.child_walkabouts = children or []
+        self.composite = composite
+        self.composite_frames = None
+
+    @property
+    def topleft_float(self):
+
+        x, y = self.store.positions[self.slot]
+
+        return float(x), float(y)
+
+    @topleft_float.setter
+    def topleft_float(self, topleft):
+        self.store.positions[self.slot] = topleft
+
+    @property
+    def size(self):
+
+        width, height = self.store.sizes[self.slot]
+
+        return int(width), int(height)
+
+    @size.setter
+    def size(self, size):
+        self.store.sizes[self.slot] = size
+
+    @property
+    def rect(self):
+
+        return pygame.Rect(self.topleft_float, self.size)
+
+    @rect.setter
+    def rect(self, rect):
+        self.store.positions[self.slot] = rect.topleft
+        self.store.sizes[self.slot] = rect.size
+
+    @property
+    def direction(self):
+
+        return constants.Direction(int(self.store.directions[self.slot]))
+
+    @direction.setter
+    def direction(self, direction):
+        self.store.directions[self.slot] = direction.value
+
+    def release(self):
+        """Give this walkabout's (and its children's) slot back to
+        the store, once the walkabout won't be used anymore.
+
+        """
+
+        self.store.remove(self.slot)
+
+        for child_walkabout in self.child_walkabouts:
+            child_walkabout.release()
 
     def __getitem__(self, key):
         """Fetch sprites associated with action (key).
@@ -430,21 +843,36 @@ class Walkabout(object):
         """Get anchors per frame in a GIF by identifying th ecoordinate
         of a specific color.
 
+        Every frame of every animation is scanned at once, see
+        :func:`find_anchors`.
+
         Warning:
             This is an old, but still useful way of loading anchors for
-            an animation.
+            an animation. Bake the results into anchor INIs with
+            :func:`bake_anchors` instead of doing this at startup.
+
+        Returns:
+            dict: [action][direction] -> list of (x, y) anchor
+                coordinates (or None, if the frame has no anchor)
+                per frame.
 
         """
 
         anchors = {a: {d: [] for d in self.directions} for a in self.actions}
+        frames = []
+        frame_owners = []
 
         for action, directions in self.animations.items():
 
             for direction, animation in directions.items():
 
                 for surface_frame in animation._images:
-                    anchor = self.get_anchor(surface_frame)
-                    anchors[action][direction].append(anchor)
+                    frames.append(surface_frame)
+                    frame_owners.append((action, direction))
+
+        for (action, direction), anchor in zip(frame_owners,
+                                               find_anchors(frames)):
+            anchors[action][direction].append(anchor)
 
         return anchors
 
@@ -464,14 +892,7 @@ class Walkabout(object):
 
         """
 
-        x, y = surface.get_size()
-        debug_color = pygame.Color(255, 136, 255)
-
-        for coord in itertools.product(range(0, x), range(0, y)):
-
-            if surface.get_at(coord) == debug_color:
-
-                return coord
+        return find_anchors([surface])[0]
 
     def blit(self, screen, offset):
         """Draw the appropriate/active animation to screen.
@@ -487,22 +908,58 @@ class Walkabout(object):
 
         """
 
+        for surface, position in self.blit_sequence(offset):
+            screen.blit(surface, position)
+
+    def blit_sequence(self, offset):
+        """The (surface, position) pairs :meth:`Walkabout.blit` would
+        draw, in order: the current frame of the active animation,
+        followed by the current frame of each child.
+
+        Useful for drawing many walkabouts at once, e.g., with
+        :func:`render.blits`.
+
+        Args:
+          offset (x, y tuple): see :meth:`Walkabout.blit`.
+
+        Returns:
+            list: (pygame.Surface, (x, y)) pairs. Empty if the active
+                animation isn't playing. Just one pair if the parent and
+                its children have been composited, see
+                :class:`CompositeFrames`.
+
+        """
+
         x, y = self.topleft_float
         x -= offset[0]
         y -= offset[1]
         position_on_screen = (x, y)
 
-        pyganim_gif = self.current_animation()
-        pyganim_gif.blit(screen, position_on_screen)
+        pyganim_gif = self.data.prepare(self.action, self.direction)
 
-        # the rest of this is for children/anchors
-        if self.animation_anchors is None:
+        if not is_playing(pyganim_gif):
 
-            return None
+            return []
+
+        pyganim_frame_index = self.frame_index(pyganim_gif)
+
+        if self.composite_frames is not None:
+            composite = self.composite_frames.get(self.action,
+                                                  self.direction,
+                                                  pyganim_frame_index)
+
+            if composite is not None:
+                composite_surface, (offset_x, offset_y) = composite
+
+                return [(composite_surface, (x + offset_x, y + offset_y))]
 
-        pyganim_frame_index = pyganim.findStartTime(pyganim_gif._startTimes,
-                                                    pyganim_gif.elapsed)
         current_frame_surface = pyganim_gif.getFrame(pyganim_frame_index)
+        sequence = [(current_frame_surface, position_on_screen)]
+
+        # the rest of this is for children/anchors
+        if self.animation_anchors is None:
+
+            return sequence
 
         # anchors are all completely wrong
         animation_anchors = self.animation_anchors[self.action][self.direction]
@@ -520,39 +977,291 @@ class Walkabout(object):
                                   .get_anchor_point('head_anchor',
                                                     pyganim_frame_index))
             child_position = parent_anchor - child_frame_anchor
-            child_anim = child_walkabout.current_animation()
-            child_anim.blit(screen, child_position)
+
+            # children follow the parent's action and direction, which
+            # is what their anchors were looked up by
+            child_anim = child_walkabout.data.prepare(self.action,
+                                                      self.direction)
+
+            if is_playing(child_anim):
+                child_frame_index = child_walkabout.frame_index(child_anim)
+                child_frame_surface = child_anim.getFrame(child_frame_index)
+                sequence.append((child_frame_surface, child_position))
+
+        return sequence
 
     def runtime_setup(self):
         """Perform actions to setup the walkabout. Actions performed
         once pygame is running and walkabout has been initialized.
 
-        Convert and play all the animations, run init for children.
+        Queue the (shared) animations to be converted and played,
+        run init for children, then composite the children onto this
+        walkabout's frames if asked to.
 
-        Note:
-            It MAY be bad to leave the sprites in play mode in startup
-            by default.
+        """
+
+        self.data.runtime_setup()
+
+        for walkabout_child in self.child_walkabouts:
+            walkabout_child.runtime_setup()
+
+        if self.composite and self.child_walkabouts:
+            self.composite_frames = CompositeFrames.load(self)
+
+    def frame_index(self, animation=None):
+        """The index of the frame of animation this walkabout should
+        draw right now, going by its own frame time.
+
+        Args:
+            animation (pyganim.PygAnimation|None): defaults to
+                :meth:`Walkabout.current_animation`.
+
+        Returns:
+            int: --
 
         """
 
-        if len(self.animations) == 1:
-            actions = (constants.Action.stand,)
-            directions = (constants.Direction.south,)
+        animation = animation or self.current_animation()
+        elapsed = animation.elapsed + self.frame_time_offset
 
-        else:
-            actions = (constants.Action.walk, constants.Action.stand)
-            directions = (constants.Direction.north, constants.Direction.south,
-                          constants.Direction.east, constants.Direction.west)
+        return pyganim.findStartTime(animation._startTimes,
+                                     elapsed % animation._startTimes[-1])
 
-        for action in actions:
 
-            for direction in directions:
-                animated_sprite = self.animations[action][direction]
-                animated_sprite.convert_alpha()
-                animated_sprite.play()
+def find_anchors(surfaces, color=ANCHOR_COLOR):
+    """Find the first pixel exactly matching color (and fully opaque)
+    in each surface, scanning all surfaces of the same size at once
+    as one array.
 
-        for walkabout_child in self.child_walkabouts:
-            walkabout_child.runtime_setup()
+    Pixels are scanned column by column, left to right, so the
+    anchor is the top-most match in the left-most matching column.
+
+    Args:
+        surfaces (list): pygame.Surface objects.
+        color (tuple): (r, g, b) color marking the anchor.
+
+    Returns:
+        list: (x, y) coordinate of the anchor in each surface, or
+            None for surfaces which don't contain color.
+
+    Example:
+        >>> surface = pygame.Surface((4, 4))
+        >>> surface.set_at((2, 1), ANCHOR_COLOR)
+        >>> find_anchors([surface, pygame.Surface((4, 4))])
+        [(2, 1), None]
+
+    """
+
+    anchors = [None] * len(surfaces)
+    indexes_by_size = collections.defaultdict(list)
+
+    for index, surface in enumerate(surfaces):
+        indexes_by_size[surface.get_size()].append(index)
+
+    for (width, height), indexes in indexes_by_size.items():
+
+        if not width or not height:
+
+            continue
+
+        # (frames, width, height, rgb) and (frames, width, height)
+        pixels = numpy.array([pygame.surfarray.array3d(surfaces[i])
+                              for i in indexes])
+        alphas = numpy.array([pygame.surfarray.array_alpha(surfaces[i])
+                              for i in indexes])
+        matches = ((pixels == numpy.asarray(color)).all(axis=-1) &
+                   (alphas == 255))
+        matches = matches.reshape(len(indexes), width * height)
+        found = matches.any(axis=1)
+        first_match = matches.argmax(axis=1)
+
+        for index, was_found, flat_index in zip(indexes, found, first_match):
+
+            if was_found:
+                anchors[index] = (int(flat_index // height),
+                                  int(flat_index % height))
+
+    return anchors
+
+
+def bake_anchors(zip_path, anchor_group='head_anchor', color=ANCHOR_COLOR):
+    """Find the anchors of every GIF in a walkabout resource zip and
+    write them into the zip as the anchor INIs
+    :meth:`AnimAnchors.from_config` reads, so anchors never have to
+    be found at startup.
+
+    Frames without an anchor reuse the previous frame's anchor. GIFs
+    without any anchor don't get an INI. Existing INIs for the GIFs
+    which do have anchors are replaced.
+
+    Args:
+        zip_path (str): E.g., resources/walkabouts/debug.zip
+        anchor_group (str): the INI section to write the anchors to.
+        color (tuple): see :func:`find_anchors`.
+
+    Returns:
+        list: the names of the INIs written.
+
+    """
+
+    with zipfile.ZipFile(zip_path) as zip_file:
+        members = [(info, zip_file.read(info))
+                   for info in zip_file.infolist()]
+
+    baked = {}
+
+    for info, data in members:
+        file_name, file_extension = os.path.splitext(info.filename)
+
+        if file_extension != '.gif':
+
+            continue
+
+        animation = util.load_gif(BytesIO(data))
+        frame_anchors = find_anchors(animation._images, color)
+
+        if not any(frame_anchors):
+
+            continue
+
+        anchor_points = []
+        last_anchor = next(anchor for anchor in frame_anchors if anchor)
+
+        for anchor in frame_anchors:
+            last_anchor = anchor or last_anchor
+            anchor_points.append(AnchorPoint(*last_anchor))
+
+        anim_anchors = AnimAnchors({anchor_group: anchor_points},
+                                   [anchor_group])
+        ini_file = StringIO()
+        anim_anchors.to_config().write(ini_file)
+        baked[file_name + '.ini'] = ini_file.getvalue()
+
+    # rewrite the whole zip, as zip members can't be replaced
+    temporary_path = zip_path + '.baking'
+
+    with zipfile.ZipFile(temporary_path, 'w',
+                         zipfile.ZIP_DEFLATED) as baked_zip:
+
+        for info, data in members:
+
+            if info.filename not in baked:
+                baked_zip.writestr(info, data)
+
+        for ini_name in sorted(baked):
+            baked_zip.writestr(ini_name, baked[ini_name])
+
+    shutil.move(temporary_path, zip_path)
+
+    return sorted(baked)
+
+
+def composite_layers(layers):
+    """Draw surfaces, in order, onto one new surface just big enough
+    to hold all of them.
+
+    Args:
+        layers (list): (pygame.Surface, (x, y)) pairs, positioned
+            relative to each other.
+
+    Returns:
+        tuple: (the new pygame.Surface, (x, y) position of its top
+            left in the layers' coordinates).
+
+    Example:
+        >>> layers = [(pygame.Surface((4, 4)), (0, 0)),
+        ...           (pygame.Surface((2, 2)), (1, -2))]
+        >>> surface, offset = composite_layers(layers)
+        >>> surface.get_size(), offset
+        ((4, 6), (0, -2))
+
+    """
+
+    bounds = pygame.Rect(layers[0][1], layers[0][0].get_size())
+    bounds.unionall_ip([pygame.Rect(position, surface.get_size())
+                        for surface, position in layers[1:]])
+    composite = pygame.Surface(bounds.size, pygame.SRCALPHA, 32)
+    composite.fill((0, 0, 0, 0))
+
+    for surface, (x, y) in layers:
+        composite.blit(surface, (x - bounds.left, y - bounds.top))
+
+    # display format, if there's a display to convert to
+    if pygame.display.get_surface() is not None:
+        composite = render.prepare_surface(composite)
+
+    return composite, bounds.topleft
+
+
+def convert_animation(animation):
+    """Convert every frame of animation to the display's pixel format,
+    in place, for faster blitting, see :func:`render.prepare_surface`.
+
+    Unlike :meth:`pyganim.PygAnimation.convert_alpha`, which converts
+    copies of the frames and throws the results away, this replaces
+    the frames with their converted versions. Frames which are
+    subsurfaces, e.g., of a :class:`atlas.TextureAtlas` page, are
+    left alone, as they're already in their page's format.
+
+    Args:
+        animation (pyganim.PygAnimation): --
+
+    """
+
+    animation._images = [frame if frame.get_parent() is not None
+                         else render.prepare_surface(frame)
+                         for frame in animation._images]
+    animation.clearTransforms()
+
+
+def warm_up(limit=1):
+    """Prepare up to limit queued animations, see
+    :meth:`WalkaboutData.runtime_setup` and
+    :meth:`WalkaboutData.prepare`.
+
+    Meant to be called once per frame, so animations get converted
+    a few at a time before they're first drawn, instead of all at
+    startup.
+
+    Args:
+        limit (int): the most animations to prepare.
+
+    Returns:
+        int: how many animations were prepared.
+
+    """
+
+    prepared = 0
+
+    while _warm_up_queue and prepared < limit:
+        data, action, direction = _warm_up_queue.popleft()
+
+        if (action, direction) in data.prepared:
+
+            continue
+
+        data.prepare(action, direction)
+        prepared += 1
+
+    return prepared
+
+
+def is_playing(animation):
+    """Whether a :class:`pyganim.PygAnimation` would draw anything if
+    it were blitted right now.
+
+    Args:
+        animation (pyganim.PygAnimation): --
+
+    Returns:
+        bool: False if the animation is stopped or invisible.
+
+    """
+
+    if animation.isFinished():
+        animation.state = pyganim.STOPPED
+
+    return animation.visibility and animation.state != pyganim.STOPPED
 
 
 def palette_cycle(surface):
@@ -0,0 +1,383 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""A single-file, memory-mapped alternative to the resource ZIPs.
+
+An asset pack bundles every resource ZIP from a resources directory
+(``resources/walkabouts/debug.zip``, ``resources/scenes/debug.zip``,
+...) into one file. The pack starts with a header and an index of
+every member, followed by the member data. Each member is stored
+either uncompressed or individually zlib compressed, whichever is
+smaller, so already-compressed files like GIFs and PNGs are stored
+as-is.
+
+Uncompressed members are read straight out of a :class:`mmap.mmap`
+as :class:`memoryview` slices, without copying. On Python 2, whose
+mmap can't back a memoryview, they're copied out of the map.
+
+Layout::
+
+    magic (4 bytes) | version (uint16) | index length (uint32)
+    index (utf-8 JSON)
+    member data ...
+
+The index maps a resource key, ``category/name``, to a dictionary of
+member file names, whose values are ``[offset, stored length, length,
+compressed]``. Offsets are absolute.
+
+Build a pack from the demo's resources like so::
+
+    $ python -m hypatia.assetpack resources resources/resources.pack
+
+See Also:
+    * :class:`util.Resource`
+    * :data:`util.ASSET_PACK_PATH`
+
+"""
+
+import io
+import os
+import sys
+import mmap
+import json
+import zlib
+import struct
+import zipfile
+import argparse
+
+
+MAGIC = b'HYPK'
+VERSION = 1
+HEADER = struct.Struct('<4sHI')
+COMPRESSION_LEVEL = 9
+
+
+class BadAssetPack(Exception):
+    """The file supplied is not an asset pack, or was made by an
+    unsupported version of the packing tool.
+
+    Attributes:
+        path (str): the path of the offending file.
+
+    """
+
+    def __init__(self, path, reason):
+        """
+
+        Args:
+            path (str): path to the file which isn't a valid pack.
+            reason (str): why the file was rejected.
+
+        """
+
+        message = '%s is not a valid asset pack: %s' % (path, reason)
+        super(BadAssetPack, self).__init__(message)
+        self.path = path
+
+
+class AssetPack(object):
+    """A read-only, memory-mapped asset pack.
+
+    Attributes:
+        path (str): where the pack lives on disk.
+        index (dict): ``category/name`` -> {member file name:
+            [offset, stored length, length, compressed]}.
+
+    Example:
+        >>> import tempfile
+        >>> pack_path = os.path.join(tempfile.mkdtemp(), 'test.pack')
+        >>> build_pack('resources', pack_path)
+        >>> pack = AssetPack(pack_path)
+        >>> 'walkabouts/debug' in pack
+        True
+        >>> scene_ini = pack.read('scenes', 'debug', 'scene.ini')
+        >>> bytes(scene_ini[:9]) == b'[general]'
+        True
+        >>> del scene_ini
+        >>> pack.close()
+
+    """
+
+    def __init__(self, path):
+        """Open and memory map the pack at path, then read its index.
+
+        Args:
+            path (str): path to an asset pack built by
+                :func:`build_pack`.
+
+        Raises:
+            BadAssetPack: the file isn't a pack this version
+                understands.
+
+        """
+
+        self.path = path
+        self._file = open(path, 'rb')
+
+        # an empty file can't be memory mapped at all
+        if os.fstat(self._file.fileno()).st_size < HEADER.size:
+            self._file.close()
+
+            raise BadAssetPack(path, 'file too small')
+
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            self._file.close()
+
+            raise
+
+        try:
+            self._view = memoryview(self._map)
+        except TypeError:
+
+            # Python 2's mmap only has the old buffer interface, so
+            # members are sliced out of the map as copies
+            self._view = self._map
+
+        magic, version, index_length = HEADER.unpack_from(self._map, 0)
+
+        if magic != MAGIC:
+            self.close()
+
+            raise BadAssetPack(path, 'bad magic number')
+
+        if version != VERSION:
+            self.close()
+
+            raise BadAssetPack(path, 'unsupported version %d' % version)
+
+        index_start = HEADER.size
+        index_end = index_start + index_length
+        index_json = bytes(self._view[index_start:index_end])
+        self.index = json.loads(index_json.decode('utf-8'))
+
+    def __contains__(self, resource_key):
+
+        return resource_key in self.index
+
+    def members(self, resource_category, resource_name):
+        """Return the member file names belonging to a resource.
+
+        Args:
+            resource_category (str): E.g., tilesheets, walkabouts.
+            resource_name (str): E.g., debug.
+
+        Returns:
+            list: member file names, or an empty list if the resource
+                isn't in this pack.
+
+        """
+
+        resource_key = resource_category + '/' + resource_name
+
+        return list(self.index.get(resource_key, {}).keys())
+
+    def read(self, resource_category, resource_name, file_name):
+        """Return the contents of a member file.
+
+        Uncompressed members are returned as a zero-copy
+        :class:`memoryview` into the memory map (a copy on Python 2),
+        compressed members are inflated into a new bytes object.
+
+        Args:
+            resource_category (str): E.g., tilesheets, walkabouts.
+            resource_name (str): E.g., debug.
+            file_name (str): the member's file name, e.g., scene.ini
+
+        Returns:
+            memoryview|bytes: --
+
+        """
+
+        resource_key = resource_category + '/' + resource_name
+        offset, stored_length, __, compressed = (self.index[resource_key]
+                                                 [file_name])
+        data = self._view[offset:offset + stored_length]
+
+        if compressed:
+
+            return zlib.decompress(data)
+
+        return data
+
+    def open(self, resource_category, resource_name, file_name):
+        """Like :meth:`AssetPack.read`, but return a read-only,
+        seekable file object over the member.
+
+        Returns:
+            io.BufferedReader: --
+
+        """
+
+        data = self.read(resource_category, resource_name, file_name)
+
+        return io.BufferedReader(MemoryviewReader(data))
+
+    def close(self):
+        """Release the memory map and close the underlying file.
+
+        Warning:
+            Any :class:`memoryview` handed out by :meth:`read` must
+            have been released first.
+
+        """
+
+        # Python 2's memoryview has nothing to release
+        if hasattr(self._view, 'release'):
+            self._view.release()
+
+        self._map.close()
+        self._file.close()
+
+
+class MemoryviewReader(io.RawIOBase):
+    """A seekable, read-only raw file object over a buffer, which
+    reads directly from the buffer rather than copying it up front
+    like :class:`io.BytesIO` does.
+
+    """
+
+    def __init__(self, buffer_):
+        """
+
+        Args:
+            buffer_ (memoryview|bytes): the data to read.
+
+        """
+
+        super(MemoryviewReader, self).__init__()
+        self._buffer = memoryview(buffer_)
+        self._position = 0
+
+    def readable(self):
+
+        return True
+
+    def seekable(self):
+
+        return True
+
+    def readinto(self, target):
+        remaining = len(self._buffer) - self._position
+        count = min(len(target), max(remaining, 0))
+        end = self._position + count
+        target[:count] = self._buffer[self._position:end]
+        self._position = end
+
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = len(self._buffer) + offset
+
+        return self._position
+
+    def tell(self):
+
+        return self._position
+
+
+def build_pack(resources_directory, pack_path):
+    """Pack every resource ZIP found in resources_directory into a
+    single asset pack.
+
+    Resource ZIPs are expected at ``<category>/<name>.zip``, i.e., the
+    same layout :class:`util.Resource` reads from. Each member is
+    zlib compressed only if doing so makes it smaller.
+
+    Args:
+        resources_directory (str): E.g., resources
+        pack_path (str): where to write the pack.
+
+    """
+
+    index = {}
+    members = []
+
+    for category in sorted(os.listdir(resources_directory)):
+        category_path = os.path.join(resources_directory, category)
+
+        if not os.path.isdir(category_path):
+
+            continue
+
+        for zip_name in sorted(os.listdir(category_path)):
+            resource_name, extension = os.path.splitext(zip_name)
+
+            if extension != '.zip':
+
+                continue
+
+            resource_key = category + '/' + resource_name
+            index[resource_key] = {}
+            zip_path = os.path.join(category_path, zip_name)
+
+            with zipfile.ZipFile(zip_path) as zip_file:
+
+                for file_name in zip_file.namelist():
+
+                    # skip the directory entries
+                    if file_name.endswith('/'):
+
+                        continue
+
+                    data = zip_file.read(file_name)
+                    deflated = zlib.compress(data, COMPRESSION_LEVEL)
+                    compressed = len(deflated) < len(data)
+                    stored = deflated if compressed else data
+                    members.append((resource_key, file_name, stored,
+                                    len(data), compressed))
+
+    # offsets depend on the length of the index, and the index holds
+    # the offsets, so size the index using placeholder offsets at
+    # least as wide as any real offset, then pad the real index.
+    def serialize(index):
+
+        return json.dumps(index, sort_keys=True).encode('utf-8')
+
+    placeholder = 2 ** 32 - 1
+
+    for resource_key, file_name, stored, length, compressed in members:
+        index[resource_key][file_name] = [placeholder, len(stored),
+                                          length, int(compressed)]
+
+    data_start = HEADER.size + len(serialize(index))
+    offset = data_start
+
+    for resource_key, file_name, stored, length, compressed in members:
+        index[resource_key][file_name][0] = offset
+        offset += len(stored)
+
+    index_json = serialize(index)
+    index_json += b' ' * (data_start - HEADER.size - len(index_json))
+
+    with open(pack_path, 'wb') as pack_file:
+        pack_file.write(HEADER.pack(MAGIC, VERSION, len(index_json)))
+        pack_file.write(index_json)
+
+        for __, __, stored, __, __ in members:
+            pack_file.write(stored)
+
+
+def main(argv=None):
+    """Command line entry point for building a pack."""
+
+    parser = argparse.ArgumentParser(
+        description='Build a Hypatia asset pack from a resources directory.'
+    )
+    parser.add_argument('resources_directory',
+                        help='directory containing <category>/<name>.zip')
+    parser.add_argument('pack_path', help='where to write the asset pack')
+    args = parser.parse_args(argv)
+    build_pack(args.resources_directory, args.pack_path)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
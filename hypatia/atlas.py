@@ -0,0 +1,234 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Texture atlases: many small sprites packed into a few large
+surfaces.
+
+Every frame of every :class:`animations.Walkabout` is its own tiny
+:class:`pygame.Surface`. :func:`pack_walkabouts` copies all of those
+frames onto a few large atlas pages, using shelf bin packing, and
+replaces each frame with a subsurface of its page. Animations keep
+working as before, but their frames now reference rects on a few
+shared surfaces, which :meth:`game.Scene.runtime_setup` packs for
+every walkabout in the scene, and :meth:`game.Game.render` draws in
+one batch with :func:`render.blits`.
+
+Example:
+    >>> from hypatia import animations
+    >>> walkabouts = [animations.Walkabout('debug'),
+    ...               animations.Walkabout('hat')]
+    >>> texture_atlas = pack_walkabouts(walkabouts)
+    >>> frame = walkabouts[0].current_animation().getFrame(0)
+    >>> frame.get_parent() is not None
+    True
+
+See Also:
+    * :meth:`animations.Walkabout.blit_sequence`
+    * :func:`render.blits`
+
+"""
+
+import pygame
+
+
+class AtlasFull(Exception):
+    """A surface is too big to ever fit on an atlas page.
+
+    Attributes:
+        size (tuple): the (width, height) of the surface.
+
+    """
+
+    def __init__(self, size, page_size):
+        message = ('%dx%d surface can not fit on a %dx%d atlas page' %
+                   (size + page_size))
+        super(AtlasFull, self).__init__(message)
+        self.size = size
+
+
+class TextureAtlas(object):
+    """Pages of surfaces packed with the shelf algorithm: a page is
+    filled with horizontal shelves, each as tall as the tallest
+    surface placed on it. Surfaces are placed tallest first,
+    which keeps shelves tightly filled.
+
+    Attributes:
+        page_size (tuple): (width, height) of each atlas page.
+        padding (int): empty pixels between packed surfaces, which
+            keeps scaled or filtered blits from bleeding into
+            neighbors.
+        pages (list): the atlas page surfaces.
+
+    """
+
+    def __init__(self, page_size=(512, 512), padding=1):
+        """
+
+        Args:
+            page_size (tuple): --
+            padding (int): --
+
+        """
+
+        self.page_size = page_size
+        self.padding = padding
+        self.pages = []
+
+    def pack(self, surfaces):
+        """Copy surfaces onto atlas pages.
+
+        Each surface is only packed once, no matter how many times
+        it appears in surfaces.
+
+        Args:
+            surfaces (list): pygame.Surface objects to pack.
+
+        Returns:
+            dict: id of each packed surface -> the subsurface of the
+                atlas page it was copied to.
+
+        Raises:
+            AtlasFull: a surface is bigger than a page.
+
+        """
+
+        unique_surfaces = {id(surface): surface for surface in surfaces}
+        by_height = sorted(unique_surfaces.values(),
+                           key=lambda surface: surface.get_height(),
+                           reverse=True)
+        placements = self._place([surface.get_size()
+                                  for surface in by_height])
+
+        # one page per distinct page index, each a fresh surface
+        page_count = max([page for page, __ in placements] or [-1]) + 1
+        first_page = len(self.pages)
+
+        for __ in range(page_count):
+            self.pages.append(self._new_page())
+
+        subsurfaces = {}
+
+        for surface, (page_index, rect) in zip(by_height, placements):
+            page = self.pages[first_page + page_index]
+            page.blit(surface, rect)
+            subsurfaces[id(surface)] = page.subsurface(rect)
+
+        return subsurfaces
+
+    def _place(self, sizes):
+        """Shelf-pack sizes (tallest first) onto as many pages as
+        needed.
+
+        Returns:
+            list: (page index, pygame.Rect) for each size.
+
+        """
+
+        page_width, page_height = self.page_size
+        placements = []
+        page_index = 0
+        shelf_top = 0
+        shelf_height = 0
+        shelf_x = 0
+
+        for width, height in sizes:
+
+            if width > page_width or height > page_height:
+
+                raise AtlasFull((width, height), self.page_size)
+
+            # start a new shelf if this one is full
+            if shelf_x + width > page_width:
+                shelf_top += shelf_height + self.padding
+                shelf_height = 0
+                shelf_x = 0
+
+            # start a new page if this one is full
+            if shelf_top + height > page_height:
+                page_index += 1
+                shelf_top = 0
+                shelf_height = 0
+                shelf_x = 0
+
+            placements.append((page_index,
+                               pygame.Rect(shelf_x, shelf_top,
+                                           width, height)))
+            shelf_x += width + self.padding
+            shelf_height = max(shelf_height, height)
+
+        return placements
+
+    def _new_page(self):
+        page = pygame.Surface(self.page_size, pygame.SRCALPHA, 32)
+        page.fill((0, 0, 0, 0))
+
+        # display format, if there's a display to convert to
+        if pygame.display.get_surface() is not None:
+            page = page.convert_alpha()
+
+        return page
+
+
+def pack_walkabouts(walkabouts, page_size=(512, 512), padding=1):
+    """Pack every frame of every animation of walkabouts (and their
+    children), and their composited frames, into a new
+    :class:`TextureAtlas`, then make those animations use the packed
+    frames.
+
+    Frames which are already subsurfaces, e.g., packed for a scene
+    before, since walkabouts of the same resource share frames (see
+    :class:`animations.WalkaboutData`), aren't packed again.
+
+    Note:
+        Packing discards any transforms (see
+        :meth:`pyganim.PygAnimation.clearTransforms`). The packed
+        frames are subsurfaces of the atlas pages, which
+        :func:`animations.convert_animation` leaves alone.
+
+    Args:
+        walkabouts (list): :class:`animations.Walkabout` objects.
+        page_size (tuple): see :class:`TextureAtlas`.
+        padding (int): see :class:`TextureAtlas`.
+
+    Returns:
+        TextureAtlas: --
+
+    """
+
+    animations = {}
+    frame_lists = {}
+    pending = list(walkabouts)
+
+    while pending:
+        walkabout = pending.pop()
+        pending.extend(walkabout.child_walkabouts)
+
+        for directions in walkabout.animations.values():
+
+            for animation in directions.values():
+                animations[id(animation)] = animation
+
+        # the composites are lists of frames of their own
+        if walkabout.composite_frames is not None:
+
+            for directions in walkabout.composite_frames.frames.values():
+
+                for frames in directions.values():
+                    frame_lists[id(frames)] = frames
+
+    for animation in animations.values():
+        frame_lists[id(animation._images)] = animation._images
+
+    texture_atlas = TextureAtlas(page_size, padding)
+    subsurfaces = texture_atlas.pack([frame
+                                      for frames in frame_lists.values()
+                                      for frame in frames
+                                      if frame.get_parent() is None])
+
+    for frames in frame_lists.values():
+        frames[:] = [subsurfaces.get(id(frame), frame) for frame in frames]
+
+    for animation in animations.values():
+        animation.clearTransforms()
+
+    return texture_atlas
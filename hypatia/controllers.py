@@ -81,7 +81,7 @@ class WorldController(GameController):
                     self.game.dialogbox.next()
                 else:
                     (self.game.scene.human_player
-                     .talk(self.game.scene.npcs, self.game.dialogbox))
+                     .talk(self.game.scene, self.game.dialogbox))
 
         # respond to states
         if self.game.dialogbox.active:
@@ -17,6 +17,8 @@ import textwrap
 
 import pygame
 
+from hypatia import render
+
 
 class DialogBox(object):
 
@@ -78,6 +80,9 @@ class DialogBox(object):
             full_surface.blit(text_surface, (0, y_pos))
             y_pos += self.character_size[1]
 
+        if pygame.display.get_surface() is not None:
+            full_surface = render.prepare_surface(full_surface)
+
         self.full_surface = full_surface
         self.active = True
         self.reset_viewport_rect()
@@ -0,0 +1,396 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Field of view: which tiles can be seen from a tile, and fog of
+war over the tiles which haven't been.
+
+Tiles are seen through unless flagged "opaque" (see
+:attr:`tiles.TileMap.opacity`). What can be seen is found with
+symmetric shadowcasting: each quadrant around the origin is scanned
+row by row, outward, narrowing the visible slopes as walls cast
+shadows. Slopes are kept as exact fractions of integers, and a tile
+counts as seen only if its center is within the visible slopes, so
+if A can see B then B can see A.
+
+Example:
+    >>> opacity = numpy.array([[0, 0, 0, 0, 0],
+    ...                        [0, 0, 0, 0, 0],
+    ...                        [0, 0, 1, 0, 0],
+    ...                        [0, 0, 0, 0, 0]], dtype=bool)
+    >>> visible = field_of_view(opacity, (2, 3), radius=4)
+    >>> mask = numpy.zeros(opacity.size, dtype=int)
+    >>> mask[visible] = 1
+    >>> mask.reshape(opacity.shape).tolist()
+    [[1, 0, 0, 0, 1], [1, 1, 0, 1, 1], [1, 1, 1, 1, 1], [1, 1, 1, 1, 1]]
+
+See Also:
+    * https://www.albertford.com/shadowcasting/
+
+"""
+
+import collections
+
+import numpy
+import pygame
+
+
+def field_of_view(opacity, origin, radius):
+    """The tiles which can be seen from origin.
+
+    Args:
+        opacity (numpy.ndarray): (height, width) bools, True where a
+            tile can't be seen through.
+        origin (tuple): (x, y) tile coordinate.
+        radius (int): how far can be seen, in tiles.
+
+    Returns:
+        numpy.ndarray: the sorted flat (row by row) indices of the
+            tiles in view, origin included. Opaque tiles are in view
+            if their face is.
+
+    """
+
+    height, width = opacity.shape
+
+    return shadowcast(opacity.ravel().tolist(), width, height, origin,
+                      radius)
+
+
+def shadowcast(opaque, width, height, origin, radius):
+    """Symmetric shadowcasting on a flattened opacity grid.
+
+    Args:
+        opaque (list): width * height bools, row by row.
+        width (int): in tiles.
+        height (int): in tiles.
+        origin (tuple): (x, y) tile coordinate.
+        radius (int): --
+
+    Returns:
+        numpy.ndarray: see :func:`field_of_view`.
+
+    """
+
+    origin_x, origin_y = origin
+
+    if not (0 <= origin_x < width and 0 <= origin_y < height):
+
+        return numpy.zeros(0, dtype=numpy.int64)
+
+    visible = [origin_y * width + origin_x]
+    radius_squared = radius * radius + radius
+
+    # (x, y) of (depth, column) for the north, south, east and west
+    # quadrants
+    quadrants = ((0, 1, -1, 0), (0, 1, 1, 0), (1, 0, 0, 1), (-1, 0, 0, 1))
+
+    for depth_x, column_x, depth_y, column_y in quadrants:
+
+        # rows still to scan: depth, then the start and end slopes
+        # as (numerator, denominator)
+        rows = [(1, -1, 1, 1, 1)]
+
+        while rows:
+            depth, start_top, start_bottom, end_top, end_bottom = rows.pop()
+
+            # round the slopes to columns, ties toward the middle
+            first_column = ((2 * depth * start_top + start_bottom) //
+                            (2 * start_bottom))
+            last_column = -((end_bottom - 2 * depth * end_top) //
+                            (2 * end_bottom))
+            previous_is_wall = None
+
+            for column in range(first_column, last_column + 1):
+                x = origin_x + depth * depth_x + column * column_x
+                y = origin_y + depth * depth_y + column * column_y
+                on_map = 0 <= x < width and 0 <= y < height
+                is_wall = not on_map or opaque[y * width + x]
+
+                # walls are seen if any of them is, floors only if
+                # their center is
+                if on_map and depth * depth + column * column <= (
+                        radius_squared) and (
+                        is_wall or
+                        (column * start_bottom >= depth * start_top and
+                         column * end_bottom <= depth * end_top)):
+                    visible.append(y * width + x)
+
+                if previous_is_wall and not is_wall:
+                    start_top, start_bottom = 2 * column - 1, 2 * depth
+
+                if previous_is_wall is False and is_wall and depth < radius:
+                    rows.append((depth + 1, start_top, start_bottom,
+                                 2 * column - 1, 2 * depth))
+
+                previous_is_wall = is_wall
+
+            if previous_is_wall is False and depth < radius:
+                rows.append((depth + 1, start_top, start_bottom,
+                             end_top, end_bottom))
+
+    return numpy.unique(visible)
+
+
+class FieldOfView(object):
+    """Finds and caches what can be seen from tiles of a
+    :class:`tiles.TileMap`, keeping up with edits through
+    :attr:`tiles.TileMap.tile_listeners`.
+
+    When a tile's opacity changes, only the cached views from
+    origins within :attr:`FieldOfView.radius` of it are forgotten.
+
+    Attributes:
+        tilemap (tiles.TileMap): --
+        radius (int): how far can be seen, in tiles.
+        max_origins (int): how many views to cache; the least
+            recently used are forgotten first.
+
+    Example:
+        >>> from hypatia import tiles
+        >>> tilemap = tiles.TileMap('debug', [[[11, 11, 11, 11]]])
+        >>> field_of_view = FieldOfView(tilemap, radius=4)
+        >>> field_of_view.can_see((0, 0), (3, 0))
+        True
+        >>> tilemap.set_tile((1, 0), 0, 0)
+        >>> field_of_view.can_see((0, 0), (3, 0))
+        False
+
+    """
+
+    def __init__(self, tilemap, radius=8, max_origins=256):
+        """Start following tilemap's edits.
+
+        Args:
+            tilemap (tiles.TileMap): --
+            radius (int): --
+            max_origins (int): --
+
+        """
+
+        self.tilemap = tilemap
+        self.radius = radius
+        self.max_origins = max_origins
+        self._height, self._width = tilemap.opacity.shape
+        self._opaque = tilemap.opacity.ravel().tolist()
+
+        # origin -> visible indices, least recently used first
+        self._views = collections.OrderedDict()
+
+        tilemap.tile_listeners.append(self.tiles_changed)
+
+    def __len__(self):
+
+        return len(self._views)
+
+    def visible(self, origin):
+        """The tiles which can be seen from origin, from the cache if
+        possible. The same array is returned until it's forgotten.
+
+        Args:
+            origin (tuple): (x, y) tile coordinate.
+
+        Returns:
+            numpy.ndarray: see :func:`field_of_view`.
+
+        """
+
+        origin = tuple(origin)
+
+        if origin in self._views:
+            view = self._views.pop(origin)
+        else:
+            view = shadowcast(self._opaque, self._width, self._height,
+                              origin, self.radius)
+
+            if len(self._views) >= self.max_origins:
+                self._views.popitem(last=False)
+
+        self._views[origin] = view
+
+        return view
+
+    def can_see(self, origin, target):
+        """Whether target can be seen from origin. Unless either is
+        opaque, that's the same as whether origin can be seen from
+        target.
+
+        Args:
+            origin (tuple): (x, y) tile coordinate.
+            target (tuple): (x, y) tile coordinate.
+
+        Returns:
+            bool: --
+
+        """
+
+        target_x, target_y = target
+
+        if not (0 <= target_x < self._width and
+                0 <= target_y < self._height):
+
+            return False
+
+        view = self.visible(origin)
+        index = target_y * self._width + target_x
+        position = numpy.searchsorted(view, index)
+
+        return bool(position < len(view) and view[position] == index)
+
+    def tiles_changed(self, tilemap, coords):
+        """Catch up with the opacity of the tiles at coords,
+        forgetting the cached views they could be in.
+
+        Called by :meth:`tiles.TileMap.set_tile` and
+        :meth:`tiles.TileMap.replace_tiles`.
+
+        Args:
+            tilemap (tiles.TileMap): --
+            coords (list): (x, y) tile coordinates.
+
+        """
+
+        changed = []
+
+        for x, y in coords:
+            index = y * self._width + x
+            opaque = bool(tilemap.opacity[y, x])
+
+            if opaque != self._opaque[index]:
+                self._opaque[index] = opaque
+                changed.append((x, y))
+
+        if not changed or not self._views:
+
+            return None
+
+        # the distance from each origin to its nearest changed tile
+        origins = list(self._views)
+        distances = numpy.abs(numpy.array(origins)[:, numpy.newaxis] -
+                              numpy.array(changed)).max(axis=2).min(axis=1)
+
+        for origin, distance in zip(origins, distances.tolist()):
+
+            if distance <= self.radius:
+                del self._views[origin]
+
+    def release(self):
+        """Stop following the tilemap's edits."""
+
+        self.tilemap.tile_listeners.remove(self.tiles_changed)
+
+
+class FogOfWar(object):
+    """The tiles which have been seen, and which are in view now,
+    drawn as an overlay which darkens the rest.
+
+    Only the tiles which come into or go out of view are redrawn on
+    the overlay.
+
+    Constants:
+        UNSEEN_COLOR (tuple): RGBA over tiles never seen.
+        REMEMBERED_COLOR (tuple): RGBA over tiles seen before, but
+            not in view now.
+
+    Attributes:
+        field_of_view (FieldOfView): --
+        explored (numpy.ndarray): (height, width) bools; True where
+            a tile has been seen.
+        in_view (numpy.ndarray): (height, width) bools; True where a
+            tile is in view now.
+        overlay (pygame.Surface): the size of the tilemap's layers.
+
+    Example:
+        >>> from hypatia import tiles
+        >>> tilemap = tiles.TileMap('debug', [[[11, 11, 0, 11]]])
+        >>> fog_of_war = FogOfWar(FieldOfView(tilemap))
+        >>> fog_of_war.look_from((0, 0))
+        3
+        >>> fog_of_war.explored.tolist()
+        [[True, True, True, False]]
+        >>> fog_of_war.overlay.get_at((3 * 16, 0))
+        (0, 0, 0, 255)
+
+    """
+
+    UNSEEN_COLOR = (0, 0, 0, 255)
+    REMEMBERED_COLOR = (0, 0, 0, 160)
+
+    def __init__(self, field_of_view):
+        """
+
+        Args:
+            field_of_view (FieldOfView): --
+
+        """
+
+        self.field_of_view = field_of_view
+        tilemap = field_of_view.tilemap
+        shape = tilemap.opacity.shape
+        self.explored = numpy.zeros(shape, dtype=bool)
+        self.in_view = numpy.zeros(shape, dtype=bool)
+        self._view = numpy.zeros(0, dtype=numpy.int64)
+
+        tile_width, tile_height = tilemap.tilesheet.tile_size
+        self._tile_size = (tile_width, tile_height)
+        overlay_size = (shape[1] * tile_width, shape[0] * tile_height)
+        overlay = pygame.Surface(overlay_size, pygame.SRCALPHA, 32)
+        overlay.fill(FogOfWar.UNSEEN_COLOR)
+
+        # display format, if there's a display to convert to
+        if pygame.display.get_surface() is not None:
+            overlay = overlay.convert_alpha()
+
+        self.overlay = overlay
+
+    def look_from(self, origin):
+        """Bring what can be seen from origin into view, and let the
+        rest go out of view.
+
+        Args:
+            origin (tuple): (x, y) tile coordinate.
+
+        Returns:
+            int: how many tiles were redrawn on the overlay.
+
+        """
+
+        view = self.field_of_view.visible(origin)
+
+        # still the same cached view
+        if view is self._view:
+
+            return 0
+
+        came_into_view = numpy.setdiff1d(view, self._view,
+                                         assume_unique=True)
+        went_out_of_view = numpy.setdiff1d(self._view, view,
+                                           assume_unique=True)
+        self._view = view
+        self.explored.flat[came_into_view] = True
+        self.in_view.flat[came_into_view] = True
+        self.in_view.flat[went_out_of_view] = False
+
+        width = self.explored.shape[1]
+        tile_width, tile_height = self._tile_size
+
+        for indices, color in ((came_into_view, (0, 0, 0, 0)),
+                               (went_out_of_view,
+                                FogOfWar.REMEMBERED_COLOR)):
+
+            for index in indices.tolist():
+                tile_rect = ((index % width) * tile_width,
+                             (index // width) * tile_height,
+                             tile_width, tile_height)
+                self.overlay.fill(color, tile_rect)
+
+        return len(came_into_view) + len(went_out_of_view)
+
+    def blit(self, viewport):
+        """Draw the overlay on viewport, over the tilemap.
+
+        Args:
+            viewport (render.Viewport): --
+
+        """
+
+        viewport.blit(self.overlay)
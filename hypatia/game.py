@@ -21,6 +21,10 @@ Note:
 
 import os
 import sys
+import zlib
+import base64
+import threading
+import collections
 import xml.etree.ElementTree as ET
 
 try:
@@ -29,16 +33,22 @@ try:
 except ImportError:
     import configparser
 
+import numpy
 import pygame
 
+from hypatia import fov
 from hypatia import util
 from hypatia import tiles
+from hypatia import atlas
 from hypatia import dialog
 from hypatia import render
 from hypatia import player
 from hypatia import physics
+from hypatia import preload
+from hypatia import spatial
 from hypatia import constants
 from hypatia import animations
+from hypatia import pathfinding
 from hypatia import controllers
 
 
@@ -104,25 +114,48 @@ class TMXVersionUnsupported(Exception):
 
 
 class TMXLayersNotCSV(Exception):
-    """The data encoding used for layers during Tilemap.from_tmx()
-    is not supported. Only CSV is supported.
+    """The data encoding or compression used for layers during
+    Tilemap.from_tmx() is not supported. Supported are CSV, and
+    base64, either uncompressed or compressed with zlib or gzip.
+
+    Note:
+        Named for when only CSV was supported.
 
     Attribs:
         data_encoding (str): the failed data encoding.
+        compression (str|None): the failed compression.
 
     """
 
-    def __init__(self, data_encoding):
+    def __init__(self, data_encoding, compression=None):
         """
 
         Args:
             data_encoding (str): the failed data encoding
+            compression (str|None): the failed compression
 
         """
 
-        message = 'tmx layer data encoding %s unsupported' % data_encoding
+        if compression:
+            message = ('tmx layer data encoding %s with %s compression '
+                       'unsupported' % (data_encoding, compression))
+        else:
+            message = 'tmx layer data encoding %s unsupported' % data_encoding
+
         super(TMXLayersNotCSV, self).__init__(message)
         self.data_encodign = data_encoding
+        self.compression = compression
+
+
+class TMXInfiniteMap(Exception):
+    """An infinite TMX map, whose layers are saved in chunks, was
+    loaded as a :class:`TMX`. Load it as a :class:`ChunkedTMX`.
+
+    """
+
+    def __init__(self):
+        message = 'tmx map is infinite; load it as a ChunkedTMX'
+        super(TMXInfiniteMap, self).__init__(message)
 
 
 # not in use
@@ -135,48 +168,116 @@ class Hypatia(object):
 
 
 class Game(object):
-    """Simulates the interaction between game components."""
+    """Simulates the interaction between game components.
+
+    Constants:
+        WARM_UP_PER_FRAME (int): how many walkabout animations to
+            prepare ahead of their first use each frame, see
+            :func:`animations.warm_up`. 0 only prepares animations
+            when they're first drawn.
+
+    """
+
+    WARM_UP_PER_FRAME = 1
 
     def __init__(self, screen=None, scene=None,
                  viewport_size=None, dialogbox=None):
+        """
+
+        Args:
+            screen (render.Screen|None): --
+            scene (Scene|SceneLoader): a scene, or a scene which is
+                still loading in the background. A loading screen is
+                shown until a :class:`SceneLoader` is done.
+            viewport_size (tuple): --
+            dialogbox (dialog.DialogBox|None): --
+
+        """
 
         self.screen = screen or render.Screen()
         self.viewport = render.Viewport(viewport_size)
         self.dialogbox = dialogbox or dialog.DialogBox(self.viewport.rect.size)
 
+        if isinstance(scene, SceneLoader):
+            scene = self.wait_for(scene)
+
         # everything has been added, run runtime_setup() on each
         # relevant item
         self.scene = scene
         self.scene.runtime_setup()
         self.start_loop()
 
+    def wait_for(self, scene_loader, loading_screen=None):
+        """Keep presenting frames and pumping events, showing a
+        loading screen, until a scene loading in the background
+        is done.
+
+        Each frame also builds a slice of the scene once its
+        resources are decoded, see :meth:`SceneLoader.step`. Closing
+        the window quits, like it would once the game is running.
+
+        Args:
+            scene_loader (SceneLoader): --
+            loading_screen (render.LoadingScreen|None): --
+
+        Returns:
+            Scene: the loaded scene.
+
+        Raises:
+            Exception: whatever the scene loader raised.
+
+        """
+
+        loading_screen = loading_screen or render.LoadingScreen()
+
+        while not scene_loader.step():
+
+            # also keeps the OS from deciding the window is
+            # unresponsive; other events are left for the game
+            if pygame.event.get(pygame.QUIT):
+                pygame.quit()
+                sys.exit()
+
+            loading_screen.blit(self.viewport.surface,
+                                scene_loader.progress,
+                                scene_loader.message)
+            self.screen.update(self.viewport.surface)
+
+        return scene_loader.result()
+
     def render(self):
         """Drawing behavior for game objects.
 
+        The scene is told where the viewport is first, see
+        :meth:`Scene.update_view`, so a :class:`StreamedScene` loads
+        the map around it.
+
         """
 
-        first_tilemap_layer = self.scene.tilemap.layer_images[0]
         self.viewport.center_on(self.scene.human_player.walkabout,
-                                first_tilemap_layer.get_rect())
-        self.viewport.blit(first_tilemap_layer)
-        self.scene.tilemap.blit_layer_animated_tiles(self.viewport, 0)
-
-        # render each npc walkabout
-        for npc in self.scene.npcs:
-            npc.walkabout.blit(
-                               self.viewport.surface,
-                               self.viewport.rect.topleft
-                              )
-
-        # finally human and rest map layers last
-        self.scene.human_player.walkabout.blit(
-                                               self.viewport.surface,
-                                               self.viewport.rect.topleft
-                                              )
-
-        for i, layer in enumerate(self.scene.tilemap.layer_images[1:], 1):
-            self.viewport.blit(layer)
-            self.scene.tilemap.blit_layer_animated_tiles(self.viewport, i)
+                                self.scene.map_rect())
+        self.scene.update_view(self.viewport.rect)
+        self.scene.blit_layer(self.viewport, 0)
+
+        # only the actors in view, front most last, in one batch
+        offset = self.viewport.rect.topleft
+        actors_in_view = self.scene.visible_actors(self.viewport.rect)
+        sprites = []
+
+        for actor in self.scene.depth_order.sorted(actors_in_view):
+            sprites.extend(actor.walkabout.blit_sequence(offset))
+
+        render.blits(self.viewport.surface, sprites)
+
+        # finally the rest map layers last
+
+        for layer in range(1, self.scene.layer_count()):
+            self.scene.blit_layer(self.viewport, layer)
+
+        if self.scene.fog_of_war is not None:
+            player_tile = self.scene.actor_tile(self.scene.human_player)
+            self.scene.fog_of_war.look_from(player_tile)
+            self.scene.fog_of_war.blit(self.viewport)
 
         self.dialogbox.blit(self.viewport.surface)
 
@@ -187,28 +288,248 @@ class Game(object):
             controller.handle_input()
             self.screen.update(self.viewport.surface)
             self.render()
+            animations.warm_up(self.WARM_UP_PER_FRAME)
+            seconds = self.screen.time_elapsed_milliseconds / 1000.0
+            self.scene.move_npcs(seconds)
 
         pygame.quit()
         sys.exit()
 
 
+class SceneLoader(object):
+    """Loads a :class:`Scene` in a background thread, like a future.
+
+    The loading function is called in the background thread with a
+    progress callback of the form ``report(progress, message)``,
+    where progress is a float from 0 to 1. It should only read and
+    decode; anything making pygame objects belongs in the building
+    function, which is run on the main thread, a slice at a time,
+    by :meth:`SceneLoader.step`.
+
+    Attributes:
+        progress (float): 0 to 1, how far along loading is.
+        message (str|None): describes what's loading right now.
+
+    Example:
+        >>> loader = SceneLoader(lambda report: report(1.0, 'done!'))
+        >>> loader.start().result()
+        >>> loader.done(), loader.progress, loader.message
+        (True, 1.0, 'done!')
+
+        >>> def build(loaded, report):
+        ...     yield None
+        ...     yield loaded * 2
+        >>> SceneLoader(lambda report: 21, build).start().result()
+        42
+
+    See Also:
+        * :meth:`Scene.from_resource_async`
+        * :meth:`Scene.from_tmx_resource_async`
+        * :meth:`Game.wait_for`
+
+    """
+
+    def __init__(self, load_function, build_function=None):
+        """
+
+        Args:
+            load_function (callable): called with a progress
+                callback in the background thread, returns
+                the loaded scene, or what build_function needs
+                to build it.
+            build_function (callable|None): a generator function,
+                called on the main thread like
+                ``build_function(loaded, report)``, where loaded is
+                what load_function returned. It yields None after
+                each slice of work, then the built scene.
+
+        """
+
+        self.progress = 0.0
+        self.message = None
+        self._load_function = load_function
+        self._build_function = build_function
+        self._build_steps = None
+        self._result = None
+        self._exception = None
+        self._finished = threading.Event()
+        self._built = False
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def start(self):
+        """Start loading in the background.
+
+        Returns:
+            SceneLoader: self, for chaining.
+
+        """
+
+        self._thread.start()
+
+        return self
+
+    def report(self, progress, message=None):
+        """The progress callback handed to the loading function.
+
+        Args:
+            progress (float): 0 to 1.
+            message (str|None): --
+
+        """
+
+        self.progress = progress
+        self.message = message
+
+    def done(self):
+        """Returns True if loading and building have finished, or
+        either failed.
+
+        """
+
+        return self._built
+
+    def step(self):
+        """Build one slice of the scene, once the background thread
+        has finished. Call it from the main thread, e.g., once per
+        frame.
+
+        Returns:
+            bool: True once loading and building have finished, or
+                either failed.
+
+        """
+
+        if self._built or not self._finished.is_set():
+
+            return self._built
+
+        if self._exception is not None or self._build_function is None:
+            self._built = True
+
+            return True
+
+        try:
+
+            if self._build_steps is None:
+                self._build_steps = self._build_function(self._result,
+                                                         self.report)
+
+            built = next(self._build_steps)
+        except Exception as exception:
+            self._exception = exception
+            self._built = True
+
+            return True
+
+        if built is not None:
+            self._result = built
+            self._built = True
+            self._build_steps.close()
+
+        return self._built
+
+    def result(self, timeout=None):
+        """Wait for loading to finish, build whatever is left to
+        build on the calling thread, and return the loaded scene.
+
+        Args:
+            timeout (float|None): seconds to wait for the background
+                thread before giving up and returning None.
+
+        Raises:
+            Exception: whatever the loading or building function
+                raised.
+
+        """
+
+        if not self._finished.wait(timeout):
+
+            return None
+
+        while not self.step():
+            pass
+
+        if self._exception is not None:
+
+            raise self._exception
+
+        return self._result
+
+    def _run(self):
+
+        try:
+            self._result = self._load_function(self.report)
+        except Exception as exception:
+            self._exception = exception
+        finally:
+            self._finished.set()
+
+
 class Scene(object):
     """A map with configuration data/meta, e.g., NPCs.
 
     Attributes:
-      tilemap (hypatia.tiles.Tilemap): --
+      tilemap (hypatia.tiles.Tilemap|None): None for a
+        :class:`StreamedScene`.
       player_start_position (tuple): (x, y); two integer tuple
         denoting the starting position for human player.
       human_player (hypatia.player.Player): the human player object.
       npcs (list): a list of hypatia.player.NPC objects
+      actor_index (spatial.SpatialHash): the npcs and the human
+        player, by their walkabout's rect. See
+        :meth:`Scene.update_actor`.
+      depth_order (render.DepthOrder): the npcs and the human player,
+        in drawing order, by the bottom of their walkabout's rect.
+      store (physics.ActorStore): the store of the human player's
+        walkabout, which the scene builders make one of for each
+        scene, so actors of other scenes are never in the way.
+      npc_slots (numpy.ndarray): the :attr:`Scene.store` slots of the
+        npcs' walkabouts.
+      actor_slots (numpy.ndarray): the :attr:`Scene.store` slots of
+        the human player's and the npcs' walkabouts, but not of their
+        children, e.g., the hat. See :meth:`Scene.actor_slots_in_rect`.
+      pathfinder (pathfinding.Pathfinder|None): finds paths between
+        tiles of the tilemap, caching them until the tiles they
+        cross are edited. None without a tilemap.
+      field_of_view (fov.FieldOfView|None): what can be seen from
+        each tile of the tilemap. See :meth:`Scene.can_see`. None
+        without a tilemap.
+      fog_of_war (fov.FogOfWar|None): if set, :meth:`Game.render`
+        darkens the tiles the human player can't see.
+      texture_atlas (atlas.TextureAtlas|None): the walkabout frames
+        of the human player and the npcs, packed by
+        :meth:`Scene.runtime_setup`.
+
+    Constants:
+      HUMAN_PLAYER_WALKABOUT (str): the walkabout resource name
+        for the human player.
+      HUMAN_PLAYER_CHILDREN (tuple): walkabout resource names which
+        are drawn relative to the human player's walkabout.
+      PRELOAD_PROGRESS (float): the share of an asynchronous load's
+        progress spent decoding resources, the rest is spent
+        constructing the scene.
+      ROWS_PER_SLICE (int): how many rows of tiles are stitched per
+        slice of an asynchronous load, see :meth:`tiles.TileMap.stitch`.
+      ACTOR_CELL_SIZE (int): the cell size of :attr:`Scene.actor_index`.
+      CULL_MARGIN (int): how many pixels a walkabout may draw outside
+        of its rect, e.g., a hat, and still be drawn by
+        :meth:`Game.render` when only that part is in view.
 
     """
 
+    HUMAN_PLAYER_WALKABOUT = 'debug'
+    HUMAN_PLAYER_CHILDREN = ('hat',)
+    PRELOAD_PROGRESS = 0.9
+    ROWS_PER_SLICE = 8
+    ACTOR_CELL_SIZE = 64
+    CULL_MARGIN = 16
+
     def __init__(self, tilemap, player_start_position,
                  human_player, npcs=None):
         """
         Args:
-            tilemap (tiles.TileMap): --
+            tilemap (tiles.TileMap|None): --
             player_start_position (tuple): x, y pixel coordinates
                 for the human player's starting position.
             human_player (players.HumanPlayer): --
@@ -220,15 +541,56 @@ class Scene(object):
         self.player_start_position = player_start_position
         self.human_player = human_player
         self.npcs = npcs or []
+        self.actor_index = spatial.SpatialHash(Scene.ACTOR_CELL_SIZE)
+        self.depth_order = render.DepthOrder(Scene.actor_depth)
+
+        for actor in [human_player] + self.npcs:
+            self.actor_index.insert(actor, actor.walkabout.rect)
+            self.depth_order.insert(actor)
+
+        # npcs by their walkabout's slot in the human player's store
+        self.store = human_player.walkabout.store
+        self._npcs_by_slot = {npc.walkabout.slot: npc for npc in self.npcs
+                              if npc.walkabout.store is self.store}
+        self.npc_slots = numpy.array(sorted(self._npcs_by_slot),
+                                     dtype=numpy.int64)
+        self.actor_slots = numpy.append(self.npc_slots,
+                                        human_player.walkabout.slot)
+        self.pathfinder = None
+        self.field_of_view = None
+        self.fog_of_war = None
+
+        # a StreamedScene never has the whole map at once
+        if tilemap is not None:
+            self.pathfinder = pathfinding.Pathfinder(tilemap)
+            self.field_of_view = fov.FieldOfView(tilemap)
+        self.texture_atlas = None
+
+    @staticmethod
+    def actor_depth(actor):
+        """Actors are drawn in order of how far down their feet are,
+        i.e., the bottom of their walkabout's rect.
+
+        Args:
+            actor (actor.Actor): --
+
+        Returns:
+            int: --
+
+        """
+
+        return actor.walkabout.rect.bottom
 
     @staticmethod
-    def create_human_player(start_position):
+    def create_human_player(start_position, store=None):
         """Currently mostly scaffolding for creating/loading the
         human character into the scene.
 
         Args:
             start_position (tuple): x, y pixel coordinates
                 for the human player's starting position.
+            store (physics.ActorStore|None): the store for the
+                walkabouts, see :class:`animations.Walkabout`.
 
         Returns:
             player.HumanPlayer: --
@@ -236,16 +598,95 @@ class Scene(object):
         """
 
         # .. create player with player scene data
-        hat = animations.Walkabout('hat')
-        human_walkabout = animations.Walkabout('debug',
+        children = [animations.Walkabout(child_name, store=store)
+                    for child_name in Scene.HUMAN_PLAYER_CHILDREN]
+        human_walkabout = animations.Walkabout(Scene.HUMAN_PLAYER_WALKABOUT,
                                                position=start_position,
-                                               children=[hat])
+                                               children=children,
+                                               composite=True,
+                                               store=store)
         velocity = physics.Velocity(20, 20)
         human_player = player.HumanPlayer(walkabout=human_walkabout,
                                           velocity=velocity)
 
         return human_player
 
+    @classmethod
+    def human_player_manifest(cls):
+        """The resources required by :meth:`Scene.create_human_player`.
+
+        Returns:
+            list: (resource category, resource name) pairs.
+
+        """
+
+        walkabout_names = ((cls.HUMAN_PLAYER_WALKABOUT,) +
+                           cls.HUMAN_PLAYER_CHILDREN)
+
+        return [('walkabouts', name) for name in walkabout_names]
+
+    @classmethod
+    def manifest_from_resource(cls, scene_name):
+        """List every resource :meth:`Scene.from_resource` will load
+        for the scene, without loading any of them.
+
+        Args:
+          scene_name (str): see :meth:`Scene.from_resource`.
+
+        Returns:
+            list: (resource category, resource name) pairs, for
+                handing to :meth:`preload.Preloader.preload`.
+
+        Example:
+            >>> Scene.manifest_from_resource('debug')
+            [('tilesheets', 'debug'), ('walkabouts', 'debug'), ...]
+
+        """
+
+        resource = util.Resource('scenes', scene_name)
+
+        if 'tilemap.bin' in resource:
+            binary = tiles.BinaryTilemap.read(resource['tilemap.bin'])
+            tilesheet_name = binary.tilesheet_name
+        else:
+            tilesheet_name = resource['tilemap.txt'].split('\n', 1)[0]
+        manifest = [('tilesheets', tilesheet_name)]
+        manifest.extend(cls.human_player_manifest())
+        npcs_ini = resource['npcs.ini']
+
+        for npc_name in npcs_ini.sections():
+
+            if npcs_ini.has_option(npc_name, 'walkabout'):
+                walkabout_name = npcs_ini.get(npc_name, 'walkabout')
+                manifest.append(('walkabouts', walkabout_name))
+
+        return manifest
+
+    @classmethod
+    def manifest_from_tmx_resource(cls, tmx_name):
+        """List every resource :meth:`Scene.from_tmx_resource` will
+        load for the scene, without loading any of them.
+
+        Args:
+          tmx_name (str): see :meth:`Scene.from_tmx_resource`.
+
+        Returns:
+            list: (resource category, resource name) pairs.
+
+        """
+
+        file_path = os.path.join('resources', 'scenes', tmx_name + '.tmx')
+        root = parse_tmx(file_path)
+        tilesheet_name = root.find('.//tileset').attrib['name']
+        manifest = [('tilesheets', tilesheet_name)]
+        manifest.extend(cls.human_player_manifest())
+        xpath = ".//objectgroup/object[@type='npc']//property[@name='%s']"
+
+        for walkabout in root.findall(xpath % 'walkabout'):
+            manifest.append(('walkabouts', walkabout.attrib['value']))
+
+        return manifest
+
     def to_tmx_resource(self, tmx_name):
         """Scaffolding.
 
@@ -258,6 +699,9 @@ class Scene(object):
         """Create a scene from a Tiled editor TMX file in
         the scenes resource directory.
 
+        An infinite map is loaded as a :class:`ChunkedTMX`, see
+        :meth:`StreamedScene.from_chunked_tmx`.
+
         Returns:
             Scene: A scene created using all compatible
                 data from designated TMX file.
@@ -265,18 +709,166 @@ class Scene(object):
         """
 
         file_path = os.path.join('resources', 'scenes', tmx_name + '.tmx')
-        tmx = TMX(file_path)
-        human_player = cls.create_human_player(tmx.player_start_position)
 
-        return Scene(
-                     tilemap=tmx.tilemap,
-                     player_start_position=tmx.player_start_position,
-                     human_player=human_player,
-                     npcs=tmx.npcs
-                    )
+        try:
+            tmx = TMX(file_path, build=False)
+
+        # raised at the first chunk, before the rest is read
+        except TMXInfiniteMap:
+
+            return StreamedScene.from_chunked_tmx(ChunkedTMX(file_path))
+
+        return build_all(cls._build_from_tmx(tmx))
+
+    @classmethod
+    def _build_from_tmx(cls, tmx, report=None, rows_per_slice=None):
+        """Build the scene of a :class:`TMX` which has only been
+        parsed, a slice at a time.
+
+        Args:
+            tmx (TMX): --
+            report (callable|None): called like ``report(progress,
+                message)``, progress from 0 to 1, after each slice.
+            rows_per_slice (int|None): see :meth:`TMX.build`.
+
+        Yields:
+            None after each slice of work, then the Scene.
+
+        """
+
+        report = report or (lambda progress, message=None: None)
+
+        for progress in tmx.build(rows_per_slice):
+            report(progress * 0.9, 'building the map')
+
+            yield None
+
+        human_player = cls.create_human_player(tmx.player_start_position,
+                                               tmx.store)
+        report(1.0, None)
+
+        yield Scene(
+                    tilemap=tmx.tilemap,
+                    player_start_position=tmx.player_start_position,
+                    human_player=human_player,
+                    npcs=tmx.npcs
+                   )
+
+    @classmethod
+    def from_tmx_resource_async(cls, tmx_name):
+        """Like :meth:`Scene.from_tmx_resource`, but parse the TMX
+        file and decode resources in the background, in a worker
+        pool, leaving the scene to be built a slice at a time on the
+        main thread, see :meth:`Game.wait_for`.
+
+        Args:
+            tmx_name (str): --
+
+        Returns:
+            SceneLoader: already started.
+
+        """
+
+        file_path = os.path.join('resources', 'scenes', tmx_name + '.tmx')
+
+        def load(report):
+            manifest = cls.manifest_from_tmx_resource(tmx_name)
+            preloader = cls._preload(manifest, report)
+
+            return preloader, TMX(file_path, build=False)
+
+        def build(loaded, report):
+            preloader, tmx = loaded
+
+            try:
+                steps = cls._build_from_tmx(tmx,
+                                            cls._build_progress(report),
+                                            cls.ROWS_PER_SLICE)
+
+                for built in steps:
+
+                    yield built
+
+            finally:
+                preloader.clear()
+
+        return SceneLoader(load, build).start()
+
+    @classmethod
+    def from_resource_async(cls, scene_name):
+        """Like :meth:`Scene.from_resource`, but decode resources in
+        the background, in a worker pool, leaving the scene to be
+        built a slice at a time on the main thread, see
+        :meth:`Game.wait_for`.
+
+        Args:
+            scene_name (str): --
+
+        Returns:
+            SceneLoader: already started.
+
+        Example:
+            >>> loader = Scene.from_resource_async('debug')
+            >>> isinstance(loader.result(), Scene)
+            True
+
+        """
+
+        def load(report):
+            manifest = cls.manifest_from_resource(scene_name)
+
+            return cls._preload(manifest, report)
+
+        def build(preloader, report):
+
+            try:
+                steps = cls._build_from_resource(scene_name,
+                                                 cls._build_progress(report),
+                                                 cls.ROWS_PER_SLICE)
+
+                for built in steps:
+
+                    yield built
+
+            finally:
+                preloader.clear()
+
+        return SceneLoader(load, build).start()
+
+    @classmethod
+    def _preload(cls, manifest, report):
+        """Decode the manifest's resources, reporting progress up to
+        :attr:`Scene.PRELOAD_PROGRESS`.
+
+        Returns:
+            preload.Preloader: clear it once the scene is constructed.
+
+        """
+
+        def preload_progress(done, total, current_file):
+            message = 'loading %s/%s/%s' % current_file
+            report(cls.PRELOAD_PROGRESS * done / total, message)
+
+        preloader = preload.Preloader(progress_callback=preload_progress)
+        preloader.preload(manifest)
+
+        return preloader
 
     @classmethod
-    def from_resource(self, scene_name):
+    def _build_progress(cls, report):
+        """Report building's progress as the rest of an asynchronous
+        load's, after :attr:`Scene.PRELOAD_PROGRESS`.
+
+        """
+
+        def build_progress(progress, message=None):
+            report(cls.PRELOAD_PROGRESS +
+                   (1 - cls.PRELOAD_PROGRESS) * progress, message)
+
+        return build_progress
+
+    @classmethod
+    def from_resource(cls, scene_name):
         """The native format, and hopefully most reliable,
         stable, and generally best way of saving, loading,
         or creating Hypatia scenes.
@@ -284,21 +876,61 @@ class Scene(object):
         This defines the standard by which all
         other Scene constructors must follow.
 
+        The tilemap is read from the scene's tilemap.bin (see
+        :class:`tiles.BinaryTilemap`) if it has one, or else from its
+        tilemap.txt.
+
         Args:
           scene_name (str): the name of the directory which corresponds
             to the map you want to load from resources/maps.
 
         """
 
+        return build_all(cls._build_from_resource(scene_name))
+
+    @classmethod
+    def _build_from_resource(cls, scene_name, report=None,
+                             rows_per_slice=None):
+        """Do the work of :meth:`Scene.from_resource`, a slice at a
+        time.
+
+        Args:
+            scene_name (str): --
+            report (callable|None): called like ``report(progress,
+                message)``, progress from 0 to 1, after each slice.
+            rows_per_slice (int|None): see :meth:`tiles.TileMap.stitch`.
+
+        Yields:
+            None after each slice of work, then the Scene.
+
+        """
+
+        report = report or (lambda progress, message=None: None)
+
         # load the scene zip from the scene resource and read
         # the general scene configuration, first.
         resource = util.Resource('scenes', scene_name)
         scene_ini = resource['scene.ini']
 
-        # Construct a TileMap from the tilemap.txt
-        # contents from the scene resource.
-        tilemap_string = resource['tilemap.txt']
-        tilemap = tiles.TileMap.from_string(tilemap_string)
+        # Construct a TileMap from the tilemap.bin, or else the
+        # tilemap.txt, contents from the scene resource, stitching
+        # its layers a slice at a time.
+        if 'tilemap.bin' in resource:
+            tilemap = tiles.TileMap.from_binary(resource['tilemap.bin'],
+                                                stitched=False)
+        else:
+            tilemap_string = resource['tilemap.txt']
+            tilemap = tiles.TileMap.from_string(tilemap_string,
+                                                stitched=False)
+
+        report(0.0, 'building the map')
+
+        yield None
+
+        for progress in tilemap.stitch(rows_per_slice):
+            report(progress * 0.5, 'building the map')
+
+            yield None
 
         # Get the player's starting position from the
         # general scene configuration.
@@ -306,22 +938,27 @@ class Scene(object):
         player_start_y = scene_ini.getint('general', 'player_start_y')
         player_start_position = (player_start_x, player_start_y)
 
-        # Create a player using the player
-        # start position found.
-        human_player = self.create_human_player(player_start_position)
+        # Create a player using the player start position found,
+        # with a store of its own for this scene's actors.
+        store = physics.ActorStore()
+        human_player = cls.create_human_player(player_start_position, store)
 
         # npcs.ini
         #
         # Create a list of NPCs using a configuration file
         # from the scene resource.
         npcs_ini = resource['npcs.ini']
+        npc_names = npcs_ini.sections()
+        report(0.5, 'building npcs')
+
+        yield None
 
         npcs = []
 
         # each section title is the npc's name,
         # each sections key/value pairs are
         # the NPC's attributes.
-        for npc_name in npcs_ini.sections():
+        for npc_number, npc_name in enumerate(npc_names, 1):
 
             if npcs_ini.has_option(npc_name, 'walkabout'):
                 # The NPC's walkabout resource name
@@ -337,7 +974,8 @@ class Scene(object):
             # designated walkabout name and position
             # from the NPC's config.
             npc_walkabout = animations.Walkabout(walkabout_name,
-                                                 position=position)
+                                                 position=position,
+                                                 store=store)
 
             if npcs_ini.has_option(npc_name, 'say'):
                 # Load some say text for the NPC, so when
@@ -349,48 +987,768 @@ class Scene(object):
 
             npc = player.Npc(walkabout=npc_walkabout, say_text=say_text)
             npcs.append(npc)
+            report(0.5 + 0.5 * npc_number / len(npc_names), 'building npcs')
 
-        return Scene(
-                     tilemap=tilemap,
-                     player_start_position=player_start_position,
-                     human_player=human_player,
-                     npcs=npcs
-                    )
+            yield None
 
-    def collide_check(self, rect):
-        """Returns True if there are collisions with rect.
+        yield Scene(
+                    tilemap=tilemap,
+                    player_start_position=player_start_position,
+                    human_player=human_player,
+                    npcs=npcs
+                   )
+
+    def visible_actors(self, rect):
+        """The actors which could draw something within rect.
 
         Args:
-            rect (pygame.Rect): The area/rectangle which
-                to test for collisions against NPCs and
-                the tilemap's wallmap.
+            rect (pygame.Rect): E.g., the viewport's rect.
+
+        Returns:
+            list: the human player first, then npcs in the order
+                they're in :attr:`Scene.npcs`.
 
         """
 
-        possible_collisions = self.tilemap.impassable_rects
+        margin = Scene.CULL_MARGIN
 
-        for npc in self.npcs:
-            possible_collisions.append(npc.walkabout.rect)
+        return self.actor_index.query(rect.inflate(margin * 2, margin * 2))
 
-        return rect.collidelist(possible_collisions) != -1
+    def actor_slots_in_rect(self, rect):
+        """The :attr:`Scene.actor_slots` whose bounds collide with
+        rect, found with one vectorized test, see
+        :meth:`physics.ActorStore.in_rect`.
 
-    def runtime_setup(self):
-        """Initialize all the NPCs, tilemap, etc.
+        Args:
+            rect (pygame.Rect): --
 
-        Is this a horrible way of doing this? I dunno,
-        not the fondest...
+        Returns:
+            numpy.ndarray: --
 
         """
 
-        npcs_to_setup = tuple(npc.walkabout for npc in self.npcs)
-        objects_to_setup = (self.tilemap, self.human_player.walkabout,)
-        objects_to_setup = objects_to_setup + npcs_to_setup
+        return self.store.in_rect(rect, self.actor_slots)
 
-        for object_to_setup in objects_to_setup + npcs_to_setup:
-            object_to_setup.runtime_setup()
+    def actors_in_rect(self, rect):
+        """The actors whose walkabout's rect collides with rect.
 
+        Args:
+            rect (pygame.Rect): --
 
-class TMX(object):
+        Returns:
+            list: the human player first, then npcs in the order
+                they're in :attr:`Scene.npcs`.
+
+        """
+
+        return self.actor_index.query(rect)
+
+    def actors_near(self, position, radius):
+        """The actors whose walkabout's rect is within radius of
+        position.
+
+        Args:
+            position (tuple): (x, y) pixel coordinates.
+            radius (float): in pixels.
+
+        Returns:
+            list: the human player first, then npcs in the order
+                they're in :attr:`Scene.npcs`.
+
+        """
+
+        return self.actor_index.near(position, radius)
+
+    def nearest_actors(self, position, count=1, max_distance=None,
+                       exclude=()):
+        """The count actors whose walkabout's rect is closest to
+        position, nearest first.
+
+        See :meth:`spatial.SpatialHash.nearest`.
+
+        Args:
+            position (tuple): (x, y) pixel coordinates.
+            count (int): --
+            max_distance (Optional[float]): --
+            exclude (Iterable): actors to skip.
+
+        Returns:
+            list: --
+
+        """
+
+        return self.actor_index.nearest(position, count, max_distance,
+                                        exclude)
+
+    def actors_in_front(self, actor, reach=1):
+        """The other actors within reach pixels in front of actor,
+        i.e., the way it's facing.
+
+        Args:
+            actor (actor.Actor): --
+            reach (int): --
+
+        Returns:
+            list: the human player first, then npcs in the order
+                they're in :attr:`Scene.npcs`.
+
+        """
+
+        in_front = spatial.facing_rect(actor.walkabout.rect,
+                                       actor.walkabout.direction,
+                                       reach)
+
+        return [other for other in self.actor_index.query(in_front)
+                if other is not actor]
+
+    def actor_tile(self, actor):
+        """The tile the center of actor's walkabout is on.
+
+        Args:
+            actor (actor.Actor): --
+
+        Returns:
+            tuple: (x, y) tile coordinate.
+
+        """
+
+        tile_width, tile_height = self.tilemap.tilesheet.tile_size
+        center_x, center_y = actor.walkabout.rect.center
+
+        return (center_x // tile_width, center_y // tile_height)
+
+    def can_see(self, actor, other):
+        """Whether actor has a line of sight to other, from tile to
+        tile, within :attr:`fov.FieldOfView.radius`.
+
+        Args:
+            actor (actor.Actor): --
+            other (actor.Actor): --
+
+        Returns:
+            bool: --
+
+        """
+
+        return self.field_of_view.can_see(self.actor_tile(actor),
+                                          self.actor_tile(other))
+
+    def update_actor(self, actor):
+        """Keep :attr:`Scene.actor_index` and :attr:`Scene.depth_order`
+        up to date after actor has moved.
+
+        Args:
+            actor (actor.Actor): an npc or the human player.
+
+        """
+
+        self.actor_index.update(actor, actor.walkabout.rect)
+        self.depth_order.update(actor)
+
+    def map_rect(self):
+        """The pixels covered by the map, which the viewport is kept
+        within.
+
+        Returns:
+            pygame.Rect: --
+
+        """
+
+        return self.tilemap.layer_images[0].get_rect()
+
+    def update_view(self, rect):
+        """Called by :meth:`Game.render` with the viewport's rect
+        before drawing. The whole tilemap is always loaded, so there's
+        nothing to do; see :meth:`StreamedScene.update_view`.
+
+        Args:
+            rect (pygame.Rect): --
+
+        """
+
+        pass
+
+    def layer_count(self):
+        """How many layers the map has.
+
+        Returns:
+            int: --
+
+        """
+
+        return len(self.tilemap.layer_images)
+
+    def blit_layer(self, viewport, layer):
+        """Draw a layer of the map, with its animated tiles, on
+        viewport.
+
+        Args:
+            viewport (render.Viewport): --
+            layer (int): --
+
+        """
+
+        viewport.blit(self.tilemap.layer_images[layer])
+        self.tilemap.blit_layer_animated_tiles(viewport, layer)
+
+    def move_npcs(self, seconds):
+        """Move every npc with a velocity, all at once, stopping them
+        short of impassable tiles, other npcs and the human player.
+
+        See :func:`physics.move_actors`.
+
+        Args:
+            seconds (float): time since the last move.
+
+        Returns:
+            list: the npcs which moved.
+
+        """
+
+        store = self.human_player.walkabout.store
+        npc_slots = self.npc_slots
+        moving_slots = npc_slots[store.velocities[npc_slots].any(axis=1)]
+
+        if not len(moving_slots):
+
+            return []
+
+        moved_slots = set(self.move_slots(moving_slots, seconds).tolist())
+        moved_npcs = []
+
+        # only npcs with a velocity need their walkabout and the
+        # scene's indexes updated
+        for slot in moving_slots.tolist():
+            npc = self._npcs_by_slot[slot]
+
+            if slot in moved_slots:
+                npc.walkabout.action = constants.Action.walk
+                self.update_actor(npc)
+                moved_npcs.append(npc)
+            else:
+                npc.walkabout.action = constants.Action.stand
+
+        return moved_npcs
+
+    def move_slots(self, slots, seconds):
+        """Move the walkabouts in slots of :attr:`Scene.store`, for
+        :meth:`Scene.move_npcs`.
+
+        Args:
+            slots (numpy.ndarray): --
+            seconds (float): --
+
+        Returns:
+            numpy.ndarray: the slots which moved.
+
+        """
+
+        return physics.move_actors(
+            self.store,
+            slots,
+            seconds,
+            self.tilemap.impassability_table,
+            self.tilemap.tilesheet.tile_size,
+            self.actor_slots,
+        )
+
+    def collide_check(self, rect):
+        """Returns True if there are collisions with rect.
+
+        :meth:`player.HumanPlayer.move` calls this for every pixel
+        step, so the tiles are tested with a constant-time lookup in
+        :attr:`tiles.TileMap.impassability_table`, and the NPCs with
+        :attr:`Scene.actor_index`, rather than testing rect against
+        every impassable tile and NPC.
+
+        Args:
+            rect (pygame.Rect): The area/rectangle which
+                to test for collisions against NPCs and
+                the tilemap's wallmap. Leaving the map counts
+                as a collision.
+
+        """
+
+        if self.tiles_block(rect):
+
+            return True
+
+        return any(actor is not self.human_player
+                   for actor in self.actor_index.query(rect))
+
+    def tiles_block(self, rect):
+        """Whether rect overlaps an impassable tile, or isn't entirely
+        on the tilemap.
+
+        Args:
+            rect (pygame.Rect): --
+
+        Returns:
+            bool: --
+
+        """
+
+        bounds = numpy.array([[rect.left, rect.top, rect.right, rect.bottom]])
+
+        return bool(physics.hits_grid(bounds,
+                                      self.tilemap.impassability_table,
+                                      self.tilemap.tilesheet.tile_size)[0])
+
+    def runtime_setup(self):
+        """Initialize all the NPCs, tilemap, etc., then pack the
+        walkabouts' frames into :attr:`Scene.texture_atlas`, so
+        :meth:`Game.render` draws them from a few atlas pages.
+
+        Is this a horrible way of doing this? I dunno,
+        not the fondest...
+
+        """
+
+        npcs_to_setup = tuple(npc.walkabout for npc in self.npcs)
+        objects_to_setup = (self.map_to_setup(), self.human_player.walkabout,)
+        objects_to_setup = objects_to_setup + npcs_to_setup
+
+        for object_to_setup in objects_to_setup + npcs_to_setup:
+            object_to_setup.runtime_setup()
+
+        walkabouts = (self.human_player.walkabout,) + npcs_to_setup
+        self.texture_atlas = atlas.pack_walkabouts(walkabouts)
+
+    def map_to_setup(self):
+        """What holds the map, for :meth:`Scene.runtime_setup`.
+
+        Returns:
+            tiles.TileMap: --
+
+        """
+
+        return self.tilemap
+
+
+class StreamedScene(Scene):
+    """A scene whose map is never loaded whole, but a region at a time
+    around the viewport, e.g., a map too big to keep in memory.
+
+    The map comes from a world, which is anything with:
+
+      * ``rect`` (:class:`pygame.Rect`), the pixels it covers
+      * ``depth``, how many layers
+      * ``tilesheet`` (:class:`tiles.Tilesheet`)
+      * ``update(rect, velocity)``, load the regions around a pixel
+        rect, and ahead of velocity, (x, y) pixels per second
+      * ``impassable(coord)``, whether the tile at (x, y) is
+      * ``blit_layer(viewport, layer)``
+      * ``runtime_setup()``
+
+    :class:`ChunkedTMX` is one, which materializes the chunks in view
+    as soon as they're needed, and :class:`streaming.WorldStreamer`
+    is one, which materializes them in a background thread.
+    :meth:`Game.render` updates the world with the viewport's rect
+    and the human player's velocity every frame.
+
+    Attributes:
+      world: see above.
+
+    """
+
+    def __init__(self, world, player_start_position,
+                 human_player, npcs=None):
+        """
+        Args:
+            world: --
+            player_start_position (tuple): see :class:`Scene`.
+            human_player (players.HumanPlayer): --
+            npcs (List[players.Npc]): --
+
+        """
+
+        super(StreamedScene, self).__init__(None, player_start_position,
+                                            human_player, npcs)
+        self.world = world
+
+    @classmethod
+    def from_chunked_tmx(cls, chunked_tmx, world=None):
+        """Create a scene of an infinite TMX map, with the player's
+        start position and the npcs of its object layer.
+
+        Args:
+            chunked_tmx (ChunkedTMX): --
+            world: defaults to chunked_tmx, e.g.,
+                ``streaming.WorldStreamer(chunked_tmx)`` to
+                materialize its chunks in the background.
+
+        Returns:
+            StreamedScene: --
+
+        Raises:
+            TMXMissingPlayerStartPosition: --
+
+        """
+
+        player_start_position, npc_properties = parse_tmx_objects(
+            chunked_tmx.root
+        )
+        store = physics.ActorStore()
+        npcs = []
+
+        for position, walkabout_name, say_text in npc_properties:
+            walkabout = animations.Walkabout(walkabout_name, position,
+                                             store=store)
+            npcs.append(player.Npc(walkabout=walkabout, say_text=say_text))
+
+        human_player = cls.create_human_player(player_start_position, store)
+
+        # a ChunkedTMX without chunks is falsy, so no "world or ..."
+        if world is None:
+            world = chunked_tmx
+
+        return cls(world, player_start_position, human_player, npcs)
+
+    def player_velocity(self):
+        """How fast the human player is walking, for loading the
+        regions ahead of them.
+
+        Returns:
+            tuple: (x, y) pixels per second.
+
+        """
+
+        walkabout = self.human_player.walkabout
+
+        if walkabout.action != constants.Action.walk:
+
+            return (0, 0)
+
+        direction = walkabout.direction.value
+        speed = self.human_player.velocity
+        x = y = 0
+
+        if direction & constants.Direction.east.value:
+            x = speed.x
+        elif direction & constants.Direction.west.value:
+            x = -speed.x
+
+        if direction & constants.Direction.south.value:
+            y = speed.y
+        elif direction & constants.Direction.north.value:
+            y = -speed.y
+
+        return (x, y)
+
+    def map_rect(self):
+
+        return self.world.rect
+
+    def update_view(self, rect):
+        """Load the regions of the world around rect, and ahead of
+        the human player.
+
+        Args:
+            rect (pygame.Rect): --
+
+        """
+
+        self.world.update(rect, self.player_velocity())
+
+    def layer_count(self):
+
+        return self.world.depth
+
+    def blit_layer(self, viewport, layer):
+        """Draw a layer of the loaded regions on viewport. Where no
+        region is loaded (yet), the first layer leaves black.
+
+        Args:
+            viewport (render.Viewport): --
+            layer (int): --
+
+        """
+
+        if layer == 0:
+            viewport.surface.fill((0, 0, 0))
+
+        self.world.blit_layer(viewport, layer)
+
+    def actor_tile(self, actor):
+        tile_width, tile_height = self.world.tilesheet.tile_size
+        center_x, center_y = actor.walkabout.rect.center
+
+        return (center_x // tile_width, center_y // tile_height)
+
+    def tiles_block(self, rect):
+        """Whether rect overlaps an impassable tile of the world, or
+        isn't entirely within it.
+
+        Args:
+            rect (pygame.Rect): --
+
+        Returns:
+            bool: --
+
+        """
+
+        if not self.world.rect.contains(rect):
+
+            return True
+
+        tile_width, tile_height = self.world.tilesheet.tile_size
+
+        return any(self.world.impassable((x, y))
+                   for y in range(rect.top // tile_height,
+                                  (rect.bottom - 1) // tile_height + 1)
+                   for x in range(rect.left // tile_width,
+                                  (rect.right - 1) // tile_width + 1))
+
+    def move_slots(self, slots, seconds):
+        """Move the walkabouts in slots, stopping them short of other
+        actors, then put back those which moved onto impassable
+        tiles, since the world has no
+        :attr:`tiles.TileMap.impassability_table` of the whole map.
+
+        Args:
+            slots (numpy.ndarray): --
+            seconds (float): --
+
+        Returns:
+            numpy.ndarray: the slots which moved.
+
+        """
+
+        positions = self.store.positions.copy()
+        moved = physics.move_actors(self.store, slots, seconds,
+                                    obstacles=self.actor_slots)
+        blocked = numpy.array([
+            self.tiles_block(pygame.Rect(left, top, right - left,
+                                         bottom - top))
+            for left, top, right, bottom in self.store.bounds(moved).tolist()
+        ], dtype=bool)
+        self.store.positions[moved[blocked]] = positions[moved[blocked]]
+
+        return moved[~blocked]
+
+    def map_to_setup(self):
+
+        return self.world
+
+
+def build_all(steps):
+    """Run a building generator, like the building function of a
+    :class:`SceneLoader`, all at once.
+
+    Args:
+        steps (Iterator): yields None after each slice of work, then
+            what it built.
+
+    Returns:
+        what steps built.
+
+    Example:
+        >>> build_all(iter([None, None, 'built']))
+        'built'
+
+    """
+
+    for built in steps:
+
+        if built is not None:
+
+            return built
+
+
+def parse_tmx(path_or_readable, on_layer_data=None, on_chunk=None):
+    """Parse a TMX file incrementally, handing each layer's data to
+    on_layer_data as soon as it's read, then throwing the data's
+    text away. The whole document, with every layer's text, is
+    never in memory at once.
+
+    Args:
+        path_or_readable (str|file-like-object): This is plopped
+            right into ElementTree.iterparse().
+        on_layer_data (callable|None): called as
+            ``on_layer_data(layer, data)`` with each ``<layer>``
+            element and its ``<data>`` element.
+        on_chunk (callable|None): called as
+            ``on_chunk(layer, data, chunk)`` with each ``<chunk>`` of
+            an infinite map's layer data, before the ``<data>`` ends.
+            Handled chunks are dropped from the data; unless there's
+            an on_chunk, they're left for on_layer_data.
+
+    Returns:
+        Element: the ``<map>`` root element, without the layers'
+            data.
+
+    Raises:
+        TMXVersionUnsupported: as soon as the ``<map>`` is read.
+
+    """
+
+    root = None
+    layer = None
+    data = None
+
+    for event, element in ET.iterparse(path_or_readable,
+                                       events=('start', 'end')):
+
+        if event == 'start':
+
+            if root is None:
+                root = element
+                map_version = root.attrib['version']
+
+                if map_version != TMX.SUPPORTED:
+
+                    raise TMXVersionUnsupported(map_version)
+
+            elif element.tag == 'layer':
+                layer = element
+            elif element.tag == 'data':
+                data = element
+
+        elif (element.tag == 'chunk' and on_chunk is not None and
+              data is not None):
+            on_chunk(layer, data, element)
+            data.remove(element)
+
+        elif element.tag == 'data' and layer is not None:
+
+            if on_layer_data is not None:
+                on_layer_data(layer, element)
+
+            element.clear()
+
+    return root
+
+
+def parse_tmx_objects(root):
+    """Find the player's start position and the npcs among the
+    objects in the object layer of a TMX file.
+
+    Args:
+        root (Element): the ``<map>`` root element, e.g., from
+            :func:`parse_tmx`.
+
+    Returns:
+        tuple: the (x, y) player start position, and a list of the
+            (position, walkabout name, say text) of each npc.
+
+    Raises:
+        TMXMissingPlayerStartPosition: --
+
+    """
+
+    player_start_position = None
+    npc_properties = []
+
+    for tmx_object in root.findall(".//objectgroup/object"):
+        object_type = tmx_object.attrib['type']
+        x = int(tmx_object.attrib['x'])
+        y = int(tmx_object.attrib['y'])
+
+        if object_type == 'player_start_position':
+            player_start_position = (x, y)
+        elif object_type == 'npc':
+            properties = tmx_object.find('properties')
+            xpath = ".//property[@name='%s']"
+
+            position = (x, y)
+            walkabout_name = (properties.find(xpath % 'walkabout').
+                              attrib['value'])
+            say_text = properties.find(xpath % 'say').attrib['value']
+            npc_properties.append((position, walkabout_name, say_text))
+
+    if player_start_position is None:
+
+        raise TMXMissingPlayerStartPosition()
+
+    return player_start_position, npc_properties
+
+
+def decode_layer_data(data, width, height):
+    """Decode a TMX layer's ``<data>`` into an array of Tilesheet
+    tile IDs, without ever making a Python int per tile.
+
+    TMX tile IDs (GIDs) start at 1 and keep their flip flags in
+    their highest bits. Flags are dropped and IDs shifted down by
+    one, so empty cells (GID 0) become -1.
+
+    Args:
+        data (Element): a ``<data>`` element, encoded as CSV or
+            base64, optionally compressed with zlib or gzip.
+        width (int): the layer's width in tiles.
+        height (int): the layer's height in tiles.
+
+    Returns:
+        numpy.ndarray: (height, width) int32.
+
+    Raises:
+        TMXLayersNotCSV: the encoding or compression is
+            unsupported.
+        ValueError: there are more or fewer tiles than width *
+            height.
+
+    Example:
+        >>> data = ET.fromstring('<data encoding="base64" '
+        ...                      'compression="zlib">'
+        ...                      'eJxjZIAAJiBmBmIAADwABw==</data>')
+        >>> decode_layer_data(data, 2, 2).tolist()
+        [[0, -1], [1, 2]]
+
+    """
+
+    return decode_tile_ids(data.text, data.attrib.get('encoding'),
+                           data.attrib.get('compression'), width, height)
+
+
+def decode_tile_ids(text, encoding, compression, width, height):
+    """Decode the text of a TMX layer's ``<data>``, or of one of its
+    ``<chunk>``, into an array of Tilesheet tile IDs.
+
+    Args:
+        text (str|None): --
+        encoding (str): ``csv`` or ``base64``.
+        compression (str|None): ``zlib``, ``gzip`` or None.
+        width (int): in tiles.
+        height (int): in tiles.
+
+    Returns:
+        numpy.ndarray: see :func:`decode_layer_data`.
+
+    Raises:
+        TMXLayersNotCSV: see :func:`decode_layer_data`.
+        ValueError: see :func:`decode_layer_data`.
+
+    """
+
+    text = (text or '').strip()
+
+    if (encoding, compression) not in TMX.ENCODINGS:
+
+        raise TMXLayersNotCSV(encoding, compression)
+
+    if encoding == 'csv':
+        gids = numpy.fromstring(text.rstrip(','), dtype=numpy.int64,
+                                sep=',')
+    else:
+        raw = base64.b64decode(text)
+
+        if compression == 'zlib':
+            raw = zlib.decompress(raw)
+        elif compression == 'gzip':
+            raw = zlib.decompress(raw, 16 + zlib.MAX_WBITS)
+
+        gids = numpy.frombuffer(raw, dtype='<u4').astype(numpy.int64)
+
+    if len(gids) != width * height:
+
+        raise ValueError('tmx layer has %d tiles, not %dx%d' %
+                         (len(gids), width, height))
+
+    tile_ids = (gids & TMX.GID_MASK) - 1
+
+    return tile_ids.astype(numpy.int32).reshape((height, width))
+
+
+class TMX(object):
     """`TMX` object to represent and "translate"
     supported Scene data from a TMX file.
 
@@ -400,7 +1758,8 @@ class TMX(object):
     TMX file must have the following settings:
 
       * orientation: orthogonal
-      * tile layer format: csv
+      * tile layer format: csv, base64 (uncompressed), base64
+        (zlib compressed) or base64 (gzip compressed)
       * tile render order: right down
 
     You must also specify the tilesheet name you want to use
@@ -409,15 +1768,26 @@ class TMX(object):
 
     Constants:
         SUPPORTED (str): the TMX file format which is supported.
+        GID_MASK (int): the bits of a TMX tile ID (GID) which aren't
+            flip or rotation flags.
+        ENCODINGS (tuple): the supported (encoding, compression)
+            pairs of layer data.
 
     Attributes:
-        root (ElementTree): the XML ElementTree root of the TMX file.
+        root (ElementTree): the XML ElementTree root of the TMX file,
+            without the layers' data.
         player_start_position (tuple): (x, y) coordinate in which
             the player begins this scene at.
-        layers (list): a 3D list of tile IDs referring to a tile
-            by id in a Tilesheet. This data is extrapolated from
-            a CSV-format list of tile IDs.
-        npcs (List[players.Npc]): --
+        tilesheet_name (str): --
+        layers (numpy.ndarray): (depth, height, width) int32 tile IDs
+            referring to a tile by id in a Tilesheet. See
+            :func:`decode_layer_data`.
+        npc_properties (list): (position, walkabout name, say text)
+            of each npc, for :meth:`TMX.build`.
+        tilemap (tiles.TileMap|None): None until built.
+        npcs (List[players.Npc]): empty until built.
+        store (physics.ActorStore|None): the store of the npcs'
+            walkabouts, None until built.
 
     See Also:
         http://doc.mapeditor.org/reference/tmx-map-format/
@@ -425,31 +1795,51 @@ class TMX(object):
     """
 
     SUPPORTED = '1.0'
+    GID_MASK = 0x0fffffff
+    ENCODINGS = (('csv', None), ('base64', None), ('base64', 'zlib'),
+                 ('base64', 'gzip'))
 
-    def __init__(self, path_or_readable):
+    def __init__(self, path_or_readable, build=True):
         """Read XML from path_or_readable, validate the TMX as being
         supported by Hypatia, and set all supported information as
         attributes.
 
         Args:
             path_or_readable (str|file-like-object): This is
-                plopped right into ElementTree.parse().
+                plopped right into :func:`parse_tmx`.
+            build (bool): also build the tilemap and the npcs. If
+                False, the TMX is only parsed, which doesn't touch
+                pygame and so can happen in a background thread,
+                leaving :meth:`TMX.build` for the main thread.
+
+        Raises:
+            TMXVersionUnsupported: --
+            TMXTooManyTilesheets: --
+            TMXLayersNotCSV: a layer's data encoding or compression
+                is unsupported.
+            TMXInfiniteMap: --
+            TMXMissingPlayerStartPosition: --
 
         Note:
             This method is under-documented!
 
         """
 
-        # parse TMXML for TileMap-specific/supported data
-        tree = ET.parse(path_or_readable)
-        self.root = tree.getroot()  # <map ...>
+        # parse TMXML for TileMap-specific/supported data, decoding
+        # each layer's data as soon as it's read
+        layers = []
+
+        def decode_layer(layer, data):
+
+            if data.find('chunk') is not None:
 
-        # check the version first, make sure it's supported
-        map_version = self.root.attrib['version']
+                raise TMXInfiniteMap()
 
-        if map_version != self.SUPPORTED:
+            layers.append(decode_layer_data(data,
+                                            int(layer.attrib['width']),
+                                            int(layer.attrib['height'])))
 
-            raise TMXVersionUnsupported(map_version)
+        self.root = parse_tmx(path_or_readable, decode_layer)  # <map ...>
 
         # Get the Tilesheet (tileset) name from the tileset
         tileset_images = self.root.findall('.//tileset/image')
@@ -460,61 +1850,472 @@ class TMX(object):
             raise TMXTooManyTilesheets()
 
         tileset = self.root.find('.//tileset')
-        tilesheet_name = tileset.attrib['name']
+        self.tilesheet_name = tileset.attrib['name']
 
-        # get the 3D constructor/blueprint of TileMap,
-        # which simply references, by integer, the
-        # tile from tilesheet.
-        layers = []
+        # the 3D constructor/blueprint of TileMap, which simply
+        # references, by integer, the tile from tilesheet.
+        self.layers = numpy.array(layers)
+        self.tilemap = None
 
-        for layer_data in self.root.findall(".//layer/data"):
-            data_encoding = layer_data.attrib['encoding']
+        # the player's start position and NPC information
+        self.npcs = []
+        self.store = None
+        objects = parse_tmx_objects(self.root)
+        self.player_start_position, self.npc_properties = objects
 
-            if data_encoding != 'csv':
+        if build:
 
-                raise TMXLayersNotCSV(data_encoding)
+            for __ in self.build():
+                pass
 
-            layer_csv = layer_data.text.strip()
-            rows = layer_csv.split('\n')
-            parsed_rows = []
+    def build(self, rows_per_slice=None, store=None):
+        """Build the tilemap and the npcs, a slice at a time.
 
-            for row in rows:
-                # TMX tilesets start their ids at 1, Hypatia Tilesheets
-                # starts ids at 0.
-                cells = row.split(',')[:-1]  # trailing comma
-                parsed_row = [int(tile_id) - 1 for tile_id in cells]
-                parsed_rows.append(parsed_row)
+        Args:
+            rows_per_slice (int|None): see :meth:`tiles.TileMap.stitch`.
+            store (physics.ActorStore|None): the store for the npcs'
+                walkabouts, defaults to a new one.
 
-            layers.append(parsed_rows)
+        Yields:
+            float: how much is built, from 0 to 1, after each slice.
 
-        self.tilemap = tiles.TileMap(tilesheet_name, layers)
+        """
 
-        # loop through objects in the object layer to find the player's
-        # start position and NPC information.
+        self.tilemap = tiles.TileMap(self.tilesheet_name, self.layers,
+                                     stitched=False)
         self.npcs = []
-        self.player_start_position = None
+        slices = 1.0 + len(self.npc_properties)
+
+        # an empty store is falsy, so no "store or ..."
+        if store is None:
+            store = physics.ActorStore()
+
+        self.store = store
+
+        for progress in self.tilemap.stitch(rows_per_slice):
+
+            yield progress / slices
+
+        for position, walkabout_name, say_text in self.npc_properties:
+            walkabout = animations.Walkabout(walkabout_name, position,
+                                             store=self.store)
+            npc = player.Npc(walkabout=walkabout, say_text=say_text)
+            self.npcs.append(npc)
+
+            yield (1 + len(self.npcs)) / slices
+
+
+class MapChunk(object):
+    """A materialized chunk of a :class:`ChunkedTMX`.
+
+    Attributes:
+        coord (tuple): (x, y) chunk coordinate.
+        origin (tuple): (x, y) tile coordinate of its top left tile.
+        rect (pygame.Rect): the pixels it covers, in map coordinates.
+        tilemap (tiles.TileMap): its tiles, passability and animated
+            tiles, in coordinates relative to origin.
+
+    """
+
+    def __init__(self, coord, origin, rect, tilemap):
+        """
+
+        Args:
+            coord (tuple): --
+            origin (tuple): --
+            rect (pygame.Rect): --
+            tilemap (tiles.TileMap): --
+
+        """
+
+        self.coord = coord
+        self.origin = origin
+        self.rect = rect
+        self.tilemap = tilemap
+
+    def blit_layer(self, viewport, layer):
+        """Draw a layer of this chunk, with its animated tiles, on
+        viewport, if it's in view.
+
+        Args:
+            viewport (render.Viewport): --
+            layer (int): --
+
+        """
+
+        if not self.rect.colliderect(viewport.rect):
+
+            return None
+
+        left, top = self.rect.topleft
+        viewport.surface.blit(self.tilemap.layer_images[layer],
+                              viewport.relative_position((left, top)))
+
+        for tile_pyganim, position in self.tilemap.animated_tile_stack[layer]:
+            tile_pyganim.blit(viewport.surface,
+                              viewport.relative_position((left + position[0],
+                                                          top + position[1])))
+
+
+class ChunkedTMX(object):
+    """An infinite TMX map, whose layers Tiled saves in chunks, each
+    only decoded and stitched into a :class:`tiles.TileMap` once the
+    camera or simulation needs it.
+
+    Reading the file only indexes where the chunks are, keeping each
+    chunk's data as it was encoded (and compressed). Chunks are
+    materialized by :meth:`ChunkedTMX.chunk`, and
+    :meth:`ChunkedTMX.load_around` keeps the chunks around an area
+    materialized while evicting distant ones, so the whole map never
+    has to be resident.
+
+    Constants:
+        CHUNK_SIZE (tuple): Tiled's default (width, height) of a
+            chunk, assumed for a map without any.
+
+    Attributes:
+        root (Element): the ``<map>`` root element, without the
+            layers' data.
+        tilesheet (tiles.Tilesheet): shared by every chunk.
+        chunk_size (tuple): (width, height) of a chunk, in tiles.
+        depth (int): how many layers.
+        max_chunks (int): how many chunks may be materialized at
+            once; the least recently used are evicted first.
+        loaded (collections.OrderedDict): chunk coordinate ->
+            :class:`MapChunk`, least recently used first.
+        rect (pygame.Rect): the pixels covered by the chunks, e.g.,
+            for :meth:`render.Viewport.center_on`.
+
+    """
+
+    CHUNK_SIZE = (16, 16)
+
+    def __init__(self, path_or_readable, max_chunks=64):
+        """Index the chunks of the map at path_or_readable.
+
+        Args:
+            path_or_readable (str|file-like-object): This is
+                plopped right into :func:`parse_tmx`.
+            max_chunks (int): --
+
+        Raises:
+            TMXVersionUnsupported: --
+            TMXTooManyTilesheets: --
+            TMXLayersNotCSV: a layer's data encoding or compression
+                is unsupported.
+            ValueError: the map isn't infinite, or its chunks
+                aren't all the same size, or aren't aligned to it.
+
+        """
 
-        for tmx_object in self.root.findall(".//objectgroup/object"):
-            object_type = tmx_object.attrib['type']
-            x = int(tmx_object.attrib['x'])
-            y = int(tmx_object.attrib['y'])
+        self.chunk_size = None
+        self.max_chunks = max_chunks
+        self.loaded = collections.OrderedDict()
+        self._layers = []
 
-            if object_type == 'player_start_position':
-                self.player_start_position = (x, y)
-            elif object_type == 'npc':
-                properties = tmx_object.find('properties')
-                xpath = ".//property[@name='%s']"
+        # chunk coordinate -> {z: (encoding, compression, text)}
+        self._index = {}
 
-                position = (x, y)
-                walkabout_name = (properties.find(xpath % 'walkabout').
-                                  attrib['value'])
-                walkabout = animations.Walkabout(walkabout_name, position)
-                say_text = properties.find(xpath % 'say').attrib['value']
+        self.root = parse_tmx(path_or_readable, self._add_layer,
+                              self._add_chunk)
+
+        if self.root.attrib.get('infinite') != '1':
+
+            raise ValueError('tmx map is not infinite; load it as a TMX')
+
+        if len(self.root.findall('.//tileset/image')) > 1:
+
+            raise TMXTooManyTilesheets()
+
+        tilesheet_name = self.root.find('.//tileset').attrib['name']
+        self.tilesheet = tiles.Tilesheet.from_resources(tilesheet_name)
+        self.depth = len(self._layers)
+        self._layers = None
+        self._runtime_ready = False
+
+        self.chunk_size = self.chunk_size or ChunkedTMX.CHUNK_SIZE
+        tile_width, tile_height = self.tilesheet.tile_size
+        chunk_width, chunk_height = self.chunk_size
+
+        if self._index:
+            xs = [x for x, __ in self._index]
+            ys = [y for __, y in self._index]
+            self.rect = pygame.Rect(
+                min(xs) * chunk_width * tile_width,
+                min(ys) * chunk_height * tile_height,
+                (max(xs) - min(xs) + 1) * chunk_width * tile_width,
+                (max(ys) - min(ys) + 1) * chunk_height * tile_height,
+            )
+        else:
+            self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def __len__(self):
+
+        return len(self._index)
+
+    def __contains__(self, chunk_coord):
+
+        return tuple(chunk_coord) in self._index
+
+    def _z(self, layer):
+        """The depth of layer, counting it if it's new."""
+
+        if not self._layers or self._layers[-1] is not layer:
+            self._layers.append(layer)
+
+        return len(self._layers) - 1
+
+    def _add_layer(self, layer, data):
+        """Count layers, even those without chunks."""
+
+        self._z(layer)
+
+    def _add_chunk(self, layer, data, chunk):
+        """Index chunk, still encoded."""
+
+        encoding = data.attrib.get('encoding')
+        compression = data.attrib.get('compression')
+
+        if (encoding, compression) not in TMX.ENCODINGS:
+
+            raise TMXLayersNotCSV(encoding, compression)
+
+        x, y = int(chunk.attrib['x']), int(chunk.attrib['y'])
+        size = (int(chunk.attrib['width']), int(chunk.attrib['height']))
+
+        if self.chunk_size is None:
+            self.chunk_size = size
+
+        if size != self.chunk_size or x % size[0] or y % size[1]:
+
+            raise ValueError('tmx chunk at (%d, %d) is %dx%d, not aligned '
+                             'to %dx%d' % ((x, y) + size + self.chunk_size))
+
+        chunk_coord = (x // size[0], y // size[1])
+        encoded = (encoding, compression, chunk.text)
+        self._index.setdefault(chunk_coord, {})[self._z(layer)] = encoded
+
+    def chunk_coord(self, coord):
+        """The chunk coordinate of the chunk holding a tile.
+
+        Args:
+            coord (tuple): (x, y) tile coordinate.
+
+        Returns:
+            tuple: (x, y) chunk coordinate.
+
+        """
+
+        chunk_width, chunk_height = self.chunk_size
+
+        return (coord[0] // chunk_width, coord[1] // chunk_height)
+
+    def chunk(self, chunk_coord):
+        """The chunk at chunk_coord, materialized.
+
+        Args:
+            chunk_coord (tuple): (x, y) chunk coordinate.
+
+        Returns:
+            MapChunk|None: None where the map has no chunk.
+
+        """
+
+        chunk_coord = tuple(chunk_coord)
+
+        if chunk_coord in self.loaded:
+            map_chunk = self.loaded.pop(chunk_coord)
+        elif chunk_coord in self._index:
+            map_chunk = self.materialize(chunk_coord)
+
+            if len(self.loaded) >= self.max_chunks:
+                self.loaded.popitem(last=False)
+        else:
+
+            return None
+
+        self.loaded[chunk_coord] = map_chunk
+
+        return map_chunk
+
+    def materialize(self, chunk_coord, stitched=True):
+        """Decode and stitch the chunk at chunk_coord, without
+        keeping it in :attr:`ChunkedTMX.loaded`.
+
+        Args:
+            chunk_coord (tuple): (x, y) chunk coordinate of a chunk
+                in the map.
+            stitched (bool): if False, only decode the chunk and work
+                out its planes, which can happen in a background
+                thread, leaving :meth:`tiles.TileMap.stitch` (and
+                preparing the layer images) for the main thread.
+
+        Returns:
+            MapChunk: --
+
+        """
+
+        chunk_width, chunk_height = self.chunk_size
+        tile_width, tile_height = self.tilesheet.tile_size
+
+        # layers without this chunk are empty
+        layers = numpy.full((self.depth, chunk_height, chunk_width), -1,
+                            dtype=numpy.int32)
+
+        for z, encoded in self._index[chunk_coord].items():
+            encoding, compression, text = encoded
+            layers[z] = decode_tile_ids(text, encoding, compression,
+                                        chunk_width, chunk_height)
+
+        tilemap = tiles.TileMap(self.tilesheet.name, layers,
+                                tilesheet=self.tilesheet, stitched=stitched)
+
+        if stitched and self._runtime_ready:
+            tilemap.layer_images = [render.prepare_surface(image)
+                                    for image in tilemap.layer_images]
+
+        origin = (chunk_coord[0] * chunk_width,
+                  chunk_coord[1] * chunk_height)
+        rect = pygame.Rect(origin[0] * tile_width, origin[1] * tile_height,
+                           chunk_width * tile_width,
+                           chunk_height * tile_height)
+
+        return MapChunk(chunk_coord, origin, rect, tilemap)
+
+    def chunks_in_rect(self, rect, margin=0):
+        """The chunk coordinates of the map's chunks overlapping rect.
+
+        Args:
+            rect (pygame.Rect): in pixels.
+            margin (int): also include this many chunks around rect.
+
+        Returns:
+            list: (x, y) chunk coordinates, row by row.
+
+        """
+
+        chunk_width, chunk_height = self.chunk_size
+        tile_width, tile_height = self.tilesheet.tile_size
+        chunk_pixel_width = chunk_width * tile_width
+        chunk_pixel_height = chunk_height * tile_height
+        first_x = rect.left // chunk_pixel_width - margin
+        first_y = rect.top // chunk_pixel_height - margin
+        last_x = (max(rect.right, rect.left + 1) - 1) // chunk_pixel_width
+        last_y = (max(rect.bottom, rect.top + 1) - 1) // chunk_pixel_height
+
+        return [(x, y)
+                for y in range(first_y, last_y + margin + 1)
+                for x in range(first_x, last_x + margin + 1)
+                if (x, y) in self._index]
+
+    def load_around(self, rect, margin=1):
+        """Materialize the chunks overlapping rect, and those margin
+        chunks around it, and evict the chunks more than margin + 1
+        chunks away.
+
+        Call with the viewport's rect every frame, or with the area
+        the simulation is running in.
+
+        Args:
+            rect (pygame.Rect): in pixels.
+            margin (int): how many chunks around rect to load ahead.
+
+        Returns:
+            list: the :class:`MapChunk` overlapping rect.
+
+        """
+
+        keep = set(self.chunks_in_rect(rect, margin + 1))
+
+        for chunk_coord in [chunk_coord for chunk_coord in self.loaded
+                            if chunk_coord not in keep]:
+            self.evict(chunk_coord)
+
+        for chunk_coord in self.chunks_in_rect(rect, margin):
+            self.chunk(chunk_coord)
+
+        return [self.chunk(chunk_coord)
+                for chunk_coord in self.chunks_in_rect(rect)]
+
+    def update(self, rect, velocity=(0, 0)):
+        """Load the chunks around rect, for a :class:`StreamedScene`.
+        See :meth:`ChunkedTMX.load_around`.
+
+        Args:
+            rect (pygame.Rect): in pixels.
+            velocity (tuple): unused; chunks are materialized as
+                soon as they're needed, not ahead of time.
+
+        Returns:
+            list: the :class:`MapChunk` overlapping rect.
+
+        """
+
+        return self.load_around(rect)
+
+    def evict(self, chunk_coord):
+        """Forget the materialized chunk at chunk_coord, if any. It's
+        decoded again when it's next needed.
+
+        Args:
+            chunk_coord (tuple): (x, y) chunk coordinate.
+
+        """
+
+        self.loaded.pop(tuple(chunk_coord), None)
+
+    def impassable(self, coord):
+        """Whether the tile at coord is impassable, materializing its
+        chunk if needed. Where the map has no chunk, nothing is.
+
+        Args:
+            coord (tuple): (x, y) tile coordinate.
+
+        Returns:
+            bool: --
+
+        """
+
+        map_chunk = self.chunk(self.chunk_coord(coord))
+
+        if map_chunk is None:
+
+            return False
+
+        x = coord[0] - map_chunk.origin[0]
+        y = coord[1] - map_chunk.origin[1]
+
+        return bool(map_chunk.tilemap.impassability[y, x])
+
+    def blit_layer(self, viewport, layer):
+        """Draw a layer of the loaded chunks in view, with their
+        animated tiles, on viewport. Chunks which aren't loaded
+        aren't drawn; see :meth:`ChunkedTMX.load_around`.
+
+        Args:
+            viewport (render.Viewport): --
+            layer (int): --
+
+        """
+
+        for map_chunk in self.loaded.values():
+            map_chunk.blit_layer(viewport, layer)
+
+    def runtime_setup(self):
+        """Prepare the loaded chunks, and those materialized from now
+        on, for fast blitting, and play the animated tiles. See
+        :meth:`tiles.TileMap.runtime_setup`.
+
+        """
 
-                npc = player.Npc(walkabout=walkabout, say_text=say_text)
-                self.npcs.append(npc)
+        self._runtime_ready = True
 
-        # should use xpath before loading all npcs...
-        if self.player_start_position is None:
+        for map_chunk in self.loaded.values():
+            map_chunk.tilemap.layer_images = [
+                render.prepare_surface(image)
+                for image in map_chunk.tilemap.layer_images
+            ]
 
-            raise TMXMissingPlayerStartPosition()
+        for tile_pyganim in self.tilesheet.animated_tiles.values():
+            animations.convert_animation(tile_pyganim)
+            tile_pyganim.play()
@@ -0,0 +1,864 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Finding paths between tiles, around impassable ones.
+
+Paths are searched for with A* over a tile map's passability, kept
+as one flat list of bools so each step of the search is a list
+lookup rather than a :class:`tiles.TileMap` lookup. Actors move in
+the four cardinal directions, so paths do too.
+
+A :class:`Pathfinder` keeps the passability of a tile map up to
+date as its tiles are edited, and caches the paths it finds. When a
+tile changes, only the cached paths it could affect are forgotten.
+
+When many actors head for the same place, a :class:`FlowField` finds
+the way there from every tile at once, with one breadth first search
+outward from the goal. Any number of actors can then look up which
+way to step from the tile they're on.
+
+Example:
+    >>> impassability = numpy.array([[0, 0, 0],
+    ...                              [1, 1, 0],
+    ...                              [0, 0, 0]], dtype=bool)
+    >>> find_path(impassability, (0, 2), (0, 0))
+    [(0, 2), (1, 2), (2, 2), (2, 1), (2, 0), (1, 0), (0, 0)]
+
+See Also:
+    * :attr:`tiles.TileMap.impassability`
+    * :meth:`tiles.TileMap.set_tile`
+
+"""
+
+import heapq
+import collections
+
+import numpy
+
+from hypatia import constants
+
+
+# (dx, dy, direction value) of each step, in order of preference
+# when more than one is as short
+STEPS = ((0, -1, constants.Direction.north.value),
+         (1, 0, constants.Direction.east.value),
+         (0, 1, constants.Direction.south.value),
+         (-1, 0, constants.Direction.west.value))
+
+
+def find_path(impassability, start, goal):
+    """The shortest path from start to goal, one tile at a time.
+
+    Args:
+        impassability (numpy.ndarray): (height, width) bools, True
+            where a tile can't be walked on.
+        start (tuple): (x, y) tile coordinate.
+        goal (tuple): (x, y) tile coordinate.
+
+    Returns:
+        list|None: (x, y) tile coordinates from start to goal,
+            both included, or None if there's no path.
+
+    """
+
+    height, width = impassability.shape
+
+    return search(impassability.ravel().tolist(), width, height,
+                  start, goal)
+
+
+def search(blocked, width, height, start, goal):
+    """A* search on a flattened passability grid, with a binary heap
+    for the open set and the Manhattan distance as the heuristic.
+
+    Args:
+        blocked (list): width * height bools, row by row; True where
+            a tile can't be walked on.
+        width (int): in tiles.
+        height (int): in tiles.
+        start (tuple): (x, y) tile coordinate.
+        goal (tuple): (x, y) tile coordinate.
+
+    Returns:
+        list|None: see :func:`find_path`.
+
+    """
+
+    start_x, start_y = start
+    goal_x, goal_y = goal
+
+    for x, y in (start, goal):
+
+        if not (0 <= x < width and 0 <= y < height):
+
+            return None
+
+    start_index = start_y * width + start_x
+    goal_index = goal_y * width + goal_x
+
+    if blocked[start_index] or blocked[goal_index]:
+
+        return None
+
+    size = width * height
+    costs = {start_index: 0}
+    came_from = {}
+
+    # (estimated total cost, -cost so far, index): on ties, expand
+    # whatever is furthest along first
+    open_heap = [(abs(start_x - goal_x) + abs(start_y - goal_y), 0,
+                  start_index)]
+
+    while open_heap:
+        __, negative_cost, index = heapq.heappop(open_heap)
+
+        if index == goal_index:
+
+            return _walk_back(came_from, index, width)
+
+        cost = -negative_cost
+
+        # already reached more cheaply
+        if cost > costs[index]:
+
+            continue
+
+        x = index % width
+        neighbors = []
+
+        if x > 0:
+            neighbors.append(index - 1)
+
+        if x < width - 1:
+            neighbors.append(index + 1)
+
+        if index >= width:
+            neighbors.append(index - width)
+
+        if index < size - width:
+            neighbors.append(index + width)
+
+        neighbor_cost = cost + 1
+
+        for neighbor in neighbors:
+
+            if blocked[neighbor]:
+
+                continue
+
+            if neighbor_cost < costs.get(neighbor, size):
+                costs[neighbor] = neighbor_cost
+                came_from[neighbor] = index
+                neighbor_x = neighbor % width
+                neighbor_y = neighbor // width
+                estimate = (neighbor_cost + abs(neighbor_x - goal_x) +
+                            abs(neighbor_y - goal_y))
+                heapq.heappush(open_heap,
+                               (estimate, -neighbor_cost, neighbor))
+
+    return None
+
+
+def label_regions(passable):
+    """Label each group of passable tiles connected to each other
+    by steps in the four cardinal directions.
+
+    Every tile starts labelled by its own position. Then, until
+    nothing changes, each row and column of passable tiles takes the
+    smallest label in it, and each label jumps to the label of the
+    tile it names, which spreads small labels quickly across big
+    regions. All of this is done on whole arrays at once.
+
+    Args:
+        passable (numpy.ndarray): (height, width) bools.
+
+    Returns:
+        numpy.ndarray: (height, width) int32; 0 for impassable
+            tiles, and 1, 2, 3... for the regions, numbered in the
+            order their first tile is found row by row.
+
+    Example:
+        >>> passable = numpy.array([[1, 0, 1],
+        ...                         [1, 0, 0],
+        ...                         [1, 1, 1]], dtype=bool)
+        >>> label_regions(passable).tolist()
+        [[1, 0, 2], [1, 0, 0], [1, 1, 1]]
+
+    """
+
+    height, width = passable.shape
+    passable_cells = numpy.flatnonzero(passable)
+    labels = numpy.zeros(height * width, dtype=numpy.int64)
+    labels[passable_cells] = passable_cells + 1
+
+    # (cells, where each run starts, which run each cell is in) for
+    # the unbroken runs of passable tiles along rows, then columns
+    runs = []
+
+    for lines in (passable, passable.T):
+        line_length = lines.shape[1]
+        cells = numpy.flatnonzero(lines)
+        starts = numpy.ones(len(cells), dtype=bool)
+        starts[1:] = ((cells[1:] != cells[:-1] + 1) |
+                      (cells[1:] % line_length == 0))
+
+        if lines is not passable:
+            cells = (cells % line_length) * width + cells // line_length
+
+        runs.append((cells, numpy.flatnonzero(starts),
+                     numpy.cumsum(starts) - 1))
+
+    while len(passable_cells):
+        previous = labels.copy()
+
+        for cells, run_starts, run_of_cell in runs:
+            run_smallest = numpy.minimum.reduceat(labels[cells], run_starts)
+            labels[cells] = run_smallest[run_of_cell]
+
+        # a label names a tile in the same region, with a label
+        # as small or smaller
+        while True:
+            jumped = labels[labels[passable_cells] - 1]
+
+            if numpy.array_equal(jumped, labels[passable_cells]):
+
+                break
+
+            labels[passable_cells] = jumped
+
+        if numpy.array_equal(labels, previous):
+
+            break
+
+    # number regions 1, 2, 3...; impassable tiles are the 0s
+    __, numbered = numpy.unique(labels, return_inverse=True)
+
+    if len(passable_cells) == len(labels):
+        numbered += 1
+
+    return numbered.reshape((height, width)).astype(numpy.int32)
+
+
+def region_bounds(labels, offset=(0, 0)):
+    """The bounds of each region of labels, e.g., from
+    :func:`label_regions`.
+
+    Args:
+        labels (numpy.ndarray): (height, width) ints; 0 where there's
+            no region.
+        offset (tuple): (x, y) added to the bounds, if labels is part
+            of a bigger grid.
+
+    Returns:
+        dict: label -> (left, top, right, bottom) of the tiles it
+            covers, right and bottom exclusive.
+
+    Example:
+        >>> labels = numpy.array([[1, 0, 2],
+        ...                       [1, 1, 0]])
+        >>> sorted(region_bounds(labels).items())
+        [(1, (0, 0, 2, 2)), (2, (2, 0, 3, 1))]
+
+    """
+
+    rows, columns = numpy.nonzero(labels)
+
+    if not len(rows):
+
+        return {}
+
+    region_labels = labels[rows, columns]
+    count = int(region_labels.max()) + 1
+    height, width = labels.shape
+    lefts = numpy.full(count, width, dtype=numpy.int64)
+    tops = numpy.full(count, height, dtype=numpy.int64)
+    rights = numpy.zeros(count, dtype=numpy.int64)
+    bottoms = numpy.zeros(count, dtype=numpy.int64)
+    numpy.minimum.at(lefts, region_labels, columns)
+    numpy.minimum.at(tops, region_labels, rows)
+    numpy.maximum.at(rights, region_labels, columns + 1)
+    numpy.maximum.at(bottoms, region_labels, rows + 1)
+    x, y = offset
+
+    return {label: (int(lefts[label]) + x, int(tops[label]) + y,
+                    int(rights[label]) + x, int(bottoms[label]) + y)
+            for label in numpy.unique(region_labels).tolist()}
+
+
+def _walk_back(came_from, index, width):
+    """The path to index, following came_from back to the start."""
+
+    path = [(index % width, index // width)]
+
+    while index in came_from:
+        index = came_from[index]
+        path.append((index % width, index // width))
+
+    path.reverse()
+
+    return path
+
+
+class Pathfinder(object):
+    """Finds and caches paths on a :class:`tiles.TileMap`, keeping up
+    with edits through :attr:`tiles.TileMap.tile_listeners`.
+
+    Cached paths are indexed by the regions (squares of
+    :attr:`Pathfinder.region_size` tiles) they pass through. When a
+    tile becomes impassable, only the paths through its region are
+    checked, and only those actually crossing the tile are
+    forgotten. When a tile becomes passable, only the paths it could
+    make shorter are forgotten.
+
+    Requests are looked up by the pair of regions their start and
+    goal are in. A cached path between those regions which passes
+    through the start, then the goal, already holds a shortest path
+    between them, since every part of a shortest path is a shortest
+    path too.
+
+    Requests between tiles which can't reach each other, by
+    :meth:`tiles.TileMap.reachable`, are turned down without
+    searching.
+
+    Attributes:
+        tilemap (tiles.TileMap): --
+        region_size (int): the width and height of a region, in
+            tiles.
+        max_paths (int): how many paths to cache; the least
+            recently used are forgotten first.
+        hits (int): how many paths came from the cache.
+        misses (int): how many paths were searched for.
+
+    Example:
+        >>> from hypatia import tiles
+        >>> tilemap = tiles.TileMap('debug', [[[11, 11, 11],
+        ...                                     [11, 11, 11]]])
+        >>> pathfinder = Pathfinder(tilemap)
+        >>> pathfinder.find_path((0, 0), (2, 0))
+        ((0, 0), (1, 0), (2, 0))
+        >>> tilemap.set_tile((1, 0), 0, 99)
+        >>> pathfinder.find_path((0, 0), (2, 0))
+        ((0, 0), (0, 1), (1, 1), (2, 1), (2, 0))
+
+    """
+
+    def __init__(self, tilemap, region_size=8, max_paths=1024):
+        """Start following tilemap's edits.
+
+        Args:
+            tilemap (tiles.TileMap): --
+            region_size (int): --
+            max_paths (int): --
+
+        """
+
+        self.tilemap = tilemap
+        self.region_size = region_size
+        self.max_paths = max_paths
+        self.hits = 0
+        self.misses = 0
+
+        self._height, self._width = tilemap.impassability.shape
+        self._blocked = tilemap.impassability.ravel().tolist()
+
+        # (start, goal) -> path tuple, least recently used first
+        self._paths = collections.OrderedDict()
+
+        # region -> the (start, goal) keys of paths through it
+        self._by_region = collections.defaultdict(set)
+
+        # (start region, goal region) -> the (start, goal) keys of
+        # paths between them
+        self._by_region_pair = collections.defaultdict(set)
+
+        tilemap.tile_listeners.append(self.tiles_changed)
+
+    def __len__(self):
+
+        return len(self._paths)
+
+    def region(self, coord):
+        """The region tile coordinate coord is in.
+
+        Args:
+            coord (tuple): (x, y)
+
+        Returns:
+            tuple: (region x, region y)
+
+        """
+
+        return (coord[0] // self.region_size, coord[1] // self.region_size)
+
+    def find_path(self, start, goal):
+        """The shortest path from start to goal, from the cache if
+        possible.
+
+        Args:
+            start (tuple): (x, y) tile coordinate.
+            goal (tuple): (x, y) tile coordinate.
+
+        Returns:
+            tuple|None: (x, y) tile coordinates from start to goal,
+                both included, or None if there's no path.
+
+        """
+
+        key = (tuple(start), tuple(goal))
+
+        if not self.tilemap.reachable(key[0], key[1]):
+
+            return None
+
+        cached = self._cached_path(key)
+
+        if cached is not None:
+            self.hits += 1
+
+            return cached
+
+        self.misses += 1
+        path = search(self._blocked, self._width, self._height,
+                      key[0], key[1])
+
+        if path is None:
+
+            return None
+
+        path = tuple(path)
+        self._remember(key, path)
+
+        return path
+
+    def tiles_changed(self, tilemap, coords):
+        """Catch up with the passability of the tiles at coords,
+        forgetting the cached paths the changes could affect.
+
+        Called by :meth:`tiles.TileMap.set_tile` and
+        :meth:`tiles.TileMap.replace_tiles`.
+
+        Args:
+            tilemap (tiles.TileMap): --
+            coords (list): (x, y) tile coordinates.
+
+        """
+
+        blocked_coords = set()
+        cleared_coords = []
+
+        for x, y in coords:
+            index = y * self._width + x
+            blocked = bool(tilemap.impassability[y, x])
+
+            if blocked == self._blocked[index]:
+
+                continue
+
+            self._blocked[index] = blocked
+
+            if blocked:
+                blocked_coords.add((x, y))
+            else:
+                cleared_coords.append((x, y))
+
+        stale = set()
+
+        for region in set(self.region(coord) for coord in blocked_coords):
+            stale.update(key for key in self._by_region.get(region, ())
+                         if not blocked_coords.isdisjoint(self._paths[key]))
+
+        if cleared_coords:
+            cleared = numpy.array(cleared_coords)
+
+            for key, path in self._paths.items():
+                start, goal = key
+
+                # a path through a cleared tile is at least this long
+                shortest_via = (numpy.abs(cleared - start).sum(axis=1) +
+                                numpy.abs(cleared - goal).sum(axis=1))
+
+                if shortest_via.min() < len(path) - 1:
+                    stale.add(key)
+
+        for key in stale:
+            self._forget(key)
+
+    def release(self):
+        """Stop following the tilemap's edits."""
+
+        self.tilemap.tile_listeners.remove(self.tiles_changed)
+
+    def clear(self):
+        """Forget every cached path."""
+
+        self._paths.clear()
+        self._by_region.clear()
+        self._by_region_pair.clear()
+
+    def _cached_path(self, key):
+        """The cached path from start to goal, or the part from start
+        to goal of a cached path between their regions, marking the
+        path as recently used."""
+
+        start, goal = key
+
+        if key in self._paths:
+            keys = [key]
+        else:
+            keys = self._by_region_pair.get(self._region_pair(key), ())
+
+        for path_key in keys:
+            path = self._paths[path_key]
+
+            try:
+                first = path.index(start)
+                last = path.index(goal, first)
+            except ValueError:
+
+                continue
+
+            del self._paths[path_key]
+            self._paths[path_key] = path
+
+            return path[first:last + 1]
+
+        return None
+
+    def _region_pair(self, key):
+
+        return (self.region(key[0]), self.region(key[1]))
+
+    def _remember(self, key, path):
+
+        self._paths[key] = path
+        self._by_region_pair[self._region_pair(key)].add(key)
+
+        for region in self._regions(path):
+            self._by_region[region].add(key)
+
+        if len(self._paths) > self.max_paths:
+            self._forget(next(iter(self._paths)))
+
+    def _forget(self, key):
+
+        path = self._paths.pop(key)
+        region_pair = self._region_pair(key)
+        keys = self._by_region_pair[region_pair]
+        keys.discard(key)
+
+        if not keys:
+            del self._by_region_pair[region_pair]
+
+        for region in self._regions(path):
+            keys = self._by_region[region]
+            keys.discard(key)
+
+            if not keys:
+                del self._by_region[region]
+
+    def _regions(self, path):
+
+        return set(self.region(coord) for coord in path)
+
+
+class Wavefront(object):
+    """A breadth first search outward from a goal tile over a whole
+    passability grid, one ring of tiles per step, with each ring
+    found by NumPy at once.
+
+    It can be run all at once, or a few rings at a time across
+    frames.
+
+    Attributes:
+        goal (tuple): (x, y) tile coordinate.
+        distances (numpy.ndarray): (height, width) int32; steps from
+            each tile to goal, -1 for tiles not reached (yet).
+        done (bool): True once every reachable tile has been
+            reached.
+
+    Example:
+        >>> impassability = numpy.array([[0, 1, 0],
+        ...                              [0, 0, 0]], dtype=bool)
+        >>> wavefront = Wavefront(impassability, (0, 0))
+        >>> wavefront.run()
+        True
+        >>> wavefront.distances.tolist()
+        [[0, -1, 4], [1, 2, 3]]
+
+    """
+
+    def __init__(self, impassability, goal):
+        """
+
+        Args:
+            impassability (numpy.ndarray): (height, width) bools.
+            goal (tuple): (x, y) tile coordinate.
+
+        """
+
+        self.goal = tuple(goal)
+        height, width = impassability.shape
+        self._width = width
+        self._passable = ~impassability.ravel()
+        self._distances = numpy.full(height * width, -1, dtype=numpy.int32)
+        self.distances = self._distances.reshape((height, width))
+        self._step = 0
+        goal_x, goal_y = self.goal
+
+        if (0 <= goal_x < width and 0 <= goal_y < height and
+                self._passable[goal_y * width + goal_x]):
+            self._frontier = numpy.array([goal_y * width + goal_x])
+            self._distances[self._frontier] = 0
+        else:
+            self._frontier = numpy.zeros(0, dtype=numpy.int64)
+
+    @property
+    def done(self):
+
+        return not len(self._frontier)
+
+    def run(self, max_steps=None):
+        """Reach out max_steps more rings of tiles, or until done.
+
+        Args:
+            max_steps (Optional[int]): None for no limit.
+
+        Returns:
+            bool: :attr:`Wavefront.done`.
+
+        """
+
+        width = self._width
+        size = len(self._distances)
+        steps = 0
+
+        while len(self._frontier) and (max_steps is None or
+                                       steps < max_steps):
+            frontier = self._frontier
+            x = frontier % width
+            neighbors = numpy.concatenate((frontier[x > 0] - 1,
+                                           frontier[x < width - 1] + 1,
+                                           frontier[frontier >= width] -
+                                           width,
+                                           frontier[frontier < size - width] +
+                                           width))
+            neighbors = neighbors[self._passable[neighbors] &
+                                  (self._distances[neighbors] < 0)]
+            self._step += 1
+            self._frontier = numpy.unique(neighbors)
+            self._distances[self._frontier] = self._step
+            steps += 1
+
+        return self.done
+
+
+def downhill(distances):
+    """Which way to step from each tile to get closer to where the
+    distances are measured from.
+
+    Args:
+        distances (numpy.ndarray): (height, width) ints, -1 where
+            unreachable, like :attr:`Wavefront.distances`.
+
+    Returns:
+        numpy.ndarray: (height, width) uint8; the value of a
+            cardinal :class:`constants.Direction`, or 0 at the goal
+            and unreachable tiles.
+
+    Example:
+        >>> downhill(numpy.array([[0, 1, 2], [-1, -1, 3]])).tolist()
+        [[0, 8, 8], [0, 0, 1]]
+
+    """
+
+    height, width = distances.shape
+    padded = numpy.full((height + 2, width + 2), -1, dtype=distances.dtype)
+    padded[1:-1, 1:-1] = distances
+    conditions = []
+    choices = []
+
+    for step_x, step_y, direction_value in STEPS:
+        neighbor = padded[1 + step_y:1 + step_y + height,
+                          1 + step_x:1 + step_x + width]
+        conditions.append((distances > 0) & (neighbor == distances - 1))
+        choices.append(direction_value)
+
+    return numpy.select(conditions, choices, 0).astype(numpy.uint8)
+
+
+class FlowField(object):
+    """The way to a goal from every tile of a :class:`tiles.TileMap`,
+    shared by any number of actors heading there.
+
+    Moving the goal, or editing the tilemap, starts a new
+    :class:`Wavefront` in the background. The old field is used
+    until :meth:`FlowField.refresh` has finished the new one, so the
+    work can be spread over several frames.
+
+    Attributes:
+        tilemap (tiles.TileMap): --
+        goal (tuple): the (x, y) tile coordinate the field currently
+            leads to.
+        distances (numpy.ndarray): (height, width) int32; steps to
+            goal, -1 where unreachable.
+        directions (numpy.ndarray): (height, width) uint8; see
+            :func:`downhill`.
+        steps (numpy.ndarray): (height, width, 2) int8; the (x, y)
+            unit step of each tile's direction.
+
+    Example:
+        >>> from hypatia import tiles
+        >>> tilemap = tiles.TileMap('debug', [[[11, 11, 11]]])
+        >>> flow_field = FlowField(tilemap, (2, 0))
+        >>> flow_field.direction_at((0, 0))
+        <Direction.east: 2>
+        >>> flow_field.set_goal((0, 0))
+        >>> flow_field.refresh(max_steps=1)
+        False
+        >>> flow_field.direction_at((2, 0))
+        >>> flow_field.refresh()
+        True
+        >>> flow_field.direction_at((2, 0))
+        <Direction.west: 8>
+
+    """
+
+    def __init__(self, tilemap, goal):
+        """Find the way to goal from everywhere, then follow
+        tilemap's edits.
+
+        Args:
+            tilemap (tiles.TileMap): --
+            goal (tuple): (x, y) tile coordinate.
+
+        """
+
+        self.tilemap = tilemap
+        self._pending = None
+        wavefront = Wavefront(tilemap.impassability, goal)
+        wavefront.run()
+        self._apply(wavefront)
+        tilemap.tile_listeners.append(self.tiles_changed)
+
+    def set_goal(self, goal):
+        """Start leading to goal, once :meth:`FlowField.refresh` has
+        caught up. Nothing to do if goal is already the goal.
+
+        Args:
+            goal (tuple): (x, y) tile coordinate.
+
+        """
+
+        goal = tuple(goal)
+        pending_goal = self._pending.goal if self._pending else self.goal
+
+        if goal != pending_goal:
+            self._pending = Wavefront(self.tilemap.impassability, goal)
+
+    def tiles_changed(self, tilemap, coords):
+        """Start over from the current goal with the edited tiles,
+        once for however many of them there are.
+
+        Called by :meth:`tiles.TileMap.set_tile` and
+        :meth:`tiles.TileMap.replace_tiles`.
+
+        """
+
+        goal = self._pending.goal if self._pending else self.goal
+        self._pending = Wavefront(tilemap.impassability, goal)
+
+    def release(self):
+        """Stop following the tilemap's edits."""
+
+        self.tilemap.tile_listeners.remove(self.tiles_changed)
+
+    def refresh(self, max_steps=None):
+        """Work on the new field, if there is one, using it once
+        it's done.
+
+        Args:
+            max_steps (Optional[int]): how many rings of tiles to
+                search this time, see :meth:`Wavefront.run`.
+
+        Returns:
+            bool: True if the field is up to date.
+
+        """
+
+        if self._pending is None:
+
+            return True
+
+        if self._pending.run(max_steps):
+            self._apply(self._pending)
+            self._pending = None
+
+            return True
+
+        return False
+
+    def direction_at(self, coord):
+        """Which way to step from a tile.
+
+        Args:
+            coord (tuple): (x, y) tile coordinate.
+
+        Returns:
+            constants.Direction|None: None at the goal, or where the
+                goal can't be reached from.
+
+        """
+
+        x, y = coord
+        value = self.directions[y, x]
+
+        return constants.Direction(value) if value else None
+
+    def sample(self, positions):
+        """The steps to take from many pixel positions at once.
+
+        Args:
+            positions (numpy.ndarray): (n, 2) (x, y) pixel positions,
+                e.g., the centers of actors. Positions off the map
+                get (0, 0).
+
+        Returns:
+            numpy.ndarray: (n, 2) int8 (x, y) unit steps.
+
+        """
+
+        tile_width, tile_height = self.tilemap.tilesheet.tile_size
+        height, width = self.directions.shape
+        tile_x = numpy.floor_divide(positions[:, 0], tile_width).astype(int)
+        tile_y = numpy.floor_divide(positions[:, 1], tile_height).astype(int)
+        on_map = ((tile_x >= 0) & (tile_x < width) &
+                  (tile_y >= 0) & (tile_y < height))
+        steps = numpy.zeros((len(positions), 2), dtype=numpy.int8)
+        steps[on_map] = self.steps[tile_y[on_map], tile_x[on_map]]
+
+        return steps
+
+    def steer(self, store, slots, speed):
+        """Point the velocities of the actors in store's slots along
+        the field, from the center of each.
+
+        Args:
+            store (physics.ActorStore): --
+            slots (numpy.ndarray): --
+            speed (float): pixels per second.
+
+        """
+
+        centers = store.positions[slots] + store.sizes[slots] / 2.0
+        store.velocities[slots] = self.sample(centers) * float(speed)
+
+    def _apply(self, wavefront):
+
+        self.goal = wavefront.goal
+        self.distances = wavefront.distances
+        self.directions = downhill(wavefront.distances)
+        self.steps = numpy.zeros(self.directions.shape + (2,),
+                                 dtype=numpy.int8)
+
+        for step_x, step_y, direction_value in STEPS:
+            self.steps[self.directions == direction_value] = (step_x, step_y)
@@ -9,6 +9,7 @@ See Also:
 
 """
 
+import numpy
 import pygame
 
 from hypatia import constants
@@ -30,6 +31,497 @@ class Velocity(object):
         self.y = y
 
 
+class StoredVelocity(Velocity):
+    """A :class:`Velocity` which lives in an :class:`ActorStore`.
+
+    Attributes:
+        store (ActorStore): --
+        slot (int): the index of the velocity in the store's arrays.
+
+    Example:
+        >>> store = ActorStore()
+        >>> velocity = StoredVelocity(store, store.add())
+        >>> velocity.x = 20
+        >>> store.velocities[velocity.slot].tolist()
+        [20.0, 0.0]
+
+    """
+
+    def __init__(self, store, slot):
+        """
+
+        Args:
+            store (ActorStore): --
+            slot (int): --
+
+        """
+
+        self.store = store
+        self.slot = slot
+
+    @property
+    def x(self):
+
+        return float(self.store.velocities[self.slot, 0])
+
+    @x.setter
+    def x(self, x):
+        self.store.velocities[self.slot, 0] = x
+
+    @property
+    def y(self):
+
+        return float(self.store.velocities[self.slot, 1])
+
+    @y.setter
+    def y(self, y):
+        self.store.velocities[self.slot, 1] = y
+
+
+class ActorStore(object):
+    """The positions, velocities, directions and sizes of many actors,
+    each kept in one NumPy array (a "struct of arrays"), so they can
+    be moved, culled and collided all at once with a few array
+    operations rather than one actor at a time.
+
+    Each actor owns a slot, its index into every array. The
+    :class:`animations.Walkabout` and :class:`actor.Actor` of an actor
+    are views of its slot: setting a walkabout's ``topleft_float``
+    writes to :attr:`ActorStore.positions`, and so on.
+
+    The arrays grow as slots are added, so always index them through
+    the store, rather than keeping a reference to an array.
+
+    Constants:
+        DEFAULT (ActorStore|None): see :meth:`ActorStore.default`.
+
+    Attributes:
+        positions (numpy.ndarray): (capacity, 2) floats; the top left
+            of each actor in pixels.
+        velocities (numpy.ndarray): (capacity, 2) floats; pixels per
+            second per axis.
+        directions (numpy.ndarray): (capacity,) uint8; the value of
+            each actor's :class:`constants.Direction`.
+        sizes (numpy.ndarray): (capacity, 2) ints; width and height.
+        alive (numpy.ndarray): (capacity,) bools; which slots are in
+            use.
+        solid (numpy.ndarray): (capacity,) bools; which slots block
+            other actors' movement, see :func:`move_actors`. Only
+            slots belonging to an :class:`actor.Actor` are solid,
+            e.g., a hat's walkabout isn't.
+
+    Example:
+        >>> store = ActorStore(capacity=1)
+        >>> store.add(position=(10, 10), size=(6, 8))
+        0
+        >>> store.add(position=(90, 90), size=(6, 8))
+        1
+        >>> store.in_rect(pygame.Rect(0, 0, 32, 32)).tolist()
+        [0]
+
+    """
+
+    DEFAULT = None
+
+    def __init__(self, capacity=64):
+        """
+
+        Args:
+            capacity (int): how many slots to make room for up front.
+
+        """
+
+        self.positions = numpy.zeros((capacity, 2))
+        self.velocities = numpy.zeros((capacity, 2))
+        self.directions = numpy.zeros(capacity, dtype=numpy.uint8)
+        self.sizes = numpy.zeros((capacity, 2), dtype=numpy.int32)
+        self.alive = numpy.zeros(capacity, dtype=bool)
+        self.solid = numpy.zeros(capacity, dtype=bool)
+        self._free_slots = list(range(capacity - 1, -1, -1))
+
+    @classmethod
+    def default(cls):
+        """The store walkabouts use unless given another. Scenes
+        have stores of their own, see :attr:`game.Scene.store`.
+
+        Returns:
+            ActorStore: --
+
+        """
+
+        if cls.DEFAULT is None:
+            cls.DEFAULT = ActorStore()
+
+        return cls.DEFAULT
+
+    def __len__(self):
+
+        return int(self.alive.sum())
+
+    @property
+    def capacity(self):
+
+        return len(self.alive)
+
+    def add(self, position=(0, 0), size=(0, 0), velocity=(0, 0),
+            direction=constants.Direction.south):
+        """Take a free slot, growing the arrays if there isn't one.
+
+        Args:
+            position (tuple): (x, y) top left.
+            size (tuple): (width, height)
+            velocity (tuple): (x, y)
+            direction (constants.Direction): --
+
+        Returns:
+            int: the slot.
+
+        """
+
+        if not self._free_slots:
+            self._grow()
+
+        slot = self._free_slots.pop()
+        self.positions[slot] = position
+        self.sizes[slot] = size
+        self.velocities[slot] = velocity
+        self.directions[slot] = direction.value
+        self.alive[slot] = True
+
+        return slot
+
+    def remove(self, slot):
+        """Free a slot for reuse.
+
+        Args:
+            slot (int): --
+
+        """
+
+        self.alive[slot] = False
+        self.solid[slot] = False
+        self.velocities[slot] = 0
+        self._free_slots.append(slot)
+
+    def slots(self):
+        """Every slot in use.
+
+        Returns:
+            numpy.ndarray: --
+
+        """
+
+        return numpy.flatnonzero(self.alive)
+
+    def in_rect(self, rect, slots=None):
+        """The slots whose (truncated) bounds collide with rect.
+
+        Args:
+            rect (pygame.Rect): --
+            slots (numpy.ndarray|None): only consider these slots,
+                defaults to every slot in use, including those of
+                child walkabouts, e.g., hats. See
+                :meth:`game.Scene.actor_slots_in_rect`.
+
+        Returns:
+            numpy.ndarray: --
+
+        """
+
+        if slots is None:
+            slots = self.slots()
+
+        bounds = self.bounds(slots)
+        overlaps = ((bounds[:, 0] < rect.right) &
+                    (bounds[:, 2] > rect.left) &
+                    (bounds[:, 1] < rect.bottom) &
+                    (bounds[:, 3] > rect.top))
+
+        return slots[overlaps]
+
+    def bounds(self, slots, positions=None):
+        """The (left, top, right, bottom) of each slot, truncated to
+        whole pixels like :class:`pygame.Rect` does.
+
+        Args:
+            slots (numpy.ndarray): --
+            positions (numpy.ndarray|None): top lefts to use instead
+                of the slots' positions.
+
+        Returns:
+            numpy.ndarray: (len(slots), 4) ints.
+
+        """
+
+        if positions is None:
+            positions = self.positions[slots]
+
+        topleft = positions.astype(numpy.int64)
+
+        return numpy.hstack((topleft, topleft + self.sizes[slots]))
+
+    def _grow(self):
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2 or 1
+
+        for name in ('positions', 'velocities', 'directions', 'sizes',
+                     'alive', 'solid'):
+            old_array = getattr(self, name)
+            new_array = numpy.zeros((new_capacity,) + old_array.shape[1:],
+                                    dtype=old_array.dtype)
+            new_array[:old_capacity] = old_array
+            setattr(self, name, new_array)
+
+        self._free_slots.extend(range(new_capacity - 1, old_capacity - 1,
+                                      -1))
+
+
+def summed_area_table(grid):
+    """The summed area table (integral image) of a 2D grid, which
+    counts the true cells in any rectangle of the grid with four
+    lookups.
+
+    Args:
+        grid (numpy.ndarray): (rows, columns), e.g.,
+            :attr:`tiles.TileMap.impassability`.
+
+    Returns:
+        numpy.ndarray: (rows + 1, columns + 1) ints, where [y, x] is
+            the count of true cells above and left of grid[y, x].
+
+    Example:
+        >>> table = summed_area_table(numpy.ones((2, 3), dtype=bool))
+        >>> int(table[2, 3])
+        6
+
+    """
+
+    rows, columns = grid.shape
+    table = numpy.zeros((rows + 1, columns + 1), dtype=numpy.int32)
+    table[1:, 1:] = grid.astype(numpy.int32).cumsum(axis=0).cumsum(axis=1)
+
+    return table
+
+
+def hits_grid(bounds, table, tile_size):
+    """Which bounds overlap a true cell of a grid of tiles, or aren't
+    entirely within the grid.
+
+    Args:
+        bounds (numpy.ndarray): (n, 4) left, top, right, bottom
+            in pixels.
+        table (numpy.ndarray): the :func:`summed_area_table` of the
+            grid, e.g., :attr:`tiles.TileMap.impassability_table`.
+        tile_size (tuple): (width, height) of a cell in pixels.
+
+    Returns:
+        numpy.ndarray: (n,) bools.
+
+    """
+
+    tile_width, tile_height = tile_size
+    rows, columns = table.shape[0] - 1, table.shape[1] - 1
+    left, top, right, bottom = bounds.T
+    outside = ((left < 0) | (top < 0) |
+               (right > columns * tile_width) |
+               (bottom > rows * tile_height))
+
+    # the first and one past the last tile covered, clipped to the grid
+    first_x = numpy.clip(left // tile_width, 0, columns)
+    first_y = numpy.clip(top // tile_height, 0, rows)
+    end_x = numpy.clip((right - 1) // tile_width + 1, 0, columns)
+    end_y = numpy.clip((bottom - 1) // tile_height + 1, 0, rows)
+    covered = (table[end_y, end_x] - table[first_y, end_x] -
+               table[end_y, first_x] + table[first_y, first_x])
+
+    return outside | (covered > 0)
+
+
+def hits_bounds(bounds, ids, other_bounds, other_ids):
+    """Which bounds overlap any of other_bounds, ignoring pairs with
+    the same id, without testing every pair.
+
+    The other bounds are sorted into horizontal bands as tall as the
+    tallest of them, and by left edge within each band. Each of
+    bounds only needs testing against the others in the band or two
+    it could reach, whose left edge is within reach of its own; those
+    are found with binary searches, then gathered and tested all at
+    once.
+
+    Args:
+        bounds (numpy.ndarray): (n, 4) left, top, right, bottom.
+        ids (numpy.ndarray): (n,) e.g., slots.
+        other_bounds (numpy.ndarray): (m, 4) --
+        other_ids (numpy.ndarray): (m,) --
+
+    Returns:
+        numpy.ndarray: (n,) bools.
+
+    Example:
+        >>> bounds = numpy.array([[0, 0, 4, 4], [10, 0, 14, 4]])
+        >>> others = numpy.array([[0, 0, 4, 4], [3, 3, 5, 5]])
+        >>> hits_bounds(bounds, numpy.array([0, 1]),
+        ...             others, numpy.array([0, 2])).tolist()
+        [True, False]
+
+    """
+
+    hits = numpy.zeros(len(bounds), dtype=bool)
+
+    if not len(bounds) or not len(other_bounds):
+
+        return hits
+
+    widest = max(int((other_bounds[:, 2] - other_bounds[:, 0]).max()), 1)
+    tallest = max(int((other_bounds[:, 3] - other_bounds[:, 1]).max()), 1)
+
+    # sort key: band, then left edge. band_stride is wide enough
+    # that searching a band never runs into the next one.
+    min_x = min(bounds[:, 0].min(), other_bounds[:, 0].min()) - widest - 1
+    max_x = max(bounds[:, 2].max(), other_bounds[:, 0].max())
+    band_stride = int(max_x - min_x) + 1
+    other_keys = ((other_bounds[:, 1] // tallest) * band_stride +
+                  other_bounds[:, 0] - min_x)
+    order = numpy.argsort(other_keys, kind='mergesort')
+    sorted_keys = other_keys[order]
+
+    # an overlapping other's top is above this one's bottom, and no
+    # further above this one's top than the tallest height
+    first_band = (bounds[:, 1] - tallest) // tallest
+    last_band = (bounds[:, 3] - 1) // tallest
+
+    for band_offset in range(int((last_band - first_band).max()) + 1):
+        band = first_band + band_offset
+        band_start = band * band_stride - min_x
+
+        # nothing whose left edge is more than the widest width
+        # behind this one's left edge can reach it
+        first = numpy.searchsorted(sorted_keys,
+                                   band_start + bounds[:, 0] - widest,
+                                   'right')
+        end = numpy.searchsorted(sorted_keys, band_start + bounds[:, 2],
+                                 'left')
+        counts = numpy.where(band <= last_band,
+                             numpy.maximum(end - first, 0), 0)
+        total = int(counts.sum())
+
+        if not total:
+
+            continue
+
+        # every (bound, candidate) pair, flattened
+        pair_bound = numpy.repeat(numpy.arange(len(bounds)), counts)
+        pair_offset = (numpy.arange(total) -
+                       numpy.repeat(numpy.cumsum(counts) - counts, counts))
+        pair_other = order[numpy.repeat(first, counts) + pair_offset]
+        mine = bounds[pair_bound]
+        theirs = other_bounds[pair_other]
+        overlapping = ((theirs[:, 2] > mine[:, 0]) &
+                       (theirs[:, 0] < mine[:, 2]) &
+                       (theirs[:, 3] > mine[:, 1]) &
+                       (theirs[:, 1] < mine[:, 3]) &
+                       (ids[pair_bound] != other_ids[pair_other]))
+        hits[pair_bound[overlapping]] = True
+
+    return hits
+
+
+def move_actors(store, slots, seconds, impassability_table=None,
+                tile_size=None, obstacles=None):
+    """Advance every slot with a velocity by velocity * seconds, all
+    at once, stopping short of impassable tiles and other actors.
+
+    Movement is resolved one axis at a time, x then y, so an actor
+    moving diagonally into a wall slides along it. Along each axis, a
+    slot only moves if its new bounds stay on passable tiles and
+    don't overlap any obstacle's bounds before or after the
+    obstacle's own move, so two actors can't step into each other.
+
+    The direction of each moving slot is set to the cardinal
+    direction it's mostly moving in.
+
+    Args:
+        store (ActorStore): --
+        slots (numpy.ndarray): the slots to move.
+        seconds (float): how much time has passed.
+        impassability_table (numpy.ndarray|None): a
+            :func:`summed_area_table` of impassable tiles, e.g.,
+            :attr:`tiles.TileMap.impassability_table`.
+        tile_size (tuple|None): (width, height) of the tiles.
+        obstacles (numpy.ndarray|None): the slots which block
+            movement, defaults to every solid slot.
+
+    Returns:
+        numpy.ndarray: the slots which moved.
+
+    Example:
+        >>> store = ActorStore()
+        >>> walker = store.add((0, 0), (4, 4), velocity=(10, 0))
+        >>> wall = store.add((12, 0), (4, 4))
+        >>> store.solid[[walker, wall]] = True
+        >>> move_actors(store, numpy.array([walker]), 0.5).tolist()
+        [0]
+        >>> move_actors(store, numpy.array([walker]), 0.5).tolist()
+        []
+        >>> store.positions[walker].tolist()
+        [5.0, 0.0]
+
+    """
+
+    slots = numpy.asarray(slots, dtype=numpy.int64)
+    velocities = store.velocities[slots]
+    moving = slots[(velocities != 0).any(axis=1)]
+    moved = numpy.zeros(store.capacity, dtype=bool)
+
+    if not len(moving):
+
+        return moving
+
+    if obstacles is None:
+        obstacles = numpy.flatnonzero(store.alive & store.solid)
+
+    for axis in (0, 1):
+        movers = moving[store.velocities[moving, axis] != 0]
+
+        if not len(movers):
+
+            continue
+
+        proposed = store.positions.copy()
+        proposed[movers, axis] += store.velocities[movers, axis] * seconds
+        mover_bounds = store.bounds(movers, proposed[movers])
+        blocked = numpy.zeros(len(movers), dtype=bool)
+
+        if impassability_table is not None:
+            blocked |= hits_grid(mover_bounds, impassability_table,
+                                 tile_size)
+
+        # what each obstacle covers before and after its move
+        before = store.bounds(obstacles)
+        after = store.bounds(obstacles, proposed[obstacles])
+        swept = numpy.hstack((numpy.minimum(before[:, :2], after[:, :2]),
+                              numpy.maximum(before[:, 2:], after[:, 2:])))
+        blocked |= hits_bounds(mover_bounds, movers, swept, obstacles)
+
+        unblocked = movers[~blocked]
+        store.positions[unblocked] = proposed[unblocked]
+        moved[unblocked] = True
+
+    # face the way most of the movement is going
+    velocities = store.velocities[moving]
+    horizontal = numpy.abs(velocities[:, 0]) >= numpy.abs(velocities[:, 1])
+    facing = numpy.where(
+        horizontal,
+        numpy.where(velocities[:, 0] > 0, constants.Direction.east.value,
+                    constants.Direction.west.value),
+        numpy.where(velocities[:, 1] > 0, constants.Direction.south.value,
+                    constants.Direction.north.value),
+    )
+    store.directions[moving] = facing
+
+    return moving[moved[moving]]
+
+
 # this really isn't used, yet
 class Position(object):
     """The position of an object.
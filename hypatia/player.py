@@ -70,6 +70,7 @@ class HumanPlayer(actor.Actor):
                 self.walkabout.size = animation.getMaxSize()
                 self.walkabout.rect = destination_rect
                 self.walkabout.topleft_float = new_topleft
+                game.scene.update_actor(self)
 
                 return True
 
@@ -0,0 +1,162 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Decode a scene's resources concurrently, before the scene is
+constructed.
+
+Loading a scene decodes its tilesheet, the human player's walkabouts
+and every NPC walkabout, one after the other. Most of that time is
+spent in PIL, which releases the GIL while decoding, so the decoding
+parallelizes well across a pool of worker threads (or processes).
+
+A :class:`Preloader` takes an asset manifest, a list of
+``(resource category, resource name)`` pairs, decodes every file of
+every resource in the pool, and stores the ready-to-convert results
+in :attr:`util.Resource.DECODED_CACHE`. Constructing the scene
+afterwards only has to turn those buffers into pygame objects.
+
+Example:
+    >>> from hypatia import game
+    >>> manifest = game.Scene.manifest_from_resource('debug')
+    >>> ('walkabouts', 'hat') in manifest
+    True
+    >>> preloader = Preloader()
+    >>> preloader.preload(manifest)
+    >>> ('tilesheets', 'debug') in util.Resource.DECODED_CACHE
+    True
+    >>> preloader.clear()
+
+See Also:
+    * :class:`util.Resource`
+    * :meth:`game.Scene.manifest_from_resource`
+    * :meth:`game.Scene.manifest_from_tmx_resource`
+
+"""
+
+import multiprocessing
+import multiprocessing.pool
+
+from hypatia import util
+
+
+class Preloader(object):
+    """Decode the files of many resources concurrently in a
+    worker pool.
+
+    Attributes:
+        processes (int|None): the number of workers; None
+            means one per CPU.
+        use_processes (bool): use a process pool rather than
+            a thread pool.
+        progress_callback (callable|None): called on the thread
+            which called :meth:`Preloader.preload` as each file is
+            decoded, like ``progress_callback(done, total, (category,
+            name, file name))``.
+        preloaded (list): (category, name) of every resource this
+            preloader put into :attr:`util.Resource.DECODED_CACHE`.
+
+    """
+
+    def __init__(self, processes=None, use_processes=False,
+                 progress_callback=None):
+        """
+
+        Args:
+            processes (int|None): --
+            use_processes (bool): Threads are usually the better
+                choice, as PIL releases the GIL while decoding and
+                nothing has to be pickled.
+            progress_callback (callable|None): --
+
+        """
+
+        self.processes = processes
+        self.use_processes = use_processes
+        self.progress_callback = progress_callback
+        self.preloaded = []
+
+    def preload(self, manifest):
+        """Decode every file of every resource in the manifest and
+        store the results in :attr:`util.Resource.DECODED_CACHE`.
+
+        Files are read on the calling thread, then decoded in the
+        worker pool.
+
+        Args:
+            manifest (list): (resource category, resource name) pairs.
+                Duplicates are only decoded once.
+
+        """
+
+        jobs = []
+        decoded_resources = {}
+
+        for resource_key in manifest:
+
+            if (resource_key in decoded_resources or
+                    resource_key in util.Resource.DECODED_CACHE):
+
+                continue
+
+            decoded_resources[resource_key] = {}
+            raw_files = util.Resource.read_files(*resource_key)
+
+            for file_name, file_data in raw_files.items():
+
+                # memoryviews into an asset pack can't be pickled
+                if self.use_processes:
+                    file_data = bytes(file_data)
+
+                jobs.append((resource_key, file_name, file_data))
+
+        if self.use_processes:
+            pool = multiprocessing.Pool(self.processes)
+        else:
+            pool = multiprocessing.pool.ThreadPool(self.processes)
+
+        try:
+
+            for done, result in enumerate(pool.imap_unordered(decode_job,
+                                                              jobs), 1):
+                resource_key, file_name, decoded_data = result
+                decoded_resources[resource_key][file_name] = decoded_data
+
+                if self.progress_callback:
+                    progress = resource_key + (file_name,)
+                    self.progress_callback(done, len(jobs), progress)
+
+        finally:
+            pool.close()
+            pool.join()
+
+        util.Resource.DECODED_CACHE.update(decoded_resources)
+        self.preloaded.extend(decoded_resources.keys())
+
+    def clear(self):
+        """Remove everything this preloader decoded from
+        :attr:`util.Resource.DECODED_CACHE`, freeing the buffers
+        once the scene using them has been constructed.
+
+        """
+
+        for resource_key in self.preloaded:
+            util.Resource.DECODED_CACHE.pop(resource_key, None)
+
+        self.preloaded = []
+
+
+def decode_job(job):
+    """Decode one file in a worker.
+
+    Args:
+        job (tuple): (resource key, file name, raw file data)
+
+    Returns:
+        tuple: (resource key, file name, decoded file data)
+
+    """
+
+    resource_key, file_name, file_data = job
+
+    return (resource_key, file_name,
+            util.Resource.decode_file(file_name, file_data))
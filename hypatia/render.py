@@ -13,8 +13,10 @@ See Also:
 
 import sys
 import time
+import bisect
 import itertools
 
+import numpy
 import pygame
 import pyganim
 from pygame.locals import *
@@ -23,6 +25,12 @@ from hypatia import util
 from hypatia import constants
 
 
+# surface kinds, see classify_surface()
+OPAQUE = 'opaque'
+COLORKEY = 'colorkey'
+PER_PIXEL_ALPHA = 'per-pixel alpha'
+
+
 class Screen(object):
     """Everything blits to screen!
 
@@ -118,6 +126,8 @@ class Viewport(object):
         Args:
           entity: something with an attribute "rect" which value is
             a pygame.Rect.
+          master_rect (pygame.Rect): the map, which the viewport
+            stays within.
 
         Returns:
           bool: --
@@ -129,10 +139,10 @@ class Viewport(object):
         difference_y = entity_position_y - self.rect.centery
         potential_rect = self.rect.move(*(difference_x, difference_y))
 
-        if potential_rect.left < 0:
+        if potential_rect.left < master_rect.left:
             difference_x = 0
 
-        if potential_rect.top < 0:
+        if potential_rect.top < master_rect.top:
             difference_y = 0
 
         if potential_rect.right > master_rect.right:
@@ -175,6 +185,436 @@ class Viewport(object):
                          )
 
 
+def blits(target, sequence):
+    """Draw every (surface, position) pair in sequence onto target,
+    in order, with one :meth:`pygame.Surface.blits` call.
+
+    Args:
+        target (pygame.Surface): --
+        sequence (list): (pygame.Surface, (x, y)) pairs, e.g., from
+            :meth:`animations.Walkabout.blit_sequence`.
+
+    Example:
+        >>> target = pygame.Surface((4, 4))
+        >>> sprite = pygame.Surface((1, 1))
+        >>> sprite.fill((255, 0, 0))
+        <rect(0, 0, 1, 1)>
+        >>> blits(target, [(sprite, (0, 0)), (sprite, (3, 3))])
+        >>> target.get_at((3, 3))
+        (255, 0, 0, 255)
+
+    """
+
+    if hasattr(target, 'blits'):
+        target.blits(sequence, doreturn=False)
+    else:
+
+        # pygame older than 1.9.4
+        for surface, position in sequence:
+            target.blit(surface, position)
+
+
+def classify_surface(surface):
+    """Say how a surface should be converted to the display's format:
+    fully opaque, colorkeyed, or blended with per-pixel alpha.
+
+    A surface with per-pixel alpha counts as opaque if every pixel is
+    fully opaque, and as colorkeyed if every pixel is either fully
+    opaque or fully transparent, like GIF frames and tile layers.
+
+    Args:
+        surface (pygame.Surface): --
+
+    Returns:
+        str: :data:`OPAQUE`, :data:`COLORKEY` or
+            :data:`PER_PIXEL_ALPHA`.
+
+    Example:
+        >>> surface = pygame.Surface((2, 1), pygame.SRCALPHA, 32)
+        >>> surface.fill((255, 0, 0, 255))
+        <rect(0, 0, 2, 1)>
+        >>> classify_surface(surface)
+        'opaque'
+        >>> surface.set_at((0, 0), (0, 0, 0, 0))
+        >>> classify_surface(surface)
+        'colorkey'
+        >>> surface.set_at((0, 0), (0, 0, 0, 128))
+        >>> classify_surface(surface)
+        'per-pixel alpha'
+
+    """
+
+    if surface.get_colorkey() is not None:
+
+        return COLORKEY
+
+    if not surface.get_flags() & pygame.SRCALPHA:
+
+        return OPAQUE
+
+    alphas = pygame.surfarray.array_alpha(surface)
+
+    if alphas.min() == 255:
+
+        return OPAQUE
+
+    if numpy.all((alphas == 0) | (alphas == 255)):
+
+        return COLORKEY
+
+    return PER_PIXEL_ALPHA
+
+
+def unused_color(surface):
+    """Find a color which no opaque pixel of surface uses, for use
+    as its colorkey. Magenta, if it's free.
+
+    Args:
+        surface (pygame.Surface): --
+
+    Returns:
+        tuple: (r, g, b)
+
+    Example:
+        >>> surface = pygame.Surface((1, 1))
+        >>> unused_color(surface)
+        (255, 0, 255)
+        >>> surface.fill((255, 0, 255))
+        <rect(0, 0, 1, 1)>
+        >>> unused_color(surface)
+        (0, 0, 0)
+
+    """
+
+    rgb = pygame.surfarray.array3d(surface).astype(numpy.uint32)
+    packed = (rgb[..., 0] << 16) | (rgb[..., 1] << 8) | rgb[..., 2]
+
+    if surface.get_flags() & pygame.SRCALPHA:
+        packed = packed[pygame.surfarray.array_alpha(surface) == 255]
+
+    used = numpy.unique(packed)
+    magenta = 0xff00ff
+
+    if magenta not in used:
+        color = magenta
+    else:
+        # there are more candidates than used colors, so one is free
+        candidates = numpy.arange(len(used) + 1, dtype=numpy.uint32)
+        color = int(numpy.setdiff1d(candidates, used)[0])
+
+    return (color >> 16) & 0xff, (color >> 8) & 0xff, color & 0xff
+
+
+def prepare_surface(surface, rle=True):
+    """Return a copy of surface in the display's pixel format, set up
+    for the fastest blits its transparency allows.
+
+    Surfaces are classified by :func:`classify_surface`:
+
+      * opaque surfaces are converted without alpha.
+      * colorkey surfaces, including per-pixel alpha surfaces whose
+        pixels are all either opaque or transparent, are converted
+        without alpha, with a colorkey standing in for transparent
+        pixels.
+      * per-pixel alpha surfaces are converted with alpha.
+
+    Colorkey and per-pixel alpha surfaces are RLE accelerated, which
+    lets blits skip runs of transparent pixels. Opaque surfaces have
+    no such runs, so aren't.
+
+    Note:
+        A display must have been set, see :class:`Screen`.
+
+    Warning:
+        Reading or writing pixels of an RLE accelerated surface is
+        slow, as it has to be decoded first.
+
+    Args:
+        surface (pygame.Surface): --
+        rle (bool): use RLE acceleration where it helps.
+
+    Returns:
+        pygame.Surface: --
+
+    See Also:
+        * :func:`animations.convert_animation`
+        * ``benchmarks/prepare_surfaces.py``, which times how much
+          faster prepared surfaces blit.
+
+    """
+
+    kind = classify_surface(surface)
+    rle_flag = pygame.RLEACCEL if rle else 0
+
+    if kind == OPAQUE:
+
+        return surface.convert()
+
+    if kind == PER_PIXEL_ALPHA:
+        prepared = surface.convert_alpha()
+
+        if rle_flag:
+            prepared.set_alpha(255, rle_flag)
+
+        return prepared
+
+    colorkey = surface.get_colorkey()
+
+    if colorkey is None:
+        # paint transparent pixels with a color used nowhere else
+        colorkey = unused_color(surface)
+        keyed = pygame.Surface(surface.get_size())
+        keyed.fill(colorkey)
+        keyed.blit(surface, (0, 0))
+        surface = keyed
+
+    prepared = surface.convert()
+    prepared.set_colorkey(colorkey[:3], rle_flag)
+
+    return prepared
+
+
+def time_blits(surface, target=None, repeat=100):
+    """Time blitting surface, e.g., before and after
+    :func:`prepare_surface`.
+
+    Args:
+        surface (pygame.Surface): the surface to blit.
+        target (pygame.Surface|None): the surface to blit to,
+            defaults to the display surface.
+        repeat (int): how many times to blit.
+
+    Returns:
+        float: seconds per blit.
+
+    """
+
+    target = target or pygame.display.get_surface()
+    start = time.time()
+
+    for __ in range(repeat):
+        target.blit(surface, (0, 0))
+
+    return (time.time() - start) / repeat
+
+
+class DepthOrder(object):
+    """Items kept in drawing order by depth, e.g., the y coordinate of
+    an actor's feet, so whatever stands further down the screen is
+    drawn over whatever stands behind it.
+
+    The order is kept up to date incrementally: when an item moves,
+    :meth:`DepthOrder.update` swaps it past its neighbors until it's
+    back in order, like one step of an insertion sort. Items rarely
+    move more than a neighbor or two a frame, so this costs next to
+    nothing, and items which don't move cost nothing at all.
+
+    Items of equal depth keep the order they were inserted in.
+
+    Attributes:
+        depth (callable): returns the depth of an item.
+        items (list): the items, from the furthest back (the smallest
+            depth) to the furthest forward. Read only.
+
+    Example:
+        >>> positions = {'tree': 10, 'villager': 30, 'cat': 20}
+        >>> depth_order = DepthOrder(positions.get)
+        >>> for item in ('tree', 'villager', 'cat'):
+        ...     depth_order.insert(item)
+        >>> depth_order.items
+        ['tree', 'cat', 'villager']
+        >>> positions['tree'] = 25
+        >>> depth_order.update('tree')
+        >>> depth_order.items
+        ['cat', 'tree', 'villager']
+
+    """
+
+    def __init__(self, depth):
+        """
+
+        Args:
+            depth (callable): --
+
+        """
+
+        self.depth = depth
+        self.items = []
+
+        # depth of each item in self.items, as of its last update
+        self._depths = []
+
+        # item -> its index in self.items
+        self._ranks = {}
+
+    def __len__(self):
+
+        return len(self.items)
+
+    def __iter__(self):
+
+        return iter(self.items)
+
+    def __contains__(self, item):
+
+        return item in self._ranks
+
+    def insert(self, item):
+        """Add item, behind anything of equal depth.
+
+        Args:
+            item: anything hashable.
+
+        """
+
+        depth = self.depth(item)
+        index = bisect.bisect_right(self._depths, depth)
+        self.items.insert(index, item)
+        self._depths.insert(index, depth)
+        self._rerank(index)
+
+    def remove(self, item):
+        """Remove item.
+
+        Raises:
+            KeyError: item was never inserted.
+
+        """
+
+        index = self._ranks.pop(item)
+        del self.items[index]
+        del self._depths[index]
+        self._rerank(index)
+
+    def update(self, item):
+        """Put item back in order after its depth has changed.
+
+        Args:
+            item: an item already inserted.
+
+        """
+
+        index = self._ranks[item]
+        depth = self.depth(item)
+        self._depths[index] = depth
+        last_index = len(self.items) - 1
+
+        while index > 0 and self._depths[index - 1] > depth:
+            self._swap(index - 1, index)
+            index -= 1
+
+        while index < last_index and self._depths[index + 1] < depth:
+            self._swap(index, index + 1)
+            index += 1
+
+    def refresh(self):
+        """Re-read the depth of every item and put them all back in
+        order, for when many items have moved at once.
+
+        The previous order is sorted from, and it's usually close to
+        the new one, which Python's sort (Timsort) handles in nearly
+        linear time.
+
+        """
+
+        depths = [self.depth(item) for item in self.items]
+        order = sorted(range(len(self.items)), key=depths.__getitem__)
+        self.items = [self.items[index] for index in order]
+        self._depths = [depths[index] for index in order]
+        self._rerank(0)
+
+    def sorted(self, items):
+        """Return some of the items, e.g., just the ones in view, in
+        drawing order.
+
+        Args:
+            items (iterable): items which have been inserted.
+
+        Returns:
+            list: --
+
+        """
+
+        return sorted(items, key=self._ranks.__getitem__)
+
+    def _swap(self, first, second):
+        items = self.items
+        depths = self._depths
+        items[first], items[second] = items[second], items[first]
+        depths[first], depths[second] = depths[second], depths[first]
+        self._ranks[items[first]] = first
+        self._ranks[items[second]] = second
+
+    def _rerank(self, start):
+
+        for index in range(start, len(self.items)):
+            self._ranks[self.items[index]] = index
+
+
+class LoadingScreen(object):
+    """A progress bar, and optionally a message, for showing while
+    a scene loads in the background.
+
+    Attributes:
+        bar_color (tuple): RGB color of the filled part of the bar.
+        background_color (tuple): RGB color behind the bar.
+        font (pygame.font.Font|None): for rendering the message. No
+            message is drawn without a font.
+
+    See Also:
+        :meth:`game.Game.wait_for`
+
+    """
+
+    def __init__(self, bar_color=(255, 255, 255),
+                 background_color=(0, 0, 0), font=None):
+        """
+
+        Args:
+            bar_color (tuple): --
+            background_color (tuple): --
+            font (pygame.font.Font|None): --
+
+        """
+
+        self.bar_color = bar_color
+        self.background_color = background_color
+        self.font = font
+
+    def blit(self, surface, progress, message=None):
+        """Draw the loading screen to surface.
+
+        Args:
+            surface (pygame.Surface): usually the viewport surface.
+            progress (float): 0 to 1, how much of the bar is filled.
+            message (str|None): drawn above the bar.
+
+        Example:
+            >>> surface = pygame.Surface((100, 100))
+            >>> LoadingScreen().blit(surface, 0.5)
+            >>> surface.get_at((30, 50)), surface.get_at((70, 50))
+            ((255, 255, 255, 255), (0, 0, 0, 255))
+
+        """
+
+        width, height = surface.get_size()
+        surface.fill(self.background_color)
+
+        # outline the whole bar, then fill it up to progress
+        bar_rect = pygame.Rect(0, 0, width * 3 // 4, max(height // 20, 2))
+        bar_rect.center = (width // 2, height // 2)
+        filled_rect = bar_rect.copy()
+        filled_rect.width = int(bar_rect.width * min(max(progress, 0), 1))
+        pygame.draw.rect(surface, self.bar_color, bar_rect, 1)
+        surface.fill(self.bar_color, filled_rect)
+
+        if message and self.font:
+            text = self.font.render(message, False, self.bar_color)
+            text_rect = text.get_rect(midbottom=bar_rect.midtop)
+            text_rect.move_ip(0, -2)
+            surface.blit(text, text_rect)
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
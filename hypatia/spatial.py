@@ -0,0 +1,399 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Spatial indexes, for finding what's in an area of a scene without
+looking at everything in the scene.
+
+A :class:`SpatialHash` divides the map into a uniform grid of square
+cells and remembers which items overlap which cells. Asking what's
+in a rect, like the viewport, only looks at the items in the cells
+the rect overlaps, so it costs about as much as there are items
+nearby, no matter how many items the scene has.
+
+Example:
+    >>> index = SpatialHash(cell_size=32)
+    >>> index.insert('sign', pygame.Rect(10, 10, 8, 8))
+    >>> index.insert('villager', pygame.Rect(500, 500, 8, 8))
+    >>> index.query(pygame.Rect(0, 0, 64, 64))
+    ['sign']
+    >>> index.nearest((400, 400))
+    ['villager']
+
+Besides rects, the index answers radius (:meth:`SpatialHash.near`),
+nearest-k (:meth:`SpatialHash.nearest`) and "in front of"
+(:func:`facing_rect`) queries, all by only looking at nearby cells.
+
+See Also:
+    * :meth:`game.Scene.visible_actors`
+    * :meth:`game.Scene.actors_in_front`
+
+"""
+
+import collections
+
+import pygame
+
+from hypatia import constants
+
+
+def distance_to_rect(point, rect):
+    """The distance from point to the nearest point of rect, which is
+    0 if point is in rect.
+
+    Args:
+        point (tuple): (x, y)
+        rect (pygame.Rect): --
+
+    Returns:
+        float: --
+
+    Example:
+        >>> distance_to_rect((0, 0), pygame.Rect(3, 4, 10, 10))
+        5.0
+        >>> distance_to_rect((5, 5), pygame.Rect(3, 4, 10, 10))
+        0.0
+
+    """
+
+    x, y = point
+    dx = max(rect.left - x, 0, x - rect.right)
+    dy = max(rect.top - y, 0, y - rect.bottom)
+
+    return (dx * dx + dy * dy) ** 0.5
+
+
+def facing_rect(rect, direction, reach=1):
+    """The area reach pixels deep just outside of the side(s) of rect
+    facing direction, e.g., where an actor could talk to or bump
+    into something.
+
+    Args:
+        rect (pygame.Rect): --
+        direction (constants.Direction): cardinal or ordinal.
+        reach (int): how far in front, in pixels.
+
+    Returns:
+        pygame.Rect: --
+
+    Example:
+        >>> facing_rect(pygame.Rect(0, 0, 10, 20),
+        ...             constants.Direction.east, 2)
+        <rect(10, 0, 2, 20)>
+        >>> facing_rect(pygame.Rect(0, 0, 10, 20),
+        ...             constants.Direction.north_west)
+        <rect(-1, -1, 1, 1)>
+
+    """
+
+    left, width = rect.left, rect.width
+    top, height = rect.top, rect.height
+
+    if direction.value & constants.Direction.east.value:
+        left, width = rect.right, reach
+    elif direction.value & constants.Direction.west.value:
+        left, width = rect.left - reach, reach
+
+    if direction.value & constants.Direction.south.value:
+        top, height = rect.bottom, reach
+    elif direction.value & constants.Direction.north.value:
+        top, height = rect.top - reach, reach
+
+    return pygame.Rect(left, top, width, height)
+
+
+class SpatialHash(object):
+    """A uniform grid of cells, each holding the items whose rects
+    overlap it.
+
+    Items can be anything hashable. Each item has one rect, which
+    must be kept up to date with :meth:`SpatialHash.update` when
+    the item moves.
+
+    Attributes:
+        cell_size (int): the width and height of a cell in pixels.
+            Around the size of the viewport's smaller dimension, or a
+            few times the size of a typical item, works well.
+
+    """
+
+    def __init__(self, cell_size=64):
+        """
+
+        Args:
+            cell_size (int): --
+
+        """
+
+        self.cell_size = cell_size
+
+        # (cell x, cell y) -> set of items
+        self._cells = collections.defaultdict(set)
+
+        # item -> (rect, the cells it's in)
+        self._items = {}
+
+        # item -> when it was inserted, for keeping query order stable
+        self._order = {}
+        self._inserted = 0
+
+    def __len__(self):
+
+        return len(self._items)
+
+    def __contains__(self, item):
+
+        return item in self._items
+
+    def cells(self, rect):
+        """The (x, y) coordinates of every cell rect overlaps.
+
+        Args:
+            rect (pygame.Rect): --
+
+        Returns:
+            list: --
+
+        Example:
+            >>> SpatialHash(cell_size=10).cells(pygame.Rect(5, 5, 10, 1))
+            [(0, 0), (1, 0)]
+
+        """
+
+        first_x = rect.left // self.cell_size
+        first_y = rect.top // self.cell_size
+
+        # right and bottom are just outside the rect
+        last_x = (rect.right - 1) // self.cell_size
+        last_y = (rect.bottom - 1) // self.cell_size
+
+        return [(x, y)
+                for y in range(first_y, max(last_y, first_y) + 1)
+                for x in range(first_x, max(last_x, first_x) + 1)]
+
+    def insert(self, item, rect):
+        """Add item to the index, covering rect.
+
+        Args:
+            item: anything hashable.
+            rect (pygame.Rect): --
+
+        """
+
+        if item in self._items:
+            self.update(item, rect)
+
+            return None
+
+        rect = pygame.Rect(rect)
+        cells = self.cells(rect)
+
+        for cell in cells:
+            self._cells[cell].add(item)
+
+        self._items[item] = (rect, cells)
+        self._order[item] = self._inserted
+        self._inserted += 1
+
+    def remove(self, item):
+        """Remove item from the index.
+
+        Args:
+            item: --
+
+        Raises:
+            KeyError: item isn't in the index.
+
+        """
+
+        __, cells = self._items.pop(item)
+        del self._order[item]
+
+        for cell in cells:
+            self._cells[cell].discard(item)
+
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def update(self, item, rect):
+        """Move item to rect. Cheap if it stays in the same cells.
+
+        Args:
+            item: an item already in the index.
+            rect (pygame.Rect): --
+
+        """
+
+        rect = pygame.Rect(rect)
+        __, old_cells = self._items[item]
+        cells = self.cells(rect)
+
+        if cells != old_cells:
+
+            for cell in old_cells:
+                self._cells[cell].discard(item)
+
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+            for cell in cells:
+                self._cells[cell].add(item)
+
+        self._items[item] = (rect, cells)
+
+    def rect(self, item):
+        """The rect item was last inserted or updated with.
+
+        Returns:
+            pygame.Rect: --
+
+        """
+
+        return self._items[item][0]
+
+    def query(self, rect):
+        """Every item whose rect collides with rect.
+
+        Args:
+            rect (pygame.Rect): E.g., the viewport.
+
+        Returns:
+            list: items, in the order they were inserted.
+
+        """
+
+        candidates = set()
+
+        for cell in self.cells(rect):
+            candidates.update(self._cells.get(cell, ()))
+
+        found = [item for item in candidates
+                 if self._items[item][0].colliderect(rect)]
+        found.sort(key=self._order.__getitem__)
+
+        return found
+
+    def near(self, point, radius):
+        """Every item whose rect is within radius of point.
+
+        Args:
+            point (tuple): (x, y)
+            radius (float): in pixels.
+
+        Returns:
+            list: items, in the order they were inserted.
+
+        Example:
+            >>> index = SpatialHash(cell_size=16)
+            >>> index.insert('rock', pygame.Rect(10, 0, 4, 4))
+            >>> index.insert('tree', pygame.Rect(30, 30, 4, 4))
+            >>> index.near((0, 0), 10)
+            ['rock']
+
+        """
+
+        x, y = point
+        reach = int(radius) + 1
+        candidates = self.query(pygame.Rect(x - reach, y - reach,
+                                            reach * 2, reach * 2))
+
+        return [item for item in candidates
+                if distance_to_rect(point, self._items[item][0]) <= radius]
+
+    def nearest(self, point, count=1, max_distance=None, exclude=()):
+        """The count items whose rects are closest to point.
+
+        Searches rings of cells outward from the cell point is in,
+        stopping once no unsearched cell could hold anything closer
+        than what's been found.
+
+        Args:
+            point (tuple): (x, y)
+            count (int): how many items, at most.
+            max_distance (Optional[float]): ignore items further
+                away than this.
+            exclude (Iterable): items to skip, e.g., the actor
+                doing the looking.
+
+        Returns:
+            list: items, nearest first; ties in the order they were
+                inserted.
+
+        Example:
+            >>> index = SpatialHash(cell_size=16)
+            >>> for name, x in (('a', 90), ('b', 10), ('c', 40)):
+            ...     index.insert(name, pygame.Rect(x, 0, 4, 4))
+            >>> index.nearest((0, 0), count=2)
+            ['b', 'c']
+            >>> index.nearest((0, 0), exclude=['b'], max_distance=20)
+            []
+
+        """
+
+        exclude = set(exclude)
+        wanted = min(count, len(self._items))
+        point_x, point_y = point
+        cell_x = int(point_x // self.cell_size)
+        cell_y = int(point_y // self.cell_size)
+
+        # item -> (distance, insertion order)
+        found = {}
+        ring = 0
+
+        while True:
+
+            # searching a ring with more cells than are occupied
+            # costs more than checking every occupied cell
+            if ring * 8 > len(self._cells):
+                candidates = set(self._items)
+            else:
+                candidates = set()
+
+                for cell in self._ring(cell_x, cell_y, ring):
+                    candidates.update(self._cells.get(cell, ()))
+
+            for item in candidates.difference(found, exclude):
+                distance = distance_to_rect(point, self._items[item][0])
+
+                if max_distance is None or distance <= max_distance:
+                    found[item] = (distance, self._order[item])
+
+            # nothing in an unsearched cell can be closer than this
+            searched_distance = ring * self.cell_size
+            done = (ring * 8 > len(self._cells) or
+                    (max_distance is not None and
+                     searched_distance >= max_distance))
+            close_enough = [key for key in found.values()
+                            if key[0] <= searched_distance]
+
+            if done or len(close_enough) >= wanted:
+
+                break
+
+            ring += 1
+
+        nearest = sorted(found, key=found.__getitem__)
+
+        return nearest[:count]
+
+    @staticmethod
+    def _ring(cell_x, cell_y, ring):
+        """The cells on the square ring ring cells out from
+        (cell_x, cell_y).
+
+        """
+
+        if ring == 0:
+
+            return [(cell_x, cell_y)]
+
+        cells = []
+
+        for x in range(cell_x - ring, cell_x + ring + 1):
+            cells.append((x, cell_y - ring))
+            cells.append((x, cell_y + ring))
+
+        for y in range(cell_y - ring + 1, cell_y + ring):
+            cells.append((cell_x - ring, y))
+            cells.append((cell_x + ring, y))
+
+        return cells
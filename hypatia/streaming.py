@@ -0,0 +1,510 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""Stream a map too big to keep in memory, a region at a time,
+around the player.
+
+A map is split into regions (chunks) of tiles, each materialized
+into a :class:`game.MapChunk` only while it's near the player. A
+:class:`WorldStreamer` asks a background worker for the regions
+around the viewport, and for those the player's velocity is heading
+into, so they're usually ready before they're in view.
+:meth:`WorldStreamer.update` never waits on the worker: regions
+which aren't ready yet simply aren't drawn, and count as impassable.
+
+Regions which fall out of range are kept, least recently used
+first, until the loaded regions go over a memory budget.
+
+Regions come from a source, which is anything with:
+
+  * ``tilesheet`` (:class:`tiles.Tilesheet`)
+  * ``rect`` (:class:`pygame.Rect`), the pixels it covers
+  * ``depth``, how many layers
+  * ``chunk_size`` ((width, height) of a region, in tiles)
+  * ``chunks_in_rect(rect, margin=0)``, the (x, y) coordinates of
+    the regions overlapping a pixel rect
+  * ``materialize(chunk_coord, stitched=True)``, returning a
+    :class:`game.MapChunk`. The worker thread calls it with
+    ``stitched=False``, so it only decodes tile IDs and works out
+    their NumPy planes; the layer images are stitched on the main
+    thread, like everything else drawn with pygame.
+  * ``__contains__(chunk_coord)``
+
+:class:`game.ChunkedTMX` is one, for infinite TMX maps, and
+:class:`TileArrayChunks` is one for a 3D array of tile IDs, which
+can be a ``numpy.memmap``.
+
+Example:
+    >>> tile_ids = numpy.full((1, 40, 40), 11, dtype=numpy.int16)
+    >>> tile_ids[0, 20, :] = 99
+    >>> source = TileArrayChunks('debug', tile_ids, chunk_size=(8, 8))
+    >>> streamer = WorldStreamer(source)
+    >>> len(streamer.update(pygame.Rect(0, 0, 200, 200)))
+    0
+    >>> streamer.wait()
+    >>> len(streamer.update(pygame.Rect(0, 0, 200, 200)))
+    4
+    >>> streamer.impassable((3, 20)), streamer.impassable((3, 19))
+    (True, False)
+    >>> streamer.stop()
+
+"""
+
+import threading
+import collections
+
+try:
+    import Queue as queue
+
+except ImportError:
+    import queue
+
+import numpy
+import pygame
+
+from hypatia import game
+from hypatia import tiles
+from hypatia import render
+from hypatia import animations
+
+
+def region_bytes(map_chunk):
+    """Roughly how much memory a materialized region takes: its
+    layer images and its tile arrays.
+
+    Args:
+        map_chunk (game.MapChunk): --
+
+    Returns:
+        int: bytes.
+
+    """
+
+    tilemap = map_chunk.tilemap
+    surfaces = sum(image.get_bytesize() * image.get_width() *
+                   image.get_height() for image in tilemap.layer_images)
+    arrays = sum(array.nbytes for array in (tilemap.impassability,
+                                            tilemap.impassability_table,
+                                            tilemap.opacity,
+                                            tilemap.regions))
+
+    return surfaces + arrays
+
+
+class TileArrayChunks(object):
+    """A region source for a (depth, height, width) array of tile
+    IDs, materializing regions from slices of it.
+
+    The array is only sliced, so a ``numpy.memmap`` is only read a
+    region at a time.
+
+    Attributes:
+        tilesheet (tiles.Tilesheet): shared by every region.
+        tile_ids (numpy.ndarray): (depth, height, width).
+        chunk_size (tuple): (width, height) of a region, in tiles.
+            Regions on the right and bottom edges may be smaller.
+        depth (int): how many layers.
+        rect (pygame.Rect): the pixels covered by the map.
+
+    """
+
+    def __init__(self, tilesheet, tile_ids, chunk_size=(16, 16)):
+        """
+
+        Args:
+            tilesheet (tiles.Tilesheet|str): a tilesheet, or the
+                name of one to load.
+            tile_ids (numpy.ndarray): --
+            chunk_size (tuple): --
+
+        """
+
+        if not isinstance(tilesheet, tiles.Tilesheet):
+            tilesheet = tiles.Tilesheet.from_resources(tilesheet)
+
+        self.tilesheet = tilesheet
+        self.tile_ids = tile_ids
+        self.chunk_size = chunk_size
+        self.depth, height, width = tile_ids.shape
+        tile_width, tile_height = tilesheet.tile_size
+        self.rect = pygame.Rect(0, 0, width * tile_width,
+                                height * tile_height)
+
+    def __contains__(self, chunk_coord):
+        x, y = chunk_coord
+        chunk_width, chunk_height = self.chunk_size
+        __, height, width = self.tile_ids.shape
+
+        return (0 <= x * chunk_width < width and
+                0 <= y * chunk_height < height)
+
+    def chunks_in_rect(self, rect, margin=0):
+        """The coordinates of the regions overlapping rect.
+
+        Args:
+            rect (pygame.Rect): in pixels.
+            margin (int): also include this many regions around rect.
+
+        Returns:
+            list: (x, y) region coordinates, row by row.
+
+        """
+
+        clipped = rect.inflate(
+            margin * 2 * self.chunk_size[0] * self.tilesheet.tile_size[0],
+            margin * 2 * self.chunk_size[1] * self.tilesheet.tile_size[1],
+        ).clip(self.rect)
+
+        if not clipped.width or not clipped.height:
+
+            return []
+
+        region_width = self.chunk_size[0] * self.tilesheet.tile_size[0]
+        region_height = self.chunk_size[1] * self.tilesheet.tile_size[1]
+
+        return [(x, y)
+                for y in range(clipped.top // region_height,
+                               (clipped.bottom - 1) // region_height + 1)
+                for x in range(clipped.left // region_width,
+                               (clipped.right - 1) // region_width + 1)]
+
+    def materialize(self, chunk_coord, stitched=True):
+        """Slice the region at chunk_coord into a tilemap.
+
+        Args:
+            chunk_coord (tuple): (x, y) region coordinate.
+            stitched (bool): see :class:`tiles.TileMap`.
+
+        Returns:
+            game.MapChunk: --
+
+        """
+
+        chunk_width, chunk_height = self.chunk_size
+        tile_width, tile_height = self.tilesheet.tile_size
+        origin = (chunk_coord[0] * chunk_width, chunk_coord[1] * chunk_height)
+        block = numpy.asarray(
+            self.tile_ids[:, origin[1]:origin[1] + chunk_height,
+                          origin[0]:origin[0] + chunk_width]
+        )
+        tilemap = tiles.TileMap(self.tilesheet.name, block,
+                                tilesheet=self.tilesheet, stitched=stitched)
+        rect = pygame.Rect(origin[0] * tile_width, origin[1] * tile_height,
+                           block.shape[2] * tile_width,
+                           block.shape[1] * tile_height)
+
+        return game.MapChunk(chunk_coord, origin, rect, tilemap)
+
+
+class WorldStreamer(object):
+    """Keeps the regions around the player loaded, materializing
+    them in a background worker thread.
+
+    It's a world for a :class:`game.StreamedScene`, which updates it
+    with the viewport and the human player's velocity every frame.
+
+    Constants:
+        FINISH_PER_FRAME (int): how many regions the worker has
+            materialized to finish (stitch and prepare for blitting,
+            on the main thread) and start using each
+            :meth:`WorldStreamer.update`, so finishing never takes
+            much of one frame.
+
+    Attributes:
+        source: where regions come from; see the module docstring.
+        budget (int): bytes of regions which may stay loaded; past
+            it, regions out of range are unloaded, least recently
+            used first. Regions in range are never unloaded.
+        margin (int): how many regions around the viewport to load.
+        lookahead (float): how many seconds ahead of the player's
+            velocity to load.
+        loaded (collections.OrderedDict): region coordinate ->
+            :class:`game.MapChunk`, least recently used first.
+        loaded_bytes (int): how much the loaded regions take, see
+            :func:`region_bytes`.
+
+    """
+
+    FINISH_PER_FRAME = 4
+
+    def __init__(self, source, budget=64 * 1024 * 1024, margin=1,
+                 lookahead=1.0):
+        """Start the worker thread.
+
+        Args:
+            source: --
+            budget (int): --
+            margin (int): --
+            lookahead (float): --
+
+        """
+
+        self.source = source
+        self.budget = budget
+        self.margin = margin
+        self.lookahead = lookahead
+        self.loaded = collections.OrderedDict()
+        self.loaded_bytes = 0
+        self._runtime_ready = False
+
+        # region coordinate -> region_bytes() when it was loaded
+        self._sizes = {}
+
+        # regions asked of the worker, and those it's done with
+        self._pending = set()
+        self._requests = queue.Queue()
+        self._finished = queue.Queue()
+
+        # the regions in range, which the worker still materializes
+        self._wanted = frozenset()
+
+        self._thread = threading.Thread(target=self._work)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def rect(self):
+        """pygame.Rect: the pixels covered by the source."""
+
+        return self.source.rect
+
+    @property
+    def depth(self):
+        """int: how many layers the source has."""
+
+        return self.source.depth
+
+    @property
+    def tilesheet(self):
+        """tiles.Tilesheet: the source's."""
+
+        return self.source.tilesheet
+
+    def update(self, rect, velocity=(0, 0)):
+        """Start using the regions the worker has finished, ask it for
+        the regions around rect and ahead of velocity, and unload
+        regions out of range if over budget. Never waits on the
+        worker.
+
+        Call every frame with the viewport's rect.
+
+        Args:
+            rect (pygame.Rect): in pixels.
+            velocity (tuple): (x, y) pixels per second the player is
+                moving at.
+
+        Returns:
+            list: the loaded :class:`game.MapChunk` overlapping rect.
+
+        Raises:
+            Exception: whatever the source raised materializing a
+                region.
+
+        """
+
+        self._finish(WorldStreamer.FINISH_PER_FRAME)
+
+        # in view first, then ahead, then around
+        in_view = self.source.chunks_in_rect(rect)
+        ahead = self.source.chunks_in_rect(
+            rect.move(int(velocity[0] * self.lookahead),
+                      int(velocity[1] * self.lookahead)),
+            self.margin,
+        )
+        around = self.source.chunks_in_rect(rect, self.margin)
+        wanted = []
+
+        for chunk_coord in in_view + ahead + around:
+
+            if chunk_coord not in wanted:
+                wanted.append(chunk_coord)
+
+        self._wanted = frozenset(wanted)
+
+        for chunk_coord in wanted:
+
+            if chunk_coord in self.loaded:
+                self.loaded[chunk_coord] = self.loaded.pop(chunk_coord)
+            elif chunk_coord not in self._pending:
+                self._pending.add(chunk_coord)
+                self._requests.put(chunk_coord)
+
+        self._unload_over_budget()
+
+        return [self.loaded[chunk_coord] for chunk_coord in in_view
+                if chunk_coord in self.loaded]
+
+    def wait(self):
+        """Block until the worker is done with every region asked of
+        it, then start using them all, e.g., behind a loading screen.
+
+        Once the worker is stopped, only start using the regions it
+        finished, since nothing is left to do the rest.
+
+        """
+
+        if self._thread.is_alive():
+            self._requests.join()
+
+        self._finish(None)
+
+    def impassable(self, coord, default=True):
+        """Whether the tile at coord is impassable, if its region is
+        loaded.
+
+        Args:
+            coord (tuple): (x, y) tile coordinate.
+            default (bool): for a tile whose region isn't loaded yet;
+                actors can't walk into the unloaded world.
+
+        Returns:
+            bool: --
+
+        """
+
+        chunk_width, chunk_height = self.source.chunk_size
+        chunk_coord = (coord[0] // chunk_width, coord[1] // chunk_height)
+        map_chunk = self.loaded.get(chunk_coord)
+
+        if map_chunk is None:
+
+            # there's nothing in the map there
+            if chunk_coord not in self.source:
+
+                return False
+
+            return default
+
+        x = coord[0] - map_chunk.origin[0]
+        y = coord[1] - map_chunk.origin[1]
+
+        return bool(map_chunk.tilemap.impassability[y, x])
+
+    def blit_layer(self, viewport, layer):
+        """Draw a layer of the loaded regions in view on viewport.
+
+        Args:
+            viewport (render.Viewport): --
+            layer (int): --
+
+        """
+
+        for map_chunk in self.loaded.values():
+            map_chunk.blit_layer(viewport, layer)
+
+    def runtime_setup(self):
+        """Prepare regions for fast blitting as they're finished, and
+        play the animated tiles. See :meth:`tiles.TileMap.runtime_setup`.
+
+        """
+
+        self._runtime_ready = True
+
+        for map_chunk in self.loaded.values():
+            self._prepare(map_chunk)
+
+        for tile_pyganim in self.source.tilesheet.animated_tiles.values():
+            animations.convert_animation(tile_pyganim)
+            tile_pyganim.play()
+
+    def stop(self):
+        """Stop the worker thread, once it's done with what it's
+        doing.
+
+        """
+
+        self._requests.put(None)
+        self._thread.join()
+
+    def _work(self):
+        """Materialize the regions asked for, without stitching
+        them, skipping those which went out of range while they
+        waited.
+
+        """
+
+        while True:
+            chunk_coord = self._requests.get()
+
+            try:
+
+                if chunk_coord is None:
+
+                    return None
+
+                if chunk_coord not in self._wanted:
+                    self._finished.put((chunk_coord, None))
+
+                    continue
+
+                try:
+                    map_chunk = self.source.materialize(chunk_coord,
+                                                        stitched=False)
+                except Exception as exception:
+                    map_chunk = exception
+
+                self._finished.put((chunk_coord, map_chunk))
+            finally:
+                self._requests.task_done()
+
+    def _finish(self, count):
+        """Start using up to count (None for all) of the regions the
+        worker is done with.
+
+        """
+
+        while count is None or count > 0:
+
+            try:
+                chunk_coord, map_chunk = self._finished.get_nowait()
+            except queue.Empty:
+
+                break
+
+            self._pending.discard(chunk_coord)
+
+            if map_chunk is None:
+
+                continue
+
+            if isinstance(map_chunk, Exception):
+
+                raise map_chunk
+
+            for __ in map_chunk.tilemap.stitch():
+                pass
+
+            if self._runtime_ready:
+                self._prepare(map_chunk)
+
+            self.loaded[chunk_coord] = map_chunk
+            self._sizes[chunk_coord] = region_bytes(map_chunk)
+            self.loaded_bytes += self._sizes[chunk_coord]
+
+            if count is not None:
+                count -= 1
+
+    def _unload_over_budget(self):
+        """Unload regions out of range, least recently used first,
+        until the rest fit the budget.
+
+        """
+
+        for chunk_coord in list(self.loaded):
+
+            if self.loaded_bytes <= self.budget:
+
+                break
+
+            if chunk_coord not in self._wanted:
+                del self.loaded[chunk_coord]
+                self.loaded_bytes -= self._sizes.pop(chunk_coord)
+
+    @staticmethod
+    def _prepare(map_chunk):
+        """Replace a region's layer images with display-format ones."""
+
+        map_chunk.tilemap.layer_images = [
+            render.prepare_surface(image)
+            for image in map_chunk.tilemap.layer_images
+        ]
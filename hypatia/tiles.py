@@ -13,18 +13,37 @@ See Also:
 
 """
 
+import io
 import os
 import sys
+import copy
 import glob
 import zlib
+import struct
 import string
 import itertools
 
+import numpy
 import pygame
 import pyganim
 
 from hypatia import util
+from hypatia import render
+from hypatia import physics
 from hypatia import animations
+from hypatia import pathfinding
+
+# what a path may be; on Python 2, unicode too
+try:
+    STRING_TYPES = (basestring,)
+
+except NameError:
+    STRING_TYPES = (str,)
+
+
+# how many tiles read_tilemap_text() and write_tilemap_text() handle
+# at once, keeping their memory use flat
+TEXT_BATCH_TILES = 65536
 
 
 class BadTileID(Exception):
@@ -58,12 +77,40 @@ class TileMap(object):
       dimensions_in_tiles:
       layer_images:
       flags:
-      impassability:
+      tile_ids (numpy.ndarray): read-only (depth, height, width) int16
+        tilesheet tile IDs. Change them with :meth:`TileMap.set_tile`
+        or :meth:`TileMap.replace_tiles`.
+      impassability (numpy.ndarray): (height, width) in tiles; True
+        where any layer has an impassable tile.
+      impassability_table (numpy.ndarray): the
+        :func:`physics.summed_area_table` of impassability, for
+        :func:`physics.move_actors`.
+      opacity (numpy.ndarray): (height, width) in tiles; True where
+        any layer has a tile flagged "opaque", which can't be seen
+        through. See :mod:`fov`.
+      regions (numpy.ndarray): (height, width) int32 labels of the
+        groups of passable tiles connected to each other, 0 for
+        impassable tiles. See :meth:`TileMap.reachable`.
+      tile_listeners (list): callables, each called once per edit
+        as ``listener(tilemap, coords)`` after :meth:`TileMap.set_tile`
+        or :meth:`TileMap.replace_tiles` changes the tiles at coords,
+        a list of (x, y), each listed once.
       animated_tiles:
 
+    Constants:
+      PLANES (dict): name -> dtype of the (height, width) planes
+        derived from the tile IDs which can be given precomputed,
+        see :meth:`TileMap.to_binary`.
+
     """
 
-    def __init__(self, tilesheet_name, tile_ids):
+    PLANES = {
+              'impassability': numpy.dtype(bool),
+              'opacity': numpy.dtype(bool),
+             }
+
+    def __init__(self, tilesheet_name, tile_ids, tilesheet=None,
+                 stitched=True, planes=None):
         """Stitch tiles from swatch to layer surfaces.
 
         Piece together layers/surfaces from corresponding tile graphic
@@ -72,7 +119,21 @@ class TileMap(object):
 
         Args:
           tilesheet_name (str): directory name of the swatch to use
-          tile_ids (list): 3d list where list[layer][row][tile]
+          tile_ids (list|numpy.ndarray): 3d list where
+            list[layer][row][tile], or an array shaped like it, which
+            is copied.
+          tilesheet (Tilesheet|None): the swatch, already loaded, to
+            share between tilemaps, e.g., the chunks of one map.
+          stitched (bool): if False, the layer images are left blank
+            for :meth:`TileMap.stitch` to fill in, a slice at a time.
+          planes (dict|None): name -> array of any of
+            :attr:`TileMap.PLANES`, already derived from tile_ids,
+            which are copied rather than derived again.
+
+        Raises:
+          BadTileID: a tile ID isn't in the tilesheet.
+          ValueError: a plane's shape or dtype doesn't match
+            :attr:`TileMap.PLANES`.
 
         Examples:
           Make a 2x2x1 tilemap:
@@ -82,82 +143,149 @@ class TileMap(object):
         """
 
         # create the layer images and tile properties
-        tilesheet = Tilesheet.from_resources(tilesheet_name)
-        first_layer = tile_ids[0]
+        if tilesheet is None:
+            tilesheet = Tilesheet.from_resources(tilesheet_name)
 
-        width_tiles = len(first_layer[0])
-        height_tiles = len(first_layer)
-        depth_tiles = len(tile_ids)
+        # two bytes a tile, instead of a list of lists of ints
+        tile_ids = numpy.array(tile_ids, dtype=numpy.int16)
+        depth_tiles, height_tiles, width_tiles = tile_ids.shape
         dimensions_in_tiles = (width_tiles, height_tiles, depth_tiles)
+        tile_count = len(tilesheet.tiles)
+        bad_tile_ids = (tile_ids >= tile_count) | (tile_ids < -tile_count)
 
-        tile_size = tilesheet.tiles[0].size
-        tile_width, tile_height = tile_size
-        layer_width = len(first_layer[0]) * tile_width
-        layer_height = len(first_layer) * tile_height
-        layer_size = (layer_width, layer_height)
+        if bad_tile_ids.any():
 
-        tiles = []
-        layer_images = []
-        impassable_rects = []
-        animated_tile_stack = {i: set() for i in range(depth_tiles)}
+            raise BadTileID(int(tile_ids[bad_tile_ids][0]))
 
-        for z, layer in enumerate(tile_ids):
-            new_layer = pygame.Surface(layer_size, pygame.SRCALPHA, 32)
-            new_layer.fill([0, 0, 0, 0])
+        planes = dict(planes or {})
 
-            for y, row_of_tile_ids in enumerate(layer):
+        for plane_name, plane in planes.items():
+            dtype = TileMap.PLANES[plane_name]
 
-                for x, tile_id in enumerate(row_of_tile_ids):
-                    # is this right...?
-                    tile_index = (((z - 1) * height_tiles * width_tiles) +
-                                  (y * width_tiles) + x)
-                    tile = tilesheet[tile_id]
+            if (plane.shape != (height_tiles, width_tiles) or
+                    plane.dtype != dtype):
 
-                    # if not on first layer, merge flags down to first
-                    if z:
-                        tile_index = (y * width_tiles) + x
-                        tiles[tile_index].flags.update(tile.flags)
-                    else:
-                        tiles.append(tile)
+                raise ValueError('%s plane must be %s (%d, %d), not %s %s' %
+                                 (plane_name, dtype, height_tiles,
+                                  width_tiles, plane.dtype,
+                                  tuple(plane.shape)))
 
-                    # -1 is air/nothing
-                    if tile.tilesheet_id == -1:
+            # edits change the planes, which may be read-only
+            planes[plane_name] = numpy.array(plane)
 
-                        continue
+        # like indexing the tilesheet, -1 is its last tile
+        sheet_ids = tile_ids % tile_count
 
-                    # blit tile subsurface onto respective layer
-                    tile_position = (x * tile_width, y * tile_height)
-                    new_layer.blit(tile.subsurface, tile_position)
+        self._impassable_ids = numpy.array(['impass_all' in tile.flags
+                                            for tile in tilesheet.tiles])
+        self._opaque_ids = numpy.array(['opaque' in tile.flags
+                                        for tile in tilesheet.tiles])
 
-                    # is this tile an animation?
-                    if tile.tilesheet_id in tilesheet.animated_tiles:
-                        animated_tile = (tilesheet.
-                                         animated_tiles[tile.tilesheet_id])
-                        animation_info = (animated_tile, tile_position)
-                        animated_tile_stack[z].add(animation_info)
+        if 'impassability' in planes:
+            impassability = planes['impassability']
+            impassable_tiles = impassability[numpy.newaxis]
+        else:
+            impassable_tiles = self._impassable_ids.take(sheet_ids)
+            impassability = impassable_tiles.any(axis=0)
 
-                    # finally passability!
-                    if 'impass_all' in tile.flags:
-                        impassable_rects.append(pygame.Rect(tile_position,
-                                                            tile_size))
+        if 'opacity' in planes:
+            opacity = planes['opacity']
+        else:
+            opacity = self._opaque_ids.take(sheet_ids).any(axis=0)
 
+        # one for each impassable layer, or each impassable tile if
+        # impassability is precomputed
+        tile_size = tilesheet.tile_size
+        tile_width, tile_height = tile_size
+        impassable_rects = [
+                            pygame.Rect((x * tile_width, y * tile_height),
+                                        tile_size)
+                            for __, y, x in
+                            numpy.argwhere(impassable_tiles).tolist()
+                           ]
+
+        layer_size = (width_tiles * tile_width, height_tiles * tile_height)
+        layer_images = []
+
+        for z in range(depth_tiles):
+            new_layer = pygame.Surface(layer_size, pygame.SRCALPHA, 32)
+            new_layer.fill([0, 0, 0, 0])
             layer_images.append(new_layer)
 
         self.tilesheet = tilesheet
         self.layer_images = layer_images
-        self.tiles = tiles
         self.impassable_rects = impassable_rects
-        self.animated_tile_stack = animated_tile_stack
+        self.impassability = impassability
+        self.impassability_table = physics.summed_area_table(impassability)
+        self.opacity = opacity
+        self._relabel_regions()
+        self.animated_tile_stack = {z: set() for z in range(depth_tiles)}
         self.dimensions_in_tiles = dimensions_in_tiles
+        self.tile_listeners = []
 
-        # the 3D list of Tilesheet tile IDs
-        # which constructed this TileMap. It
-        # is not updated when self.tiles is.
+        # the Tilesheet tile IDs which constructed this TileMap, kept
+        # up to date by set_tile() and replace_tiles().
         self._tile_ids = tile_ids
 
+        if stitched:
+
+            for __ in self.stitch():
+                pass
+
+    def stitch(self, rows_per_slice=None):
+        """Blit every tile onto its layer image, and start its
+        animation if it has one, a band of rows at a time, yielding
+        after each band so the work can be spread over several frames.
+
+        Args:
+          rows_per_slice (int|None): rows per band; None for whole
+            layers.
+
+        Yields:
+          float: how much of the tilemap is stitched, from 0 to 1.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[0, 1], [2, 3]]], stitched=False)
+          >>> list(tilemap.stitch(rows_per_slice=1))
+          [0.5, 1.0]
+
+        """
+
+        width, height, depth = self.dimensions_in_tiles
+        rows_per_slice = rows_per_slice or height
+
+        for z in range(depth):
+
+            for top in range(0, height, rows_per_slice):
+                bottom = min(top + rows_per_slice, height)
+                rows, columns = numpy.mgrid[top:bottom, 0:width]
+                self._draw_tiles(z, rows.ravel(), columns.ravel(),
+                                 clear=False)
+
+                yield (z * height + bottom) / float(depth * height)
+
+    @property
+    def tile_ids(self):
+        """Read-only view of the (depth, height, width) tile IDs.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[0, 1], [2, 3]]])
+          >>> tilemap.tile_ids[0, 1].tolist()
+          [2, 3]
+
+        """
+
+        tile_ids = self._tile_ids.view()
+        tile_ids.flags.writeable = False
+
+        return tile_ids
+
     def __getitem__(self, coord):
         """Fetch TileInfo by tile coordinate.
 
+        The tile on the first layer, with the flags of the tiles on
+        every layer above it.
+
         Args:
           coord (tuple): (x, y) coordinate; z always just
             z-index (it's not a pixel value)
@@ -174,9 +302,13 @@ class TileMap(object):
         """
 
         x, y = coord
-        width_in_tiles = self.dimensions_in_tiles[0]
+        tile_ids = self._tile_ids[:, y, x].tolist()
+        tile = self.tilesheet[tile_ids[0]]
 
-        return self.tiles[coord_to_index(width_in_tiles, x, y)]
+        for tile_id in tile_ids[1:]:
+            tile = tile.merged(self.tilesheet[tile_id])
+
+        return tile
 
     def get_info(self, coord):
         """Fetch TileProperties by pixel coordinate.
@@ -204,6 +336,414 @@ class TileMap(object):
 
         return self[(tile_x, tile_y)]
 
+    def set_tile(self, coord, z, tile_id):
+        """Replace the tile at coord on layer z, updating the layer
+        image, animated tiles and passability, then tell each of
+        :attr:`TileMap.tile_listeners`.
+
+        Args:
+          coord (tuple): (x, y) tile coordinate.
+          z (int): the layer.
+          tile_id (int): the tilesheet tile id.
+
+        Raises:
+          BadTileID: tile_id isn't in the tilesheet.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[11, 11], [11, 11]]])
+          >>> changed = []
+          >>> tilemap.tile_listeners.append(
+          ...     lambda tilemap, coords: changed.append(coords))
+          >>> tilemap.set_tile((1, 0), 0, 99)
+          >>> changed
+          [[(1, 0)]]
+          >>> tilemap.impassability.tolist()
+          [[False, True], [False, False]]
+
+        """
+
+        x, y = coord
+        self.tilesheet[tile_id]
+        self._tile_ids[z, y, x] = tile_id
+        self._tiles_changed([(z, numpy.array([y]), numpy.array([x]))])
+
+    def replace_tiles(self, old_tile_ids, tile_id, rect=None, z=None):
+        """Replace every tile in old_tile_ids with tile_id at once,
+        like :meth:`TileMap.set_tile` for each of them, but telling
+        :attr:`TileMap.tile_listeners` just once.
+
+        Args:
+          old_tile_ids (int|list): the tilesheet tile ids to replace.
+          tile_id (int): the tilesheet tile id to replace them with.
+          rect (pygame.Rect|tuple|None): only in this area, in tiles;
+            see :meth:`TileMap.tile_ids_in_rect`.
+          z (int|None): only on this layer.
+
+        Returns:
+          int: how many tiles were replaced.
+
+        Raises:
+          BadTileID: tile_id isn't in the tilesheet.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[11, 99, 11], [99, 99, 11]]])
+          >>> tilemap.replace_tiles(99, 11, rect=(1, 0, 2, 2))
+          2
+          >>> tilemap.impassability.tolist()
+          [[False, False, False], [True, False, False]]
+
+        """
+
+        self.tilesheet[tile_id]
+        rows, columns = self._area(rect)
+        depth = self.dimensions_in_tiles[2]
+        changes = []
+
+        for layer in (range(depth) if z is None else (z,)):
+            area = self._tile_ids[layer, rows, columns]
+            area_rows, area_columns = numpy.nonzero(
+                numpy.isin(area, old_tile_ids)
+            )
+
+            if not len(area_rows):
+
+                continue
+
+            area[area_rows, area_columns] = tile_id
+            changes.append((layer, area_rows + rows.start,
+                            area_columns + columns.start))
+
+        if changes:
+            self._tiles_changed(changes)
+
+        return sum(len(change_rows) for __, change_rows, __ in changes)
+
+    def tile_ids_in_rect(self, rect, z=None):
+        """The tile IDs in an area of the map, as a read-only view
+        of :attr:`TileMap.tile_ids` rather than a copy.
+
+        Args:
+          rect (pygame.Rect|tuple|None): (x, y, width, height) in
+            tiles, clipped to the map. None for the whole map.
+          z (int|None): only this layer.
+
+        Returns:
+          numpy.ndarray: (depth, height, width), or (height, width)
+            for one layer.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[0, 1, 2], [3, 4, 5]]])
+          >>> tilemap.tile_ids_in_rect((1, 0, 5, 5), z=0).tolist()
+          [[1, 2], [4, 5]]
+
+        """
+
+        rows, columns = self._area(rect)
+
+        if z is None:
+
+            return self.tile_ids[:, rows, columns]
+
+        return self.tile_ids[z, rows, columns]
+
+    def tile_mask(self, tile_ids, rect=None, z=None):
+        """Where any of tile_ids are.
+
+        Args:
+          tile_ids (int|list): tilesheet tile ids.
+          rect (pygame.Rect|tuple|None): see
+            :meth:`TileMap.tile_ids_in_rect`.
+          z (int|None): only this layer.
+
+        Returns:
+          numpy.ndarray: bool, shaped like
+            :meth:`TileMap.tile_ids_in_rect`.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[11, 99], [98, 11]]])
+          >>> tilemap.tile_mask([98, 99], z=0).tolist()
+          [[False, True], [True, False]]
+
+        """
+
+        return numpy.isin(self.tile_ids_in_rect(rect, z), tile_ids)
+
+    def count_tiles(self, tile_ids, rect=None, z=None):
+        """How many of the tiles are any of tile_ids.
+
+        Args:
+          tile_ids (int|list): tilesheet tile ids.
+          rect (pygame.Rect|tuple|None): see
+            :meth:`TileMap.tile_ids_in_rect`.
+          z (int|None): only this layer.
+
+        Returns:
+          int: --
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[11, 99], [99, 11]]])
+          >>> tilemap.count_tiles(99), tilemap.count_tiles(99, (0, 0, 1, 2))
+          (2, 1)
+
+        """
+
+        return int(numpy.count_nonzero(self.tile_mask(tile_ids, rect, z)))
+
+    def _area(self, rect):
+        """The (rows, columns) slices of the tiles in rect, clipped
+        to the map.
+
+        """
+
+        width, height = self.dimensions_in_tiles[:2]
+        bounds = pygame.Rect(0, 0, width, height)
+        area = bounds if rect is None else pygame.Rect(rect).clip(bounds)
+
+        return slice(area.top, area.bottom), slice(area.left, area.right)
+
+    def _tiles_changed(self, changes):
+        """Update everything derived from the tile IDs after they've
+        changed, then tell each of :attr:`TileMap.tile_listeners`
+        about all of them at once.
+
+        Args:
+          changes (list): (z, rows, columns) of the changed tiles of
+            each layer.
+
+        """
+
+        for z, rows, columns in changes:
+            self._draw_tiles(z, rows, columns)
+
+        # each tile once, however many of its layers changed
+        width = self.dimensions_in_tiles[0]
+        indices = numpy.unique(numpy.concatenate(
+            [rows * width + columns for __, rows, columns in changes]
+        ))
+        rows, columns = indices // width, indices % width
+
+        # finally passability and opacity!
+        tile_count = len(self.tilesheet.tiles)
+        sheet_ids = self._tile_ids[:, rows, columns] % tile_count
+        opaque = self._opaque_ids.take(sheet_ids).any(axis=0)
+        self.opacity[rows, columns] = opaque
+        impassable = self._impassable_ids.take(sheet_ids).any(axis=0)
+        changed = impassable != self.impassability[rows, columns]
+
+        if changed.any():
+            self._update_passability(rows[changed], columns[changed],
+                                     impassable[changed])
+
+        coords = list(zip(columns.tolist(), rows.tolist()))
+
+        for listener in self.tile_listeners:
+            listener(self, coords)
+
+    def _draw_tiles(self, z, rows, columns, clear=True):
+        """Blit the tiles at rows and columns on layer z onto its
+        layer image, and keep track of which of them are animated.
+
+        """
+
+        tilesheet = self.tilesheet
+        tile_width, tile_height = tile_size = tilesheet.tile_size
+        sheet_ids = self._tile_ids[z, rows, columns] % len(tilesheet.tiles)
+        positions = list(zip((columns * tile_width).tolist(),
+                             (rows * tile_height).tolist()))
+        layer_image = self.layer_images[z]
+        animated_tiles = self.animated_tile_stack[z]
+
+        if clear:
+            colorkey = layer_image.get_colorkey()
+
+            for tile_position in positions:
+                layer_image.fill(colorkey or (0, 0, 0, 0),
+                                 pygame.Rect(tile_position, tile_size))
+
+            redrawn = set(positions)
+            animated_tiles.difference_update(
+                [animation_info for animation_info in animated_tiles
+                 if animation_info[1] in redrawn]
+            )
+
+        subsurfaces = [tile.subsurface for tile in tilesheet.tiles]
+        sheet_ids = sheet_ids.tolist()
+        render.blits(layer_image, [(subsurfaces[tile_id], tile_position)
+                                   for tile_id, tile_position
+                                   in zip(sheet_ids, positions)])
+
+        # is this tile an animation?
+        for tile_id, tile_position in zip(sheet_ids, positions):
+
+            if tile_id in tilesheet.animated_tiles:
+                animated_tile = tilesheet.animated_tiles[tile_id]
+                animated_tiles.add((animated_tile, tile_position))
+
+    def _update_passability(self, rows, columns, impassable):
+        """Set the impassability of the tiles at rows and columns,
+        which has changed, and relabel :attr:`TileMap.regions`.
+
+        """
+
+        self.impassability[rows, columns] = impassable
+        self.impassability_table = physics.summed_area_table(
+            self.impassability
+        )
+        tile_width, tile_height = tile_size = self.tilesheet.tile_size
+        positions = list(zip((columns * tile_width).tolist(),
+                             (rows * tile_height).tolist()))
+        impassable = impassable.tolist()
+
+        if len(positions) == 1:
+            tile_rect = pygame.Rect(positions[0], tile_size)
+
+            if impassable[0]:
+                self.impassable_rects.append(tile_rect)
+            else:
+
+                # one for each impassable layer
+                while tile_rect in self.impassable_rects:
+                    self.impassable_rects.remove(tile_rect)
+
+            self._update_regions((int(columns[0]), int(rows[0])))
+
+            return None
+
+        passable = set(tile_position for tile_position, now_impassable
+                       in zip(positions, impassable) if not now_impassable)
+
+        if passable:
+            self.impassable_rects = [rect for rect in self.impassable_rects
+                                     if rect.topleft not in passable]
+
+        self.impassable_rects.extend(
+            pygame.Rect(tile_position, tile_size)
+            for tile_position, now_impassable in zip(positions, impassable)
+            if now_impassable
+        )
+
+        # relabelling from scratch beats joining and splitting
+        # regions a tile at a time
+        self._relabel_regions()
+
+    def reachable(self, start, goal):
+        """Whether there's any way to walk from start to goal.
+
+        Args:
+          start (tuple): (x, y) tile coordinate.
+          goal (tuple): (x, y) tile coordinate.
+
+        Returns:
+          bool: False if either is off the map or impassable.
+
+        Examples:
+          >>> tilemap = TileMap('debug', [[[11, 99, 11]]])
+          >>> tilemap.reachable((0, 0), (2, 0))
+          False
+          >>> tilemap.set_tile((1, 0), 0, 11)
+          >>> tilemap.reachable((0, 0), (2, 0))
+          True
+
+        """
+
+        height, width = self.regions.shape
+        regions = []
+
+        for x, y in (start, goal):
+
+            if not (0 <= x < width and 0 <= y < height):
+
+                return False
+
+            regions.append(self.regions[y, x])
+
+        return bool(regions[0] and regions[0] == regions[1])
+
+    def _relabel_regions(self):
+        """Label :attr:`TileMap.regions` from scratch, keeping track
+        of the bounds of each region.
+
+        """
+
+        self.regions = pathfinding.label_regions(~self.impassability)
+        self._next_region = int(self.regions.max()) + 1
+        self._region_bounds = pathfinding.region_bounds(self.regions)
+
+    def _update_regions(self, coord):
+        """Relabel :attr:`TileMap.regions` after the tile at coord
+        has changed passability, only touching the bounds of the
+        regions it joins or splits, rather than the whole map.
+
+        """
+
+        x, y = coord
+        height, width = self.regions.shape
+
+        if not self.impassability[y, x]:
+            neighbor_regions = set()
+
+            for neighbor_x, neighbor_y in ((x - 1, y), (x + 1, y),
+                                           (x, y - 1), (x, y + 1)):
+
+                if 0 <= neighbor_x < width and 0 <= neighbor_y < height:
+                    neighbor_regions.add(
+                        int(self.regions[neighbor_y, neighbor_x])
+                    )
+
+            neighbor_regions.discard(0)
+
+            if not neighbor_regions:
+                self.regions[y, x] = self._next_region
+                self._region_bounds[self._next_region] = (x, y, x + 1,
+                                                          y + 1)
+                self._next_region += 1
+
+                return None
+
+            # join every region around coord into one, within the
+            # bounds of them all
+            region = min(neighbor_regions)
+            left, top, right, bottom = x, y, x + 1, y + 1
+
+            for joined_region in neighbor_regions:
+                (joined_left, joined_top, joined_right,
+                 joined_bottom) = self._region_bounds.pop(joined_region)
+                left, top = min(left, joined_left), min(top, joined_top)
+                right = max(right, joined_right)
+                bottom = max(bottom, joined_bottom)
+
+            neighbor_regions.discard(region)
+
+            if neighbor_regions:
+                area = self.regions[top:bottom, left:right]
+                area[numpy.isin(area, list(neighbor_regions))] = region
+
+            self.regions[y, x] = region
+            self._region_bounds[region] = (left, top, right, bottom)
+
+            return None
+
+        # the region coord was in may have been split
+        region = int(self.regions[y, x])
+        self.regions[y, x] = 0
+        left, top, right, bottom = self._region_bounds.pop(region)
+        area = self.regions[top:bottom, left:right]
+        parts = pathfinding.label_regions(area == region)
+
+        if not parts.any():
+
+            return None
+
+        # the first part keeps the old label
+        new_labels = numpy.arange(parts.max() + 1, dtype=numpy.int32)
+        new_labels[2:] += self._next_region - 2
+        new_labels[1] = region
+        self._next_region += int(parts.max()) - 1
+        relabelled = new_labels[parts]
+        area[parts > 0] = relabelled[parts > 0]
+        self._region_bounds.update(pathfinding.region_bounds(relabelled,
+                                                             (left, top)))
+
     def blit_layer_animated_tiles(self, viewport, layer):
         """Blit all of the animated tiles from a
         designated layer to the supplied viewport.
@@ -223,17 +763,17 @@ class TileMap(object):
         """This is for game.py. These need to be launched after pygame
         has started.
 
-        """
+        Replaces the layer images and the frames of the animated tiles
+        with versions prepared for fast blitting, see
+        :func:`render.prepare_surface`.
 
-        layer_images = self.layer_images
+        """
 
-        for image in layer_images:
-            image.convert()
-            image.convert_alpha()
+        self.layer_images = [render.prepare_surface(image)
+                             for image in self.layer_images]
 
         for i, tile_pyganim in self.tilesheet.animated_tiles.items():
-            tile_pyganim.convert()
-            tile_pyganim.convert_alpha()
+            animations.convert_animation(tile_pyganim)
             tile_pyganim.play()
 
         return None
@@ -251,58 +791,291 @@ class TileMap(object):
 
         """
 
-        output_string = ''
+        output = io.StringIO()
+        self.to_file(output, separator)
+
+        return output.getvalue()[:-1]
+
+    def to_file(self, writable, separator=' '):
+        """Write tilemap.txt, a batch of rows at a time. See
+        :func:`write_tilemap_text`.
+
+        Args:
+          writable (file-like-object): opened in text mode.
+          separator (str): can be ''
+
+        """
 
-        # create map layers
-        layers = []
         max_digits = len(str(len(self.tilesheet.tiles))) - 1
-        id_format = '%0' + str(max_digits) + 'd'
+        write_tilemap_text(writable, self.tilesheet.name, self._tile_ids,
+                           max_digits, separator)
 
-        for layer in self._tile_ids:
-            layer_lines = []
+    def to_binary(self, compress=True):
+        """Encode the tilemap as tilemap.bin, with its
+        :attr:`TileMap.PLANES` precomputed. See :class:`BinaryTilemap`.
 
-            for row in layer:
-                row_string = separator.join([id_format % i for i in row])
+        Args:
+          compress (bool): see :meth:`BinaryTilemap.to_bytes`.
 
-                layer_lines.append(row_string)
+        Returns:
+            bytes: --
 
-            layer_string = '\n'.join(layer_lines)
-            layers.append(layer_string)
+        """
 
-        layers_string = '\n\n'.join(layers)
-        output_string += layers_string
+        planes = {
+                  'tile_ids': self._tile_ids,
+                  'impassability': self.impassability,
+                  'opacity': self.opacity,
+                 }
 
-        return self.tilesheet.name + '\n' + output_string
+        return BinaryTilemap(self.tilesheet.name, planes).to_bytes(compress)
 
     @classmethod
-    def from_string(cls, map_string, separator=' '):
+    def from_binary(cls, source, stitched=True):
+        """Create a TileMap from tilemap.bin, using whichever of
+        :attr:`TileMap.PLANES` it has instead of deriving them.
+
+        The tile IDs and planes are copied, since a tilemap's are
+        edited in place, so even a memory-mapped tilemap.bin is read
+        once, in full; mapping only spares reading it into bytes
+        first.
+
+        Args:
+          source: see :meth:`BinaryTilemap.read`.
+          stitched (bool): see :meth:`TileMap.__init__`.
+
+        Returns:
+            TileMap: --
+
+        Raises:
+          ValueError: see :meth:`BinaryTilemap.read`, or a plane's
+            shape or dtype is wrong.
+
+        """
+
+        binary = BinaryTilemap.read(source)
+        planes = {plane_name: plane
+                  for plane_name, plane in binary.planes.items()
+                  if plane_name in TileMap.PLANES}
+
+        return TileMap(binary.tilesheet_name, binary.planes['tile_ids'],
+                       stitched=stitched, planes=planes)
+
+    @classmethod
+    def from_string(cls, map_string, separator=' ', stitched=True):
         """This is a debug feature. Create a 3D list of tile names using
         ASCII symbols. Supports layers.
 
         Used for reading tilemap.txt.
 
+        Args:
+          map_string (str): --
+          separator (str): --
+          stitched (bool): see :meth:`TileMap.__init__`.
+
+        Returns:
+            TileMap: --
+
+        """
+
+        return cls.from_file(map_string.split('\n'), separator, stitched)
+
+    @classmethod
+    def from_file(cls, lines, separator=' ', stitched=True):
+        """Read tilemap.txt line by line. See
+        :func:`read_tilemap_text`.
+
+        Args:
+          lines (Iterable): a file object, or any other iterable of
+            lines.
+          separator (str): --
+          stitched (bool): see :meth:`TileMap.__init__`.
+
         Returns:
             TileMap: --
 
         """
 
-        # GET TILESHEET NAME FROM THE FIRST LINE, REMOVE FIRST LINE
-        tilesheet_name, layers_string = map_string.split('\n', 1)
+        tilesheet_name, tile_ids = read_tilemap_text(lines, separator)
+
+        return TileMap(tilesheet_name, tile_ids, stitched=stitched)
+
+
+class BinaryTilemap(object):
+    """A tile map's tile IDs, and optionally precomputed planes like
+    its passability, in a compact binary format: tilemap.bin.
+
+    Unlike tilemap.txt, the tile IDs are a typed array, compressed
+    or not, which is read in one go instead of cell by cell. Planes
+    stored uncompressed are read in place: memory-mapped when
+    reading from a path, or viewed without a copy when reading from
+    bytes. :meth:`TileMap.from_binary` copies them all the same, into
+    an editable tilemap.
+
+    The format is little-endian:
+
+      * header: magic ``HTMB``, version (uint16), plane count
+        (uint16), width, height and depth in tiles (uint32 each),
+        the tilesheet name's length (uint16), then the name in UTF-8
+      * plane table, 8-byte aligned: for each plane, its name (16
+        bytes, NUL padded), NumPy dtype (4 bytes, e.g., ``<i2``),
+        compression (uint8: 0 none, 1 zlib), dimensions (uint8: 3
+        for (depth, height, width), 2 for (height, width)), 2 bytes
+        padding, offset from the start of the file and stored
+        length (uint64 each)
+      * plane data, each starting :attr:`BinaryTilemap.ALIGNMENT`
+        aligned
+
+    Constants:
+        MAGIC (bytes): --
+        VERSION (int): --
+        ALIGNMENT (int): bytes plane data is aligned to, so it can
+            be memory-mapped as any dtype.
+
+    Attributes:
+        tilesheet_name (str): --
+        dimensions_in_tiles (tuple): (width, height, depth)
+        planes (dict): name -> numpy.ndarray. ``tile_ids`` is always
+            there, int16 (depth, height, width); :meth:`TileMap.to_binary`
+            adds the (height, width) :attr:`TileMap.PLANES`. Planes
+            read in place are read-only.
+
+    Example:
+        >>> tilemap = TileMap('debug', [[[11, 99], [11, 11]]])
+        >>> binary = BinaryTilemap.read(tilemap.to_binary())
+        >>> binary.tilesheet_name, binary.dimensions_in_tiles
+        ('debug', (2, 2, 1))
+        >>> binary.planes['impassability'].tolist()
+        [[False, True], [False, False]]
+
+    """
+
+    MAGIC = b'HTMB'
+    VERSION = 1
+    ALIGNMENT = 64
+    _HEADER = struct.Struct('<4sHHIIIH')
+    _PLANE = struct.Struct('<16s4sBB2xQQ')
+
+    def __init__(self, tilesheet_name, planes):
+        """
+
+        Args:
+            tilesheet_name (str): --
+            planes (dict): name -> array; see
+                :attr:`BinaryTilemap.planes`.
+
+        """
+
+        depth, height, width = planes['tile_ids'].shape
+        self.tilesheet_name = tilesheet_name
+        self.dimensions_in_tiles = (width, height, depth)
+        self.planes = planes
+
+    def to_bytes(self, compress=True):
+        """Encode as tilemap.bin.
+
+        Args:
+            compress (bool): zlib compress the planes, making them
+                smaller but not readable in place.
 
-        # NOTE: I'm using strip('\n') because I can't seem to make
-        # the \n at the end of map-string.txt to go away.
-        # watch the quirky wording; layers_string >> layer_strings
-        layer_strings = layers_string.strip('\n').split('\n\n')
+        Returns:
+            bytes: --
 
-        # transform our characters into a 3D list of tile graphic names
-        layers = []
+        """
 
-        for layer_string in layer_strings:
-            layer = [[int(tile_id) for tile_id in row.split(separator)]
-                     for row in layer_string.split('\n')]
-            layers.append(layer)
+        name = self.tilesheet_name.encode('utf-8')
+        width, height, depth = self.dimensions_in_tiles
+        header = self._HEADER.pack(BinaryTilemap.MAGIC, BinaryTilemap.VERSION,
+                                   len(self.planes), width, height, depth,
+                                   len(name)) + name
+        header += b'\0' * (-len(header) % 8)
+        offset = len(header) + self._PLANE.size * len(self.planes)
+        table = []
+        data = []
+
+        for plane_name in sorted(self.planes):
+            plane = self.planes[plane_name]
+            dtype = plane.dtype.newbyteorder('<')
+            stored = numpy.ascontiguousarray(plane, dtype=dtype).tobytes()
+
+            if compress:
+                stored = zlib.compress(stored)
+
+            padding = -offset % BinaryTilemap.ALIGNMENT
+            data.append(b'\0' * padding)
+            offset += padding
+            table.append(self._PLANE.pack(plane_name.encode('ascii'),
+                                          dtype.str.encode('ascii'),
+                                          int(compress), plane.ndim,
+                                          offset, len(stored)))
+            data.append(stored)
+            offset += len(stored)
+
+        return header + b''.join(table) + b''.join(data)
 
-        return TileMap(tilesheet_name, layers)
+    @classmethod
+    def read(cls, source):
+        """Decode tilemap.bin.
+
+        Args:
+            source (str|bytes|memoryview|file-like-object): a path is
+                memory-mapped. On Python 2, where bytes are a str too,
+                a str starting with :attr:`BinaryTilemap.MAGIC` is
+                the tilemap.bin itself, anything else is a path.
+
+        Returns:
+            BinaryTilemap: --
+
+        Raises:
+            ValueError: source isn't tilemap.bin, or is a newer
+                version.
+
+        """
+
+        # e.g., Resource files read from a zip are a str on Python 2
+        holds_tilemap = (isinstance(source, bytes) and
+                         source.startswith(BinaryTilemap.MAGIC))
+
+        if isinstance(source, STRING_TYPES) and not holds_tilemap:
+            buffer = numpy.memmap(source, dtype=numpy.uint8, mode='r')
+        else:
+
+            if hasattr(source, 'read'):
+                source = source.read()
+
+            buffer = numpy.frombuffer(source, dtype=numpy.uint8)
+
+        (magic, version, plane_count, width, height, depth,
+         name_length) = cls._HEADER.unpack_from(buffer, 0)
+
+        if magic != BinaryTilemap.MAGIC or version > BinaryTilemap.VERSION:
+
+            raise ValueError('not a tilemap.bin (version %d or older)' %
+                             BinaryTilemap.VERSION)
+
+        name_start = cls._HEADER.size
+        tilesheet_name = (buffer[name_start:name_start + name_length].
+                          tobytes().decode('utf-8'))
+        table_start = name_start + name_length
+        table_start += -table_start % 8
+        shapes = {3: (depth, height, width), 2: (height, width)}
+        planes = {}
+
+        for i in range(plane_count):
+            (plane_name, dtype, compression, ndim, offset,
+             length) = cls._PLANE.unpack_from(buffer, table_start +
+                                              i * cls._PLANE.size)
+            stored = buffer[offset:offset + length]
+
+            if compression:
+                stored = numpy.frombuffer(zlib.decompress(stored),
+                                          dtype=numpy.uint8)
+
+            plane_name = plane_name.rstrip(b'\0').decode('ascii')
+            dtype = dtype.rstrip(b'\0').decode('ascii')
+            planes[plane_name] = stored.view(dtype).reshape(shapes[ndim])
+
+        return cls(tilesheet_name, planes)
 
 
 class Tilesheet(object):
@@ -369,7 +1142,7 @@ class Tilesheet(object):
                                 'tilesheets',
                                 tilesheet_name + '.zip'
                                )
-        tilesheet_surface = pygame.image.load(resource['tilesheet.png'])
+        tilesheet_surface = resource['tilesheet.png']
         config = resource['tilesheet.ini']
 
         # build the meta
@@ -468,6 +1241,31 @@ class Tile(object):
         self.tilesheet_id = tilesheet_id
         self.size = tile_size
 
+    def merged(self, other):
+        """This tile with other's flags too, e.g., for the tile under
+        other on a higher layer.
+
+        The tilesheet's tiles are shared, between tilemaps and between
+        the coordinates they're at, so they're never modified.
+
+        Args:
+          other (Tile): --
+
+        Returns:
+          Tile: this tile, if it already has all of other's flags,
+            or else a copy of it with them.
+
+        """
+
+        if other.flags <= self.flags:
+
+            return self
+
+        tile = copy.copy(self)
+        tile.flags = self.flags | other.flags
+
+        return tile
+
 
 def coord_to_index(width, x, y):
     """Return the 1D index which corresponds to 2D position (x, y).
@@ -513,6 +1311,215 @@ def index_to_coord(width, i):
         return ((i % width), (i // width))
 
 
+def read_tilemap_text(lines, separator=' '):
+    """Read tilemap.txt line by line, parsing batches of rows with
+    NumPy rather than each tile ID with ``int()``.
+
+    tilemap.txt is the tilesheet name on the first line, then each
+    layer's rows of tile IDs, layers separated by a blank line.
+
+    Args:
+        lines (Iterable): a file object, opened in text or binary
+            mode, or any other iterable of lines.
+        separator (str): between tile IDs; can't be ''.
+
+    Returns:
+        tuple: (tilesheet name, numpy.ndarray of int16 tile IDs,
+            (depth, height, width)).
+
+    Raises:
+        ValueError: a row has the wrong number of tile IDs, or
+            something other than tile IDs, or separator is ''.
+
+    Example:
+        >>> lines = ['debug', '11 -1', '99 11', '', '01 02', '03 04']
+        >>> tilesheet_name, tile_ids = read_tilemap_text(lines)
+        >>> tilesheet_name, tile_ids.tolist()
+        ('debug', [[[11, -1], [99, 11]], [[1, 2], [3, 4]]])
+
+    """
+
+    if not separator:
+
+        raise ValueError("tilemap.txt can't be read without a separator")
+
+    lines = iter(lines)
+    tilesheet_name = next(lines).strip()
+    joiner = separator
+
+    if isinstance(tilesheet_name, bytes):
+        tilesheet_name = tilesheet_name.decode('utf-8')
+        joiner = separator.encode('ascii')
+
+    layers = []
+    layer = []
+    rows = []
+    width = None
+
+    def parse(rows):
+        row_ids = numpy.fromstring(joiner.join(rows), dtype=numpy.int16,
+                                   sep=separator)
+
+        if row_ids.size != len(rows) * width:
+
+            raise ValueError('tilemap.txt rows must each have %d tile '
+                             'IDs' % width)
+
+        return row_ids.reshape((len(rows), width))
+
+    # a blank line after the last ends the last layer
+    for line in itertools.chain(lines, ['']):
+        line = line.strip()
+
+        # layer rows, parsed a batch at a time
+        if line:
+
+            if width is None:
+                width = line.count(joiner) + 1
+
+            rows.append(line)
+
+            if len(rows) * width >= TEXT_BATCH_TILES:
+                layer.append(parse(rows))
+                rows = []
+
+            continue
+
+        if rows:
+            layer.append(parse(rows))
+            rows = []
+
+        if layer:
+            layers.append(numpy.concatenate(layer))
+            layer = []
+
+    if not layers:
+
+        return tilesheet_name, numpy.zeros((0, 0, 0), dtype=numpy.int16)
+
+    if len(set(parsed_layer.shape for parsed_layer in layers)) > 1:
+
+        raise ValueError('tilemap.txt layers must all be the same size')
+
+    return tilesheet_name, numpy.stack(layers)
+
+
+def format_tile_ids(tile_ids, digits, separator=' '):
+    """Format rows of tile IDs as lines of tilemap.txt, all at once.
+
+    Each ID is formatted like ``'%0*d' % (digits, tile_id)``.
+
+    Args:
+        tile_ids (numpy.ndarray): (rows, columns) ints.
+        digits (int): the least digits per tile ID.
+        separator (str): between tile IDs.
+
+    Returns:
+        bytes: each row, ending in a newline.
+
+    Example:
+        >>> format_tile_ids(numpy.array([[1, -1, 120]]), 2)
+        b'01 -1 120\\n'
+
+    """
+
+    values = numpy.asarray(tile_ids, dtype=numpy.int64)
+
+    if not values.size:
+
+        return b''
+
+    # format each ID from the lowest to the highest once, as a
+    # record of its characters then the separator, or a newline for
+    # the last ID in a row
+    low = int(values.min())
+    table = numpy.arange(low, int(values.max()) + 1, dtype=numpy.int64)
+    magnitudes = numpy.abs(table)
+    lengths = numpy.ones(table.shape, dtype=numpy.int64)
+    power = 10
+
+    while (magnitudes >= power).any():
+        lengths += magnitudes >= power
+        power *= 10
+
+    widths = numpy.maximum(lengths + (table < 0), digits)
+    columns = int(widths.max())
+
+    # right-aligned in columns characters, zero padded
+    places = 10 ** numpy.arange(columns - 1, -1, -1, dtype=numpy.int64)
+    characters = (magnitudes[:, None] // places % 10 + ord('0'))
+    characters = characters.astype(numpy.uint8)
+    first_columns = columns - widths
+    negative = numpy.nonzero(table < 0)[0]
+    characters[negative, first_columns[negative]] = ord('-')
+    padding = numpy.arange(columns) < first_columns[:, None]
+
+    separator = numpy.frombuffer(separator.encode('ascii'), dtype=numpy.uint8)
+    records = numpy.concatenate(
+        [characters, numpy.tile(separator, (len(table), 1))], axis=1
+    )
+    row_ends = numpy.concatenate(
+        [characters, numpy.full((len(table), 1), ord('\n'), numpy.uint8)],
+        axis=1,
+    )
+
+    # look every ID up; take() is much faster than fancy indexing
+    indices = values - low
+    rows = len(indices)
+    lines = numpy.concatenate(
+        [records.take(indices[:, :-1], axis=0).reshape(rows, -1),
+         row_ends.take(indices[:, -1], axis=0)], axis=1
+    )
+
+    # every ID in range is as wide: drop the same padding from all
+    if not padding.any():
+
+        return lines.tobytes()
+
+    keep_record = numpy.concatenate(
+        [~padding, numpy.ones((len(table), len(separator)), dtype=bool)],
+        axis=1,
+    )
+    keep_row_end = numpy.concatenate(
+        [~padding, numpy.ones((len(table), 1), dtype=bool)], axis=1
+    )
+    keep = numpy.concatenate(
+        [keep_record.take(indices[:, :-1], axis=0).reshape(rows, -1),
+         keep_row_end.take(indices[:, -1], axis=0)], axis=1
+    )
+
+    return lines[keep].tobytes()
+
+
+def write_tilemap_text(writable, tilesheet_name, tile_ids, digits,
+                       separator=' '):
+    """Write tilemap.txt a batch of rows at a time, formatting them
+    with NumPy; see :func:`format_tile_ids`.
+
+    Args:
+        writable (file-like-object): opened in text mode.
+        tilesheet_name (str): --
+        tile_ids (numpy.ndarray): (depth, height, width) ints.
+        digits (int): see :func:`format_tile_ids`.
+        separator (str): --
+
+    """
+
+    writable.write(tilesheet_name + '\n')
+    depth, height, width = numpy.shape(tile_ids)
+    rows_per_batch = max(TEXT_BATCH_TILES // max(width, 1), 1)
+
+    for z in range(depth):
+
+        if z:
+            writable.write('\n')
+
+        for first_row in range(0, height, rows_per_batch):
+            rows = tile_ids[z][first_row:first_row + rows_per_batch]
+            writable.write(format_tile_ids(rows, digits,
+                                           separator).decode('ascii'))
+
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()
@@ -8,7 +8,9 @@ assist other modules, and does not do much on its own.
 
 """
 
+import io
 import os
+import codecs
 import zipfile
 from io import BytesIO
 
@@ -24,16 +26,75 @@ import pygame
 import pyganim
 from PIL import Image
 
+from hypatia import assetpack
+
+
+# Resources are read from this asset pack, if it exists, rather
+# than from the individual resource ZIPs. See :mod:`assetpack`.
+ASSET_PACK_PATH = os.path.join('resources', 'resources.pack')
+
+# asset pack path -> opened assetpack.AssetPack
+_asset_packs = {}
+
+# seconds a GIF frame lasts if it doesn't specify a duration
+DEFAULT_GIF_FRAME_DURATION = 0.1
+
+# resource files with these extensions are never decoded as text,
+# even if they happen to be valid UTF-8, e.g., tilemap.bin
+BINARY_FILE_EXTENSIONS = ('.bin',)
+
+
+def get_asset_pack(path=None):
+    """Return the (shared) opened asset pack at path, or None if
+    there is no asset pack there.
+
+    Args:
+        path (str|None): path to the asset pack. Defaults to
+            :data:`ASSET_PACK_PATH`.
+
+    Returns:
+        assetpack.AssetPack|None: --
+
+    """
+
+    path = path or ASSET_PACK_PATH
+
+    if path not in _asset_packs:
+
+        if not os.path.exists(path):
+
+            return None
+
+        _asset_packs[path] = assetpack.AssetPack(path)
+
+    return _asset_packs[path]
+
 
 class Resource(object):
     """A zip archive in the resources directory, located by
     supplying a resource category and name. Files are stored
-    as a str, BytesIO, PygAnimation, or ConfigParser, in a
-    dictionary. Files are referenced by filepath/filename.
+    as a str, BytesIO, pygame.Surface, PygAnimation, or
+    ConfigParser, in a dictionary. Files are referenced by
+    filepath/filename.
+
+    If an asset pack exists at :data:`ASSET_PACK_PATH` and contains
+    the resource, the resource is read from the pack instead of
+    its zip archive.
+
+    Loading a file happens in two steps: :meth:`Resource.decode_file`
+    does the expensive, thread-safe work (e.g., decoding GIF frames to
+    RGBA buffers), then :meth:`Resource.convert_file` turns that into
+    pygame objects, which must happen on the main thread.
+
+    Constants:
+        DECODED_CACHE (dict): (category, name) -> {file name: decoded
+            file data}. Decoded files found here are converted instead
+            of being read and decoded again. Filled by
+            :class:`preload.Preloader`.
 
     Attributes:
         files (dict): Key is file name, value can be one of str,
-            BytesIO, PygAnim, or ConfigParser objects.
+            BytesIO, pygame.Surface, PygAnim, or ConfigParser objects.
 
     Example:
         >>> import pyganim
@@ -48,31 +109,73 @@ class Resource(object):
 
     """
 
-    def __init__(self, resource_category, resource_name):
+    DECODED_CACHE = {}
+
+    def __init__(self, resource_category, resource_name, asset_pack=None):
         """Load a resource ZIP using a category and zip name.
 
         Args:
             resource_category (str): E.g., tilesheets, walkabouts.
             resource_name (str): E.g., debug.
+            asset_pack (assetpack.AssetPack|None): read the resource
+                from this pack. Defaults to the pack at
+                :data:`ASSET_PACK_PATH`, if there is one.
+
+        """
+
+        decoded_files = self.DECODED_CACHE.get((resource_category,
+                                                resource_name))
+
+        if decoded_files is None:
+            raw_files = self.read_files(resource_category,
+                                        resource_name,
+                                        asset_pack)
+            decoded_files = {file_name: self.decode_file(file_name, data)
+                             for file_name, data in raw_files.items()}
+
+        self.files = {file_name: self.convert_file(file_name, decoded)
+                      for file_name, decoded in decoded_files.items()}
+
+    @staticmethod
+    def read_files(resource_category, resource_name, asset_pack=None):
+        """Read the raw, undecoded contents of every file belonging to
+        a resource.
+
+        Args:
+            resource_category (str): E.g., tilesheets, walkabouts.
+            resource_name (str): E.g., debug.
+            asset_pack (assetpack.AssetPack|None): see
+                :meth:`Resource.__init__`.
+
+        Returns:
+            dict: file name -> bytes, or a zero-copy memoryview for
+                members stored uncompressed in an asset pack.
 
         """
 
+        asset_pack = asset_pack or get_asset_pack()
+        resource_key = resource_category + '/' + resource_name
+        files = {}
+
+        if asset_pack and resource_key in asset_pack:
+
+            for file_name in asset_pack.members(resource_category,
+                                                resource_name):
+                files[file_name] = asset_pack.read(resource_category,
+                                                   resource_name,
+                                                   file_name)
+
+            return files
+
         zip_path = os.path.join(
                                 'resources',
                                 resource_category,
                                 resource_name + '.zip'
                                )
-        file_handlers = {
-                         '.ini': configparser_fromfp,
-                         '.gif': load_gif
-                        }
-
-        files = {}
 
         with zipfile.ZipFile(zip_path) as zip_file:
 
             for file_name in zip_file.namelist():
-                file_data = zip_file.open(file_name).read()
 
                 # because namelist will also generate
                 # the directories
@@ -80,20 +183,88 @@ class Resource(object):
 
                     continue
 
-                try:
-                    file_data = file_data.decode('utf-8')
-                except ValueError:
-                    file_data = BytesIO(file_data)
+                files[file_name] = zip_file.open(file_name).read()
+
+        return files
+
+    @staticmethod
+    def decode_file(file_name, file_data):
+        """Decode file_data to text if possible, then run the decoder
+        for its file extension, if any.
+
+        Doesn't touch pygame, so it's safe to call from a worker
+        thread or process.
+
+        Args:
+            file_name (str): used to pick a decoder by file extension.
+            file_data (bytes|memoryview): the raw file contents.
+
+        Returns:
+            str, ConfigParser, list of (bytes, size, duration) GIF
+            frames, (bytes, size) image, or the file_data untouched
+            if it's binary without a decoder.
+
+        """
+
+        file_decoders = {
+                         '.ini': configparser_fromfp,
+                         '.gif': decode_gif,
+                         '.png': decode_image,
+                        }
+
+        file_extension = os.path.splitext(file_name)[1]
+
+        if file_extension not in BINARY_FILE_EXTENSIONS:
+
+            try:
+                file_data = codecs.decode(file_data, 'utf-8')
+            except ValueError:
+                pass
+
+        # then we do the file handler call ehre
+
+        if file_extension in file_decoders:
+
+            if isinstance(file_data, (bytes, memoryview)):
+                file_data = readable(file_data)
+
+            file_data = file_decoders[file_extension](file_data)
+
+        return file_data
+
+    @staticmethod
+    def convert_file(file_name, decoded_data):
+        """Turn the output of :meth:`Resource.decode_file` into the
+        object stored in :attr:`Resource.files`.
+
+        Decoded data may be shared between resources (see
+        :attr:`Resource.DECODED_CACHE`), so it's never modified.
+
+        Args:
+            file_name (str): used to pick a converter by extension.
+            decoded_data: the output of :meth:`Resource.decode_file`.
+
+        Returns:
+            str, BytesIO, pygame.Surface, PygAnimation, or
+            ConfigParser: --
+
+        """
+
+        file_converters = {
+                           '.gif': gif_from_frames,
+                           '.png': image_from_buffer,
+                          }
+        file_extension = os.path.splitext(file_name)[1]
+
+        if file_extension in file_converters:
 
-                # then we do the file handler call ehre
-                file_extension = os.path.splitext(file_name)[1]
+            return file_converters[file_extension](decoded_data)
 
-                if file_extension in file_handlers:
-                    file_data = file_handlers[file_extension](file_data)
+        elif isinstance(decoded_data, (bytes, memoryview)):
 
-                files[file_name] = file_data
+            return readable(decoded_data)
 
-        self.files = files
+        return decoded_data
 
     def __getitem__(self, file_name):
 
@@ -131,6 +302,25 @@ class Resource(object):
         return matching_files or None
 
 
+def readable(file_data):
+    """Return a file-like object for reading file_data.
+
+    Args:
+        file_data (bytes|memoryview): --
+
+    Returns:
+        BytesIO|io.BufferedReader: a memoryview is read in place,
+            rather than being copied into a BytesIO.
+
+    """
+
+    if isinstance(file_data, memoryview):
+
+        return io.BufferedReader(assetpack.MemoryviewReader(file_data))
+
+    return BytesIO(file_data)
+
+
 def load_gif(path_or_bytesio):
     """Create a PygAnim object by reading a GIF from path or
     a BytesIO object.
@@ -152,30 +342,141 @@ def load_gif(path_or_bytesio):
 
     """
 
-    pil_gif = Image.open(path_or_bytesio)
+    return gif_from_frames(decode_gif(path_or_bytesio))
+
 
-    frame_index = 0
+def decode_gif(path_or_bytesio):
+    """Decode every frame of a GIF to an RGBA buffer, without
+    creating any pygame objects.
+
+    There's one frame per frame of the GIF, so frame indices (e.g.,
+    of :class:`animations.AnimAnchors`) line up, but a frame which
+    is identical to the one before shares its buffer, rather than
+    storing it twice. Frames with no duration (or a duration of
+    zero) last :data:`DEFAULT_GIF_FRAME_DURATION`, like they do in
+    web browsers.
+
+    Note:
+        PIL composites each frame onto the previous one according to
+        the previous frame's disposal method, so every buffer is the
+        complete frame as it's meant to be displayed.
+
+    Args:
+        path_or_bytesio (str|BytesIO): see :func:`load_gif`.
+
+    Returns:
+        list: (RGBA bytes, (width, height), duration in seconds)
+            for each frame.
+
+    Example:
+        >>> path = 'resources/walkabouts/debug.zip'
+        >>> sample = zipfile.ZipFile(path).open('walk_north.gif').read()
+        >>> [(size, duration) for __, size, duration
+        ...  in decode_gif(BytesIO(sample))]
+        [((6, 8), 0.1), ((6, 8), 0.1), ((6, 8), 0.1)]
+
+    """
+
+    pil_gif = Image.open(path_or_bytesio)
     frames = []
 
     try:
 
         while 1:
-            duration = pil_gif.info['duration'] / 1000.0
-            frame_as_pygame_image = pil_to_pygame(pil_gif, "RGBA")
-            frames.append((frame_as_pygame_image, duration))
-            frame_index += 1
+            duration = pil_gif.info.get('duration') or 0
+
+            if duration <= 0:
+                duration = DEFAULT_GIF_FRAME_DURATION
+            else:
+                duration /= 1000.0
+
+            # convert() composites the frame into a new image, so the
+            # buffer doesn't change when the next frame is disposed of
+            frame_buffer = pil_gif.convert('RGBA').tobytes()
+            size = pil_gif.size
+
+            # share repeated frames, rather than storing them twice
+            if frames and frames[-1][:2] == (frame_buffer, size):
+                frame_buffer = frames[-1][0]
+
+            frames.append((frame_buffer, size, duration))
+
             pil_gif.seek(pil_gif.tell() + 1)
 
     except EOFError:
 
         pass  # end of sequence
 
-    gif = pyganim.PygAnimation(frames)
+    return frames
+
+
+def gif_from_frames(frames):
+    """Create a PygAnim object from the frames decoded by
+    :func:`decode_gif`.
+
+    The surfaces share memory with the frame buffers, rather
+    than copying them, and frames sharing a buffer share a surface.
+
+    Args:
+        frames (list): (RGBA bytes, (width, height), duration)
+            for each frame.
+
+    Returns:
+        PygAnim: --
+
+    """
+
+    pygame_frames = []
+    surfaces = {}
+
+    for frame_buffer, size, duration in frames:
+
+        if id(frame_buffer) not in surfaces:
+            surfaces[id(frame_buffer)] = pygame.image.frombuffer(frame_buffer,
+                                                                 size, 'RGBA')
+
+        pygame_frames.append((surfaces[id(frame_buffer)], duration))
+
+    gif = pyganim.PygAnimation(pygame_frames)
     gif.anchor(pyganim.CENTER)
 
     return gif
 
 
+def decode_image(path_or_bytesio):
+    """Decode an image (e.g., a PNG) to an RGBA buffer, without
+    creating any pygame objects.
+
+    Args:
+        path_or_bytesio (str|BytesIO): --
+
+    Returns:
+        tuple: (RGBA bytes, (width, height))
+
+    """
+
+    pil_image = Image.open(path_or_bytesio)
+
+    return (pil_image.convert('RGBA').tobytes(), pil_image.size)
+
+
+def image_from_buffer(decoded_image):
+    """Create a pygame Surface from an image decoded by
+    :func:`decode_image`.
+
+    Args:
+        decoded_image (tuple): (RGBA bytes, (width, height))
+
+    Returns:
+        pygame.Surface: --
+
+    """
+
+    image_buffer, size = decoded_image
+
+    return pygame.image.frombuffer(image_buffer, size, 'RGBA')
+
+
 def pil_to_pygame(pil_image, encoding):
     """Convert PIL Image() to pygame Surface.
 
@@ -197,10 +498,10 @@ def pil_to_pygame(pil_image, encoding):
 
     """
 
-    image_as_string = pil_image.convert('RGBA').tostring()
+    image_as_bytes = pil_image.convert('RGBA').tobytes()
 
-    return pygame.image.fromstring(
-                                   image_as_string,
+    return pygame.image.frombuffer(
+                                   image_as_bytes,
                                    pil_image.size,
                                    'RGBA'
                                   )
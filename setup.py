@@ -29,7 +29,7 @@ setup(name='hypatia_engine',
       url='http://lillian-lemmer.github.io/hypatia',
       license='MIT',
       packages=['hypatia'],
-      install_requires=['pillow', 'pyganim'],
+      install_requires=['pillow', 'pyganim', 'numpy'],
       classifiers=['Development Status :: 3 - Alpha',
                    'Intended Audience :: Developers',
                    'Natural Language :: English',
@@ -34,3 +34,28 @@ def test_actor():
     an_actor = actor.Actor(walkabout=walkabout,
                            say_text='Hello, world!',
                            velocity=velocity)
+
+
+def test_actor_is_view_of_store():
+    """Test that an actor's walkabout position and velocity are
+    views of its physics.ActorStore slot.
+
+    """
+
+    store = physics.ActorStore(capacity=1)
+    walkabout = animations.Walkabout('debug', position=(3, 4), store=store)
+    an_actor = actor.Actor(walkabout=walkabout,
+                           velocity=physics.Velocity(5, -5))
+    slot = walkabout.slot
+
+    assert store.positions[slot].tolist() == [3.0, 4.0]
+    assert store.velocities[slot].tolist() == [5.0, -5.0]
+
+    store.positions[slot] += store.velocities[slot]
+    assert walkabout.topleft_float == (8.0, -1.0)
+    assert walkabout.rect.topleft == (8, -1)
+
+    an_actor.direction = constants.Direction.west
+    assert store.directions[slot] == constants.Direction.west.value
+    an_actor.velocity.x = 0
+    assert store.velocities[slot, 0] == 0
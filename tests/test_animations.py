@@ -14,13 +14,177 @@ Example:
 """
 
 import os
+import zipfile
+import itertools
+from io import BytesIO
 
 import pygame
 import pytest
+from PIL import Image
 
+from hypatia import util
 from hypatia import render
+from hypatia import constants
+from hypatia import animations
 
 try:
     os.chdir('demo')
 except OSError:
     pass
+
+
+def test_walkabout_shares_data():
+    """Test that walkabouts of the same resource share their frames
+    and anchors, but not their playback state.
+
+    """
+
+    villagers = [animations.Walkabout('debug', position=(i, i))
+                 for i in range(3)]
+    first, second = villagers[:2]
+
+    assert first.data is second.data
+    assert first.animations is second.animations
+    assert first.animation_anchors is second.animation_anchors
+
+    second.direction = constants.Direction.north
+    second.frame_time_offset = 1
+    assert first.direction is constants.Direction.south
+    assert first.frame_time_offset == 0
+    assert first.rect.topleft == (0, 0)
+    assert second.rect.topleft == (1, 1)
+
+
+def test_find_anchors():
+    """Test animations.find_anchors() against scanning every pixel
+    of every frame with Surface.get_at().
+
+    """
+
+    def scan(surface):
+        width, height = surface.get_size()
+        anchor_color = pygame.Color(*animations.ANCHOR_COLOR)
+
+        for coord in itertools.product(range(width), range(height)):
+
+            if surface.get_at(coord) == anchor_color:
+
+                return coord
+
+    walkabout = animations.Walkabout('debug')
+    anchors = walkabout.get_anchors()
+
+    for action, directions in walkabout.animations.items():
+
+        for direction, animation in directions.items():
+            expected = [scan(frame) for frame in animation._images]
+            assert anchors[action][direction] == expected
+
+
+def gif_bytes(surface):
+    """Encode surface as a single frame GIF."""
+
+    png_file = BytesIO()
+    pygame.image.save(surface, png_file, 'frame.png')
+    gif_file = BytesIO()
+    Image.open(BytesIO(png_file.getvalue())).save(gif_file, 'GIF')
+
+    return gif_file.getvalue()
+
+
+def test_bake_anchors(tmpdir):
+    """Test animations.bake_anchors() writing INIs which
+    AnimAnchors.from_config() reads back.
+
+    """
+
+    anchored = pygame.Surface((4, 4), pygame.SRCALPHA, 32)
+    anchored.set_at((1, 3), animations.ANCHOR_COLOR)
+    zip_path = str(tmpdir.join('baked.zip'))
+
+    with zipfile.ZipFile(zip_path, 'w') as zip_file:
+        zip_file.writestr('stand_south.gif', gif_bytes(anchored))
+        zip_file.writestr('stand_south.ini', '[head_anchor]\n0=0,0\n')
+        zip_file.writestr('only.gif', gif_bytes(pygame.Surface((2, 2))))
+
+    # only.gif has no anchor, so it gets no INI
+    assert animations.bake_anchors(zip_path) == ['stand_south.ini']
+
+    with zipfile.ZipFile(zip_path) as zip_file:
+        assert sorted(zip_file.namelist()) == ['only.gif', 'stand_south.gif',
+                                               'stand_south.ini']
+        ini_text = zip_file.read('stand_south.ini').decode('utf-8')
+
+    anchors = animations.AnimAnchors.from_config(
+        util.configparser_fromfp(ini_text)
+    )
+    anchor_point = anchors.get_anchor_point('head_anchor', 0)
+    assert (anchor_point.x, anchor_point.y) == (1, 3)
+
+
+def test_composite_frames():
+    """Test that a walkabout drawn from its CompositeFrames looks
+    the same as the walkabout and its children drawn separately.
+
+    """
+
+    hat = animations.Walkabout('hat')
+    walkabout = animations.Walkabout('debug', position=(10, 10),
+                                     children=[hat])
+    walkabout.action = constants.Action.walk
+    walkabout.direction = constants.Direction.east
+    animation = walkabout.current_animation()
+    hat_animation = hat[walkabout.action][walkabout.direction]
+
+    for start_time in animation._startTimes[:-1]:
+
+        for playing_animation in (animation, hat_animation):
+            playing_animation.play()
+            playing_animation.elapsed = start_time
+
+        canvases = []
+
+        for composite_frames in (None,
+                                 animations.CompositeFrames.load(walkabout)):
+            walkabout.composite_frames = composite_frames
+            canvas = pygame.Surface((32, 32), pygame.SRCALPHA, 32)
+            canvas.fill((0, 0, 0, 0))
+            sequence = walkabout.blit_sequence((0, 0))
+
+            for surface, position in sequence:
+                canvas.blit(surface, position)
+
+            canvases.append((len(sequence),
+                             pygame.image.tostring(canvas, 'RGBA')))
+
+        (layered_blits, layered), (composite_blits, composite) = canvases
+        assert (layered_blits, composite_blits) == (2, 1)
+        assert layered == composite
+
+    for playing_animation in (animation, hat_animation):
+        playing_animation.stop()
+
+
+def test_walkabout_data_lazy_setup():
+    """Test that WalkaboutData.runtime_setup() leaves animations
+    alone until they're prepared, one at a time.
+
+    """
+
+    data = animations.WalkaboutData('debug')
+    data.runtime_setup()
+    every_animation = [animation
+                       for directions in data.animations.values()
+                       for animation in directions.values()]
+    assert not any(animations.is_playing(animation)
+                   for animation in every_animation)
+
+    walk_north = data.prepare(constants.Action.walk,
+                              constants.Direction.north)
+    assert walk_north is data.animations[constants.Action.walk][
+        constants.Direction.north
+    ]
+    assert [animation for animation in every_animation
+            if animations.is_playing(animation)] == [walk_north]
+
+    assert animations.warm_up(limit=2) == 2
@@ -0,0 +1,90 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/assetpack.py
+
+Run py.test on this module to assert hypatia.assetpack
+is completely functional.
+
+"""
+
+import os
+import zipfile
+
+import pytest
+
+from hypatia import util
+from hypatia import assetpack
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+def test_build_pack(tmpdir):
+    """Test assetpack.build_pack() and reading it with AssetPack.
+
+    """
+
+    pack_path = str(tmpdir.join('test.pack'))
+    assetpack.build_pack('resources', pack_path)
+    pack = assetpack.AssetPack(pack_path)
+
+    # every resource zip is in the pack
+    assert 'scenes/debug' in pack
+    assert 'tilesheets/debug' in pack
+    assert 'walkabouts/hat' in pack
+
+    # every member reads back exactly as it is in its zip
+    with zipfile.ZipFile('resources/walkabouts/debug.zip') as zip_file:
+
+        for file_name in zip_file.namelist():
+            from_pack = pack.read('walkabouts', 'debug', file_name)
+            assert bytes(from_pack) == zip_file.read(file_name)
+            del from_pack
+
+    # the file object interface is seekable
+    member = pack.open('tilesheets', 'debug', 'tilesheet.png')
+    assert member.read(4) == b'\x89PNG'
+    member.seek(0)
+    assert member.read(4) == b'\x89PNG'
+    member.close()
+
+    pack.close()
+
+
+def test_bad_pack(tmpdir):
+    """Test that files which aren't asset packs are rejected.
+
+    """
+
+    not_a_pack = tmpdir.join('not.pack')
+    not_a_pack.write('this is not an asset pack')
+
+    with pytest.raises(assetpack.BadAssetPack):
+        assetpack.AssetPack(str(not_a_pack))
+
+    # too small to memory map
+    empty = tmpdir.join('empty.pack')
+    empty.write('')
+
+    with pytest.raises(assetpack.BadAssetPack):
+        assetpack.AssetPack(str(empty))
+
+
+def test_resource_from_pack(tmpdir):
+    """Test util.Resource reading from an asset pack.
+
+    """
+
+    pack_path = str(tmpdir.join('test.pack'))
+    assetpack.build_pack('resources', pack_path)
+    pack = assetpack.AssetPack(pack_path)
+
+    from_pack = util.Resource('scenes', 'debug', asset_pack=pack)
+    from_zip = util.Resource('scenes', 'debug')
+
+    assert from_pack['tilemap.txt'] == from_zip['tilemap.txt']
+    assert (from_pack['scene.ini'].sections() ==
+            from_zip['scene.ini'].sections())
@@ -0,0 +1,107 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/atlas.py
+
+Run py.test on this module to assert hypatia.atlas
+is completely functional.
+
+"""
+
+import os
+
+import pygame
+import pytest
+
+from hypatia import game
+from hypatia import atlas
+from hypatia import animations
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+def test_texture_atlas():
+    """Test atlas.TextureAtlas packing surfaces onto pages.
+
+    """
+
+    surfaces = []
+
+    for size in ((10, 10), (20, 5), (5, 20), (30, 30)):
+        surface = pygame.Surface(size, pygame.SRCALPHA, 32)
+        surface.fill((size[0], size[1], 0, 255))
+        surfaces.append(surface)
+
+    texture_atlas = atlas.TextureAtlas(page_size=(32, 32), padding=1)
+    subsurfaces = texture_atlas.pack(surfaces + [surfaces[0]])
+
+    # the 30x30 needs a page to itself
+    assert len(texture_atlas.pages) == 2
+    assert len(subsurfaces) == 4
+
+    for surface in surfaces:
+        subsurface = subsurfaces[id(surface)]
+        assert subsurface.get_size() == surface.get_size()
+        assert subsurface.get_at((0, 0)) == surface.get_at((0, 0))
+
+    # packed surfaces never overlap on a page
+    rects = [(subsurface.get_abs_parent(),
+              pygame.Rect(subsurface.get_abs_offset(), subsurface.get_size()))
+             for subsurface in subsurfaces.values()]
+
+    for i, (page, rect) in enumerate(rects):
+
+        for other_page, other_rect in rects[i + 1:]:
+            assert other_page is not page or not rect.colliderect(other_rect)
+
+    with pytest.raises(atlas.AtlasFull):
+        texture_atlas.pack([pygame.Surface((64, 1))])
+
+
+def test_pack_walkabouts(monkeypatch):
+    """Test atlas.pack_walkabouts() keeping walkabout frames intact,
+    and not packing frames twice.
+
+    """
+
+    # walkabout frames are shared process-wide; start from fresh ones
+    monkeypatch.setattr(animations.WalkaboutData, 'CACHE', {})
+    monkeypatch.setattr(animations.CompositeFrames, 'CACHE', {})
+    hat = animations.Walkabout('hat')
+    walkabout = animations.Walkabout('debug', children=[hat])
+    animation = walkabout.current_animation()
+    before = [pygame.image.tostring(animation.getFrame(i), 'RGBA')
+              for i in range(len(animation._images))]
+
+    texture_atlas = atlas.pack_walkabouts([walkabout])
+    after = [pygame.image.tostring(animation.getFrame(i), 'RGBA')
+             for i in range(len(animation._images))]
+
+    assert before == after
+    assert len(texture_atlas.pages) == 1
+    assert (hat.current_animation().getFrame(0).get_abs_parent() is
+            texture_atlas.pages[0])
+    assert atlas.pack_walkabouts([walkabout]).pages == []
+
+
+def test_scene_runtime_setup_packs_walkabouts(monkeypatch):
+    """Test game.Scene.runtime_setup() packing the frames of the
+    human player and the npcs, which Game.render then draws.
+
+    """
+
+    monkeypatch.setattr(animations.WalkaboutData, 'CACHE', {})
+    monkeypatch.setattr(animations.CompositeFrames, 'CACHE', {})
+    scene = game.Scene.from_resource('debug')
+
+    # converting the tilemap's layers needs a display
+    monkeypatch.setattr(scene.tilemap, 'runtime_setup', lambda: None)
+    scene.runtime_setup()
+    pages = scene.texture_atlas.pages
+
+    for actor in [scene.human_player] + scene.npcs:
+        surface, __ = actor.walkabout.blit_sequence((0, 0))[0]
+        assert surface.get_abs_parent() in pages
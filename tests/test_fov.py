@@ -0,0 +1,130 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/fov.py
+
+Run py.test on this module to assert hypatia.fov
+is completely functional.
+
+Example:
+  Use from project root like so:
+
+  $ py.test tests
+
+"""
+
+import os
+import random
+
+import numpy
+
+from hypatia import fov
+from hypatia import tiles
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+# a floor and a wall of the debug tilesheet
+FLOOR = 11
+WALL = 0
+
+
+def test_field_of_view_is_symmetric():
+    """Test every floor tile in view of a floor tile seeing it back,
+    and walls blocking the view behind them.
+
+    """
+
+    random_state = numpy.random.RandomState(0)
+    opacity = random_state.rand(20, 24) < 0.25
+    height, width = opacity.shape
+    floors = numpy.flatnonzero(~opacity).tolist()
+
+    for origin_index in floors[::7]:
+        origin = (origin_index % width, origin_index // width)
+        visible = fov.field_of_view(opacity, origin, radius=30)
+
+        for index in visible.tolist():
+
+            if opacity.flat[index]:
+
+                continue
+
+            target = (index % width, index // width)
+            assert origin_index in fov.field_of_view(opacity, target,
+                                                     radius=30)
+
+    # nothing is seen past a wall straight ahead
+    opacity = numpy.zeros((1, 6), dtype=bool)
+    opacity[0, 2] = True
+    assert fov.field_of_view(opacity, (0, 0), 10).tolist() == [0, 1, 2]
+
+
+def test_field_of_view_cache_follows_edits():
+    """Test FieldOfView giving the same views as casting from scratch
+    while tiles are edited under its cache.
+
+    """
+
+    random.seed(0)
+    width, height = 16, 12
+    tilemap = tiles.TileMap('debug', [[[FLOOR] * width
+                                       for __ in range(height)]])
+    field_of_view = fov.FieldOfView(tilemap, radius=5)
+    coords = [(x, y) for y in range(height) for x in range(width)]
+    origins = random.sample(coords, 20)
+
+    for __ in range(30):
+        tilemap.set_tile(random.choice(coords), 0,
+                         random.choice((FLOOR, WALL)))
+
+        for origin in origins:
+            expected = fov.field_of_view(tilemap.opacity, origin, 5)
+            assert (field_of_view.visible(origin).tolist() ==
+                    expected.tolist())
+
+
+def test_fog_of_war():
+    """Test FogOfWar remembering what has been seen, and its overlay
+    matching drawing it from scratch.
+
+    """
+
+    width, height = 10, 6
+    tile_ids = [[FLOOR] * width for __ in range(height)]
+
+    for y in range(height - 1):
+        tile_ids[y][5] = WALL
+
+    tilemap = tiles.TileMap('debug', [tile_ids])
+    field_of_view = fov.FieldOfView(tilemap, radius=4)
+    fog_of_war = fov.FogOfWar(field_of_view)
+    explored = numpy.zeros((height, width), dtype=bool)
+
+    for origin in ((1, 1), (2, 2), (2, 2), (4, 5), (7, 5), (8, 1)):
+        fog_of_war.look_from(origin)
+        in_view = numpy.zeros(height * width, dtype=bool)
+        in_view[fov.field_of_view(tilemap.opacity, origin, 4)] = True
+        in_view = in_view.reshape((height, width))
+        explored |= in_view
+        assert (fog_of_war.in_view == in_view).all()
+        assert (fog_of_war.explored == explored).all()
+
+        for y in range(height):
+
+            for x in range(width):
+                alpha = fog_of_war.overlay.get_at((x * 16 + 8,
+                                                   y * 16 + 8))[3]
+
+                if in_view[y, x]:
+                    assert alpha == 0
+                elif explored[y, x]:
+                    assert alpha == fov.FogOfWar.REMEMBERED_COLOR[3]
+                else:
+                    assert alpha == fov.FogOfWar.UNSEEN_COLOR[3]
+
+    # looking from the same tile again redraws nothing
+    assert fog_of_war.look_from((8, 1)) == 0
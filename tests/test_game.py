@@ -0,0 +1,356 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/game.py
+
+Run py.test on this module to assert hypatia.game
+is completely functional.
+
+Example:
+  Use from project root like so:
+
+  $ py.test tests
+
+"""
+
+import io
+import os
+import gzip
+import zlib
+import base64
+import threading
+import xml.etree.ElementTree as ET
+
+import numpy
+import pygame
+import pytest
+
+from hypatia import game
+from hypatia import util
+from hypatia import dialog
+from hypatia import render
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+DEBUG_TMX = os.path.join('resources', 'scenes', 'debug.tmx')
+
+
+def encode_layers(encoding, compression=None):
+    """The debug scene's TMX, with every layer's data re-encoded."""
+
+    tree = ET.parse(DEBUG_TMX)
+
+    for data in tree.getroot().iter('data'):
+        gids = numpy.array(game.decode_layer_data(data, 25, 25)) + 1
+
+        if encoding == 'csv':
+            data.text = '\n' + ',\n'.join(','.join(str(gid) for gid in row)
+                                          for row in gids.tolist()) + '\n'
+        else:
+            raw = gids.astype('<u4').tobytes()
+
+            if compression == 'zlib':
+                raw = zlib.compress(raw)
+            elif compression == 'gzip':
+                raw = gzip.compress(raw)
+
+            data.text = base64.b64encode(raw).decode('ascii')
+
+        data.attrib.pop('compression', None)
+        data.attrib['encoding'] = encoding
+
+        if compression:
+            data.attrib['compression'] = compression
+
+    readable = io.BytesIO()
+    tree.write(readable, encoding='utf-8')
+    readable.seek(0)
+
+    return readable
+
+
+def test_layer_encodings():
+    """Test every supported layer encoding and compression reading
+    as the same layers, including the last row's last tile.
+
+    """
+
+    expected = game.TMX(DEBUG_TMX).layers
+    assert expected.shape == (3, 25, 25)
+    assert expected[0, -1, -1] != -1
+
+    for encoding, compression in (('csv', None), ('base64', None),
+                                  ('base64', 'zlib'), ('base64', 'gzip')):
+        tmx = game.TMX(encode_layers(encoding, compression))
+        assert (tmx.layers == expected).all()
+        assert tmx.player_start_position is not None
+        assert tmx.root.find('.//data').text is None
+
+
+def test_flip_flags_are_dropped():
+    """Test the flip flags in a tile ID's highest bits being ignored."""
+
+    gids = numpy.array([1 | 0x80000000, 2 | 0x40000000,
+                        3 | 0x20000000, 0], dtype='<u4')
+    data = ET.Element('data', encoding='base64')
+    data.text = base64.b64encode(gids.tobytes()).decode('ascii')
+
+    assert game.decode_layer_data(data, 2, 2).tolist() == [[0, 1], [2, -1]]
+
+
+def test_unsupported_layer_data():
+    """Test unsupported compression and a layer of the wrong size."""
+
+    data = ET.Element('data', encoding='base64', compression='zstd')
+    data.text = ''
+
+    with pytest.raises(game.TMXLayersNotCSV):
+        game.decode_layer_data(data, 1, 1)
+
+    data = ET.Element('data', encoding='csv')
+    data.text = '1,2,3'
+
+    with pytest.raises(ValueError):
+        game.decode_layer_data(data, 2, 2)
+
+
+def infinite_tmx(offset, chunk_size=8, compression='zlib'):
+    """The debug scene's TMX as an infinite map, its layers in
+    chunk_size chunks, with its top left tile at offset.
+
+    """
+
+    tree = ET.parse(DEBUG_TMX)
+    root = tree.getroot()
+    root.attrib['infinite'] = '1'
+    offset_x, offset_y = offset
+
+    for data in root.iter('data'):
+        gids = numpy.array(game.decode_layer_data(data, 25, 25)) + 1
+        data.text = None
+        data.attrib = {'encoding': 'base64', 'compression': compression}
+
+        # pad to whole chunks with empty tiles
+        first_x = (offset_x // chunk_size) * chunk_size
+        first_y = (offset_y // chunk_size) * chunk_size
+        last_x = -(-(offset_x + 25) // chunk_size) * chunk_size
+        last_y = -(-(offset_y + 25) // chunk_size) * chunk_size
+        padded = numpy.zeros((last_y - first_y, last_x - first_x),
+                             dtype='<u4')
+        padded[offset_y - first_y:offset_y - first_y + 25,
+               offset_x - first_x:offset_x - first_x + 25] = gids
+
+        for y in range(first_y, last_y, chunk_size):
+
+            for x in range(first_x, last_x, chunk_size):
+                tile_ids = padded[y - first_y:y - first_y + chunk_size,
+                                  x - first_x:x - first_x + chunk_size]
+                chunk = ET.SubElement(data, 'chunk', x=str(x), y=str(y),
+                                      width=str(chunk_size),
+                                      height=str(chunk_size))
+                chunk.text = base64.b64encode(
+                    zlib.compress(tile_ids.tobytes())).decode('ascii')
+
+    readable = io.BytesIO()
+    tree.write(readable, encoding='utf-8')
+    readable.seek(0)
+
+    return readable
+
+
+def test_chunked_tmx_matches_tmx():
+    """Test the chunks of an infinite map, some at negative
+    coordinates, having the same tiles as the whole map.
+
+    """
+
+    expected = game.TMX(DEBUG_TMX).tilemap
+    chunked = game.ChunkedTMX(infinite_tmx((-5, -12)))
+    assert chunked.depth == 3
+    assert chunked.chunk_size == (8, 8)
+    assert len(chunked) == 16
+    assert not chunked.loaded
+
+    for y in range(25):
+
+        for x in range(25):
+            assert (chunked.impassable((x - 5, y - 12)) ==
+                    expected.impassability[y, x])
+
+    # a chunk's tiles are those of the whole map, offset
+    map_chunk = chunked.chunk((0, 0))
+    assert map_chunk.rect == pygame.Rect(0, 0, 8 * 16, 8 * 16)
+    assert (map_chunk.tilemap.tile_ids[1, 0, :3] ==
+            expected.tile_ids[1, 12, 5:8]).all()
+
+    animated = sum(len(chunk.tilemap.animated_tile_stack[z])
+                   for chunk in chunked.loaded.values() for z in range(3))
+    assert animated == sum(len(expected.animated_tile_stack[z])
+                           for z in range(3))
+    assert chunked.chunk((10, 10)) is None
+    assert not chunked.impassable((500, 500))
+
+
+def test_chunked_tmx_evicts_distant_chunks():
+    """Test only the chunks around the area in use being loaded."""
+
+    chunked = game.ChunkedTMX(infinite_tmx((0, 0), chunk_size=4))
+    assert len(chunked) == 49
+
+    in_view = chunked.load_around(pygame.Rect(0, 0, 16, 16), margin=1)
+    assert [chunk.coord for chunk in in_view] == [(0, 0)]
+    assert sorted(chunked.loaded) == [(0, 0), (0, 1), (1, 0), (1, 1)]
+
+    in_view = chunked.load_around(pygame.Rect(5 * 64, 5 * 64, 70, 10))
+    assert [chunk.coord for chunk in in_view] == [(5, 5), (6, 5)]
+    assert all(4 <= x <= 6 and 4 <= y <= 6 for x, y in chunked.loaded)
+
+    chunked.max_chunks = 2
+    chunked.load_around(pygame.Rect(0, 0, 200, 200), margin=0)
+    assert len(chunked.loaded) == 2
+
+
+def test_infinite_map_is_not_a_tmx():
+    """Test TMX and ChunkedTMX each turning down the other's maps."""
+
+    with pytest.raises(game.TMXInfiniteMap):
+        game.TMX(infinite_tmx((0, 0)))
+
+    with pytest.raises(ValueError):
+        game.ChunkedTMX(DEBUG_TMX)
+
+
+def test_async_scene_is_built_on_the_main_thread(monkeypatch):
+    """Test loading a scene in the background only decoding there,
+    leaving every conversion to pygame objects, and stitching the
+    tilemap, to the main thread, a slice per step.
+
+    """
+
+    convert_threads = set()
+    convert_file = util.Resource.convert_file
+
+    def record_thread(file_name, decoded_data):
+
+        # images and animations, which are made with pygame
+        if file_name.endswith(('.gif', '.png')):
+            convert_threads.add(threading.current_thread())
+
+        return convert_file(file_name, decoded_data)
+
+    monkeypatch.setattr(util.Resource, 'convert_file',
+                        staticmethod(record_thread))
+
+    for loader in (game.Scene.from_resource_async('debug'),
+                   game.Scene.from_tmx_resource_async('debug')):
+        steps = 0
+
+        while not loader.step():
+            steps += 1
+
+        assert isinstance(loader.result(), game.Scene)
+        assert loader.progress == 1.0
+        assert steps > 5
+
+    assert convert_threads == set([threading.current_thread()])
+
+
+def test_scenes_have_their_own_actor_stores():
+    """Test that each scene's actors are kept in a store of its own,
+    so the npcs of one scene are never in the way of another's, and
+    that the scene's actor slots leave out the hat.
+
+    """
+
+    scenes = [game.Scene.from_resource('debug'),
+              game.Scene.from_resource('debug'),
+              game.Scene.from_tmx_resource('debug')]
+    assert len(set(id(scene.store) for scene in scenes)) == 3
+
+    for scene in scenes:
+        human_walkabout = scene.human_player.walkabout
+        hat_walkabout = human_walkabout.child_walkabouts[0]
+        assert len(scene.store) == len(scene.npcs) + 2
+        assert all(npc.walkabout.store is scene.store
+                   for npc in scene.npcs)
+        assert hat_walkabout.store is scene.store
+
+        slots = scene.actor_slots_in_rect(human_walkabout.rect)
+        assert human_walkabout.slot in slots
+        assert hat_walkabout.slot not in slots
+
+
+def test_collide_check_matches_every_rect():
+    """Test that :meth:`game.Scene.collide_check` finds the same
+    collisions as testing against every impassable tile and npc, that
+    the human player never collides with itself, and that leaving the
+    map is a collision.
+
+    """
+
+    scene = game.Scene.from_resource('debug')
+    player_rect = scene.human_player.walkabout.rect
+    obstacles = (list(scene.tilemap.impassable_rects) +
+                 [npc.walkabout.rect for npc in scene.npcs])
+    map_rect = scene.tilemap.layer_images[0].get_rect()
+    assert not scene.collide_check(player_rect)
+
+    for x in range(0, map_rect.width - 8, 5):
+
+        for y in range(0, map_rect.height - 8, 7):
+            rect = pygame.Rect((x, y), (8, 8))
+            expected = rect.collidelist(obstacles) != -1
+            assert scene.collide_check(rect) == expected
+
+    assert scene.collide_check(pygame.Rect((-1, 0), (8, 8)))
+    assert scene.collide_check(map_rect.inflate(2, 2))
+
+
+def test_infinite_map_is_a_streamed_scene(tmpdir):
+    """Test an infinite map's scene loading the chunks around the
+    viewport as :meth:`game.Game.render` draws it, like the whole map,
+    and colliding with the loaded chunks' tiles.
+
+    """
+
+    path = os.path.join(str(tmpdir), 'infinite.tmx')
+
+    with open(path, 'wb') as tmx_file:
+        tmx_file.write(infinite_tmx((0, 0)).read())
+
+    tmx_name = os.path.relpath(path, os.path.join('resources', 'scenes'))
+    scene = game.Scene.from_tmx_resource(tmx_name[:-len('.tmx')])
+    expected = game.Scene.from_tmx_resource('debug')
+    assert isinstance(scene, game.StreamedScene)
+    assert isinstance(scene.world, game.ChunkedTMX)
+    assert scene.player_start_position == expected.player_start_position
+    assert len(scene.npcs) == len(expected.npcs)
+    assert not scene.world.loaded
+
+    pygame.font.init()
+    viewports = []
+
+    for rendered_scene in (scene, expected):
+        test_game = game.Game.__new__(game.Game)
+        test_game.viewport = render.Viewport((128, 96))
+        test_game.dialogbox = dialog.DialogBox((128, 96))
+        test_game.scene = rendered_scene
+        test_game.render()
+        viewports.append(test_game.viewport)
+
+    viewport, expected_viewport = viewports
+    assert viewport.rect == expected_viewport.rect
+    assert (set(scene.world.loaded) ==
+            set(scene.world.chunks_in_rect(viewport.rect, 1)))
+    assert (pygame.image.tostring(viewport.surface, 'RGB') ==
+            pygame.image.tostring(expected_viewport.surface, 'RGB'))
+
+    top = scene.human_player.walkabout.rect.top
+
+    for x in range(viewport.rect.left, viewport.rect.right - 8, 4):
+        rect = pygame.Rect((x, top), (8, 8))
+        assert scene.collide_check(rect) == expected.collide_check(rect)
@@ -0,0 +1,280 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/pathfinding.py
+
+Run py.test on this module to assert hypatia.pathfinding
+is completely functional.
+
+Example:
+  Use from project root like so:
+
+  $ py.test tests
+
+"""
+
+import os
+import random
+import collections
+
+import numpy
+
+from hypatia import tiles
+from hypatia import physics
+from hypatia import pathfinding
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+# passable and impassable tiles of the debug tilesheet
+FLOOR = 11
+WALL = 99
+
+
+def breadth_first_distance(impassability, start, goal):
+    """The number of steps from start to goal, or None."""
+
+    if impassability[start[1], start[0]]:
+
+        return None
+
+    height, width = impassability.shape
+    distances = {start: 0}
+    queue = collections.deque([start])
+
+    while queue:
+        x, y = queue.popleft()
+
+        for neighbor in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            neighbor_x, neighbor_y = neighbor
+
+            if (0 <= neighbor_x < width and 0 <= neighbor_y < height and
+                    not impassability[neighbor_y, neighbor_x] and
+                    neighbor not in distances):
+                distances[neighbor] = distances[(x, y)] + 1
+                queue.append(neighbor)
+
+    return distances.get(goal)
+
+
+def assert_valid_path(impassability, path, start, goal):
+    """Assert path walks from start to goal, one passable tile at a
+    time.
+
+    """
+
+    assert path[0] == start and path[-1] == goal
+
+    for (x, y), (next_x, next_y) in zip(path, path[1:]):
+        assert abs(x - next_x) + abs(y - next_y) == 1
+        assert not impassability[next_y, next_x]
+
+
+def test_find_path_is_shortest():
+    """Test find_path() finding paths as short as a breadth first
+    search does, and no path when there isn't one.
+
+    """
+
+    random.seed(0)
+    impassability = numpy.random.RandomState(0).rand(30, 40) < 0.3
+    open_tiles = [(x, y) for y, x in zip(*numpy.nonzero(~impassability))]
+
+    for __ in range(50):
+        start, goal = random.sample(open_tiles, 2)
+        path = pathfinding.find_path(impassability, start, goal)
+        distance = breadth_first_distance(impassability, start, goal)
+
+        if distance is None:
+            assert path is None
+        else:
+            assert_valid_path(impassability, path, start, goal)
+            assert len(path) - 1 == distance
+
+    # off the map, or on a wall
+    wall = tuple(reversed(numpy.argwhere(impassability)[0].tolist()))
+    assert pathfinding.find_path(impassability, (-1, 0), open_tiles[0]) is None
+    assert pathfinding.find_path(impassability, wall, open_tiles[0]) is None
+
+
+def test_pathfinder_cache_follows_edits():
+    """Test Pathfinder giving the same paths as searching from
+    scratch while tiles are edited under its cache.
+
+    """
+
+    random.seed(1)
+    width, height = 20, 15
+    tilemap = tiles.TileMap('debug', [[[FLOOR] * width
+                                       for __ in range(height)]])
+    pathfinder = pathfinding.Pathfinder(tilemap, region_size=4)
+    coords = [(x, y) for y in range(height) for x in range(width)]
+    requests = [tuple(random.sample(coords, 2)) for __ in range(30)]
+
+    for __ in range(40):
+        coord = random.choice(coords)
+        tile_id = random.choice((FLOOR, WALL, WALL))
+        tilemap.set_tile(coord, 0, tile_id)
+
+        for start, goal in requests:
+            path = pathfinder.find_path(start, goal)
+            distance = breadth_first_distance(tilemap.impassability,
+                                              start, goal)
+
+            if distance is None:
+                assert path is None
+            else:
+                assert_valid_path(tilemap.impassability, path, start, goal)
+                assert len(path) - 1 == distance
+
+    # edits only forget the paths they could affect
+    assert pathfinder.hits > 0
+
+
+def test_pathfinder_cache_by_region_pair():
+    """Test Pathfinder answering requests between the regions of a
+    cached path from the part of it they need, and turning down
+    requests its passability can't satisfy.
+
+    """
+
+    tilemap = tiles.TileMap('debug', [[[FLOOR] * 20]])
+    pathfinder = pathfinding.Pathfinder(tilemap, region_size=4)
+    path = pathfinder.find_path((0, 0), (19, 0))
+
+    assert pathfinder.find_path((2, 0), (17, 0)) == path[2:18]
+    assert (pathfinder.hits, pathfinder.misses) == (1, 1)
+
+    # the wall is cleared behind the released pathfinder's back, so
+    # its search finds nothing, which isn't cached
+    tilemap.set_tile((10, 0), 0, WALL)
+    pathfinder.release()
+    tilemap.set_tile((10, 0), 0, FLOOR)
+    assert pathfinder.find_path((0, 0), (19, 0)) is None
+    assert len(pathfinder) == 0
+
+
+def test_flow_field_leads_to_goal():
+    """Test following a FlowField from any tile reaching the goal
+    in as few steps as a breadth first search, and refreshing a few
+    rings at a time when the goal moves.
+
+    """
+
+    impassability = numpy.random.RandomState(2).rand(12, 16) < 0.3
+    tile_ids = numpy.where(impassability, WALL, FLOOR).tolist()
+    tilemap = tiles.TileMap('debug', [tile_ids])
+    open_tiles = [(x, y) for y, x in zip(*numpy.nonzero(~impassability))]
+    flow_field = pathfinding.FlowField(tilemap, open_tiles[0])
+
+    for goal in open_tiles[1:4]:
+        flow_field.set_goal(goal)
+
+        # the old field is kept until the new one is done
+        while not flow_field.refresh(max_steps=2):
+            assert flow_field.goal != goal
+
+        assert flow_field.goal == goal
+
+        for start in open_tiles:
+            distance = breadth_first_distance(impassability, start, goal)
+            assert flow_field.distances[start[1], start[0]] == (
+                -1 if distance is None else distance)
+
+            if distance is None:
+                assert flow_field.direction_at(start) is None
+
+                continue
+
+            # walk downhill to the goal
+            x, y = start
+
+            for __ in range(distance):
+                step_x, step_y = flow_field.steps[y, x]
+                x, y = x + step_x, y + step_y
+
+            assert (x, y) == goal
+
+
+def test_flow_field_steers_actors():
+    """Test FlowField.steer() pointing velocities toward the goal,
+    and FlowField following tile edits.
+
+    """
+
+    tilemap = tiles.TileMap('debug', [[[FLOOR] * 5]])
+    flow_field = pathfinding.FlowField(tilemap, (2, 0))
+    store = physics.ActorStore()
+    west_of_goal = store.add((0, 0), (4, 4))
+    east_of_goal = store.add((4 * 16, 0), (4, 4))
+    slots = numpy.array([west_of_goal, east_of_goal])
+    flow_field.steer(store, slots, 30)
+    assert store.velocities[slots].tolist() == [[30, 0], [-30, 0]]
+
+    # walling off the goal leaves no way there
+    tilemap.set_tile((1, 0), 0, WALL)
+    flow_field.refresh()
+    flow_field.steer(store, slots, 30)
+    assert store.velocities[slots].tolist() == [[0, 0], [-30, 0]]
+
+
+def test_label_regions():
+    """Test label_regions() giving two passable tiles the same label
+    exactly when a breadth first search can get from one to the
+    other.
+
+    """
+
+    random.seed(3)
+    impassability = numpy.random.RandomState(3).rand(15, 20) < 0.45
+    labels = pathfinding.label_regions(~impassability)
+    assert (labels[impassability] == 0).all()
+    open_tiles = [(x, y) for y, x in zip(*numpy.nonzero(~impassability))]
+
+    for __ in range(100):
+        start, goal = random.sample(open_tiles, 2)
+        reachable = breadth_first_distance(impassability, start, goal)
+        assert ((labels[start[1], start[0]] == labels[goal[1], goal[0]]) ==
+                (reachable is not None))
+
+    # numbered 1, 2, 3... in the order they're found
+    first_seen = []
+
+    for label in labels.ravel().tolist():
+
+        if label and label not in first_seen:
+            first_seen.append(label)
+
+    assert first_seen == list(range(1, len(first_seen) + 1))
+
+
+def test_listeners_follow_bulk_edits(monkeypatch):
+    """Test a FlowField rebuilding once, and Pathfinder forgetting
+    what it must, when many tiles are replaced at once.
+
+    """
+
+    tilemap = tiles.TileMap('debug', [[[FLOOR] * 12, [WALL] * 12,
+                                       [FLOOR] * 12]])
+    pathfinder = pathfinding.Pathfinder(tilemap)
+    assert pathfinder.find_path((0, 0), (0, 2)) is None
+    above = pathfinder.find_path((0, 0), (11, 0))
+    flow_field = pathfinding.FlowField(tilemap, (0, 0))
+    wavefronts = []
+    wavefront = pathfinding.Wavefront
+
+    def record_wavefront(*args):
+        wavefronts.append(wavefront(*args))
+
+        return wavefronts[-1]
+
+    monkeypatch.setattr(pathfinding, 'Wavefront', record_wavefront)
+    assert tilemap.replace_tiles(WALL, FLOOR, (0, 1, 12, 1)) == 12
+    assert len(wavefronts) == 1
+    assert flow_field.refresh()
+    assert flow_field.direction_at((0, 2)).name == 'north'
+    assert pathfinder.find_path((0, 0), (0, 2)) == ((0, 0), (0, 1), (0, 2))
+    assert pathfinder.find_path((0, 0), (11, 0)) == above
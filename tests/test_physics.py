@@ -9,7 +9,9 @@ is completely functional.
 """
 
 import os
+import random
 
+import numpy
 import pygame
 import pytest
 
@@ -39,3 +41,76 @@ def test_velocity():
     velocity = physics.Velocity(-22, 55)
     assert (constants.Direction.from_velocity(velocity) ==
             constants.Direction.south_west)
+
+
+def test_actor_store():
+    """Test physics.ActorStore growing, reusing slots and finding
+    the slots within a rect.
+
+    """
+
+    store = physics.ActorStore(capacity=2)
+    rects = [pygame.Rect(x * 10, x * 5, 6, 8) for x in range(20)]
+    slots = [store.add(position=rect.topleft, size=rect.size)
+             for rect in rects]
+    assert slots == list(range(20))
+    assert store.capacity >= 20 and len(store) == 20
+
+    store.remove(3)
+    assert len(store) == 19
+    assert store.add(position=rects[3].topleft, size=rects[3].size) == 3
+
+    view = pygame.Rect(25, 10, 60, 30)
+    expected = [slot for slot, rect in enumerate(rects)
+                if rect.colliderect(view)]
+    assert store.in_rect(view).tolist() == expected
+
+
+def test_move_actors():
+    """Test physics.move_actors() never moving actors into walls,
+    off the map, or into each other.
+
+    """
+
+    random.seed(0)
+    tile_size = (8, 8)
+    impassability = numpy.zeros((40, 40), dtype=bool)
+    impassability[10, 5:30] = True
+    impassability[20:35, 25] = True
+    table = physics.summed_area_table(impassability)
+    store = physics.ActorStore()
+    slots = []
+
+    # a grid of actors on passable tiles, so none start overlapping
+    for tile_y in range(1, 40, 3):
+
+        for tile_x in range(1, 40, 3):
+
+            if impassability[tile_y, tile_x]:
+
+                continue
+
+            velocity = (random.randint(-20, 20), random.randint(-20, 20))
+            slots.append(store.add((tile_x * 8, tile_y * 8), (6, 6),
+                                   velocity=velocity))
+
+    slots = numpy.array(slots)
+    store.solid[slots] = True
+    wall_rects = [pygame.Rect(x * 8, y * 8, 8, 8)
+                  for y, x in zip(*numpy.nonzero(impassability))]
+    map_rect = pygame.Rect(0, 0, 320, 320)
+    moved = set()
+
+    for __ in range(60):
+        moved.update(physics.move_actors(store, slots, 0.1, table,
+                                         tile_size).tolist())
+        rects = [pygame.Rect(store.positions[slot].astype(int).tolist(),
+                             store.sizes[slot].tolist())
+                 for slot in slots]
+
+        for index, rect in enumerate(rects):
+            assert map_rect.contains(rect)
+            assert rect.collidelist(wall_rects) == -1
+            assert rect.collidelist(rects[index + 1:]) == -1
+
+    assert len(moved) > len(slots) // 2
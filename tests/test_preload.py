@@ -0,0 +1,65 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/preload.py
+
+Run py.test on this module to assert hypatia.preload
+is completely functional.
+
+"""
+
+import os
+
+import pytest
+
+from hypatia import util
+from hypatia import game
+from hypatia import preload
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+def test_preloader():
+    """Test preload.Preloader decoding a manifest.
+
+    """
+
+    progress = []
+    preloader = preload.Preloader(
+        processes=2,
+        progress_callback=lambda *args: progress.append(args)
+    )
+    manifest = [('scenes', 'debug'), ('tilesheets', 'debug')]
+    preloader.preload(manifest)
+
+    # progress is reported once per decoded file, in order
+    assert len(progress) == 5
+    assert [done for done, total, __ in progress] == [1, 2, 3, 4, 5]
+    assert all(total == 5 for __, total, __ in progress)
+
+    # the decoded files are used by Resource
+    assert ('scenes', 'debug') in util.Resource.DECODED_CACHE
+    resource = util.Resource('scenes', 'debug')
+    assert resource['tilemap.txt'].startswith('debug')
+    assert resource['scene.ini'].has_section('general')
+
+    preloader.clear()
+    assert ('scenes', 'debug') not in util.Resource.DECODED_CACHE
+
+
+def test_scene_manifests():
+    """Test the Scene manifests the preloader consumes.
+
+    """
+
+    manifest = game.Scene.manifest_from_resource('debug')
+    assert manifest[0] == ('tilesheets', 'debug')
+    assert ('walkabouts', 'debug') in manifest
+    assert ('walkabouts', 'hat') in manifest
+
+    manifest = game.Scene.manifest_from_tmx_resource('debug')
+    assert manifest[0] == ('tilesheets', 'debug')
+    assert ('walkabouts', 'hat') in manifest
@@ -17,6 +17,7 @@ Example:
 """
 
 import os
+import random
 
 import pygame
 import pytest
@@ -27,3 +28,43 @@ try:
     os.chdir('demo')
 except OSError:
     pass
+
+
+def test_depth_order():
+    """Test render.DepthOrder staying in the same order as sorting
+    by depth from scratch, while items move, come and go.
+
+    """
+
+    random.seed(0)
+    depths = {item: random.randint(0, 50) for item in range(200)}
+    depth_order = render.DepthOrder(depths.get)
+
+    for item in depths:
+        depth_order.insert(item)
+
+    def from_scratch():
+
+        return sorted(depth_order.items, key=depths.get)
+
+    for __ in range(500):
+        item = random.choice(depth_order.items)
+        depths[item] += random.choice((-3, -1, 1, 2))
+        depth_order.update(item)
+
+        # sorting is stable, so equal depths keep their order
+        assert depth_order.items == from_scratch()
+
+    for item in range(0, 200, 3):
+        depth_order.remove(item)
+
+    assert len(depth_order) == 200 - len(range(0, 200, 3))
+
+    for item in depth_order.items:
+        depths[item] = random.randint(0, 50)
+
+    depth_order.refresh()
+    assert depth_order.items == from_scratch()
+    visible = random.sample(depth_order.items, 10)
+    assert depth_order.sorted(visible) == [item for item in depth_order
+                                           if item in visible]
@@ -0,0 +1,119 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/spatial.py
+
+Run py.test on this module to assert hypatia.spatial
+is completely functional.
+
+Example:
+  Use from project root like so:
+
+  $ py.test tests
+
+"""
+
+import os
+import random
+
+import pygame
+import pytest
+
+from hypatia import spatial
+from hypatia import constants
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+def test_query_matches_brute_force():
+    """Test SpatialHash.query() finding the same items, in the same
+    order, as checking every rect.
+
+    """
+
+    random.seed(0)
+    rects = [pygame.Rect(random.randint(-100, 1000),
+                         random.randint(-100, 1000),
+                         random.randint(1, 40),
+                         random.randint(1, 40))
+             for __ in range(300)]
+    index = spatial.SpatialHash(cell_size=32)
+
+    for item, rect in enumerate(rects):
+        index.insert(item, rect)
+
+    # move some items, remove others
+    for item in range(0, 300, 7):
+        rects[item] = rects[item].move(55, -30)
+        index.update(item, rects[item])
+
+    for item in range(0, 300, 11):
+        index.remove(item)
+
+    remaining = [item for item in range(300) if item % 11]
+    assert len(index) == len(remaining)
+
+    for view in (pygame.Rect(0, 0, 256, 240), pygame.Rect(300, 400, 17, 9),
+                 pygame.Rect(-90, -90, 1200, 1200)):
+        expected = [item for item in remaining
+                    if rects[item].colliderect(view)]
+        assert index.query(view) == expected
+
+
+def test_remove_missing_item():
+    """Test removing an item which isn't in the index."""
+
+    with pytest.raises(KeyError):
+        spatial.SpatialHash().remove('nothing')
+
+
+def test_near_and_nearest_match_brute_force():
+    """Test SpatialHash.near() and SpatialHash.nearest() finding the
+    same items as measuring the distance to every rect.
+
+    """
+
+    random.seed(1)
+    rects = [pygame.Rect(random.randint(-500, 500),
+                         random.randint(-500, 500),
+                         random.randint(1, 20),
+                         random.randint(1, 20))
+             for __ in range(200)]
+    index = spatial.SpatialHash(cell_size=32)
+
+    for item, rect in enumerate(rects):
+        index.insert(item, rect)
+
+    for __ in range(20):
+        point = (random.randint(-600, 600), random.randint(-600, 600))
+        distances = [spatial.distance_to_rect(point, rect)
+                     for rect in rects]
+        by_distance = sorted(range(200), key=lambda item: (distances[item],
+                                                           item))
+
+        assert index.near(point, 75) == [item for item in range(200)
+                                         if distances[item] <= 75]
+        assert index.nearest(point, count=5) == by_distance[:5]
+        assert (index.nearest(point, count=3, exclude=by_distance[:2]) ==
+                by_distance[2:5])
+        assert (index.nearest(point, count=200, max_distance=50) ==
+                [item for item in by_distance if distances[item] <= 50])
+
+
+def test_facing_rect():
+    """Test the area in front of a rect, for each direction."""
+
+    rect = pygame.Rect(10, 10, 4, 6)
+    expected = {
+                constants.Direction.north: (10, 7, 4, 3),
+                constants.Direction.east: (14, 10, 3, 6),
+                constants.Direction.south: (10, 16, 4, 3),
+                constants.Direction.west: (7, 10, 3, 6),
+                constants.Direction.south_east: (14, 16, 3, 3),
+               }
+
+    for direction, area in expected.items():
+        assert spatial.facing_rect(rect, direction, 3) == area
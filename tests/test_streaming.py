@@ -0,0 +1,280 @@
+# This module is part of Hypatia and is released under the
+# MIT license: http://opensource.org/licenses/MIT
+
+"""py.test unit testing for hypatia/streaming.py
+
+Run py.test on this module to assert hypatia.streaming
+is completely functional.
+
+Example:
+  Use from project root like so:
+
+  $ py.test tests
+
+"""
+
+import os
+import threading
+
+import numpy
+import pygame
+import pytest
+
+from hypatia import game
+from hypatia import tiles
+from hypatia import dialog
+from hypatia import render
+from hypatia import physics
+from hypatia import constants
+from hypatia import streaming
+
+try:
+    os.chdir('demo')
+except OSError:
+    pass
+
+
+def debug_scene_source(chunk_size):
+    """The debug scene's layers as a region source."""
+
+    tmx = game.TMX(os.path.join('resources', 'scenes', 'debug.tmx'))
+    source = streaming.TileArrayChunks(tmx.tilemap.tilesheet, tmx.layers,
+                                       chunk_size)
+
+    return tmx.tilemap, source
+
+
+def test_streamed_regions_match_tilemap():
+    """Test the streamed regions, some smaller at the edges, having
+    the same tiles as the whole map.
+
+    """
+
+    tilemap, source = debug_scene_source((8, 8))
+    streamer = streaming.WorldStreamer(source, margin=0)
+    assert streamer.impassable((0, 0))
+    assert not streamer.impassable((40, 0))
+
+    streamer.update(source.rect)
+    streamer.wait()
+    in_view = streamer.update(source.rect)
+    assert len(in_view) == 16
+    assert streamer.loaded[(3, 3)].rect == pygame.Rect(384, 384, 16, 16)
+
+    for y in range(25):
+
+        for x in range(25):
+            assert (streamer.impassable((x, y)) ==
+                    tilemap.impassability[y, x])
+
+    streamer.stop()
+
+
+def test_regions_ahead_are_loaded():
+    """Test the regions the player is heading into being loaded
+    before they're in view.
+
+    """
+
+    __, source = debug_scene_source((4, 4))
+    streamer = streaming.WorldStreamer(source, margin=0, lookahead=1.0)
+    view = pygame.Rect(0, 0, 64, 64)
+    streamer.update(view, velocity=(128, 0))
+    streamer.wait()
+    assert sorted(streamer.loaded) == [(0, 0), (2, 0)]
+
+    streamer.update(view)
+    streamer.wait()
+    assert sorted(streamer.loaded) == [(0, 0), (2, 0)]
+
+    streamer.stop()
+
+
+def test_regions_out_of_range_unload_over_budget():
+    """Test out of range regions being unloaded, least recently used
+    first, only while over budget.
+
+    """
+
+    __, source = debug_scene_source((4, 4))
+    streamer = streaming.WorldStreamer(source, margin=0)
+
+    for x in range(3):
+        streamer.update(pygame.Rect(x * 64, 0, 64, 64))
+        streamer.wait()
+
+    assert sorted(streamer.loaded) == [(0, 0), (1, 0), (2, 0)]
+    region_bytes = streaming.region_bytes(streamer.loaded[(0, 0)])
+    assert streamer.loaded_bytes == region_bytes * 3
+
+    # in range regions stay, even over budget
+    streamer.budget = region_bytes * 2
+    streamer.update(pygame.Rect(2 * 64, 0, 64, 64))
+    assert sorted(streamer.loaded) == [(1, 0), (2, 0)]
+
+    streamer.budget = 0
+    streamer.update(pygame.Rect(2 * 64, 0, 64, 64))
+    assert list(streamer.loaded) == [(2, 0)]
+
+    streamer.stop()
+
+
+def test_materialize_errors_are_raised():
+    """Test an error materializing a region in the worker being
+    raised on the thread using the streamer.
+
+    """
+
+    class BrokenSource(streaming.TileArrayChunks):
+
+        def materialize(self, chunk_coord, stitched=True):
+
+            raise IOError('unreadable region')
+
+    __, source = debug_scene_source((8, 8))
+    source = BrokenSource(source.tilesheet, source.tile_ids, (8, 8))
+    streamer = streaming.WorldStreamer(source)
+    streamer.update(pygame.Rect(0, 0, 16, 16))
+
+    with pytest.raises(IOError):
+        streamer.wait()
+
+    streamer.stop()
+
+
+def test_regions_are_stitched_on_the_main_thread(monkeypatch):
+    """Test the worker leaving the stitching of regions, like all
+    other pygame drawing, to the thread using the streamer, and
+    waiting on a stopped streamer not blocking.
+
+    """
+
+    stitch_threads = set()
+    draw_tiles = tiles.TileMap._draw_tiles
+
+    def record_thread(tilemap, *args, **kwargs):
+        stitch_threads.add(threading.current_thread())
+
+        return draw_tiles(tilemap, *args, **kwargs)
+
+    monkeypatch.setattr(tiles.TileMap, '_draw_tiles', record_thread)
+    tilemap, source = debug_scene_source((8, 8))
+    stitch_threads.clear()
+    streamer = streaming.WorldStreamer(source, margin=0)
+    streamer.update(pygame.Rect(0, 0, 128, 128))
+    streamer.wait()
+    assert stitch_threads == set([threading.current_thread()])
+
+    region = streamer.loaded[(0, 0)].tilemap.layer_images[0]
+    whole = tilemap.layer_images[0].subsurface(region.get_rect())
+    assert (pygame.image.tostring(region, 'RGBA') ==
+            pygame.image.tostring(whole, 'RGBA'))
+
+    streamer.stop()
+    streamer.update(pygame.Rect(128, 128, 128, 128))
+    streamer.wait()
+    assert list(streamer.loaded) == [(0, 0)]
+
+
+def render_scene(scene, viewport_size=(128, 96)):
+    """Draw scene with :meth:`game.Game.render`, without starting
+    the game's loop.
+
+    """
+
+    pygame.font.init()
+    test_game = game.Game.__new__(game.Game)
+    test_game.viewport = render.Viewport(viewport_size)
+    test_game.dialogbox = dialog.DialogBox(viewport_size)
+    test_game.scene = scene
+    test_game.render()
+
+    return test_game.viewport
+
+
+def test_streamed_scene_renders_like_scene():
+    """Test :meth:`game.Game.render` loading the regions of a
+    :class:`game.StreamedScene` around the viewport and drawing
+    them like the whole map, and collisions going through the
+    loaded regions.
+
+    """
+
+    scene = game.Scene.from_tmx_resource('debug')
+    tmx = game.TMX(os.path.join('resources', 'scenes', 'debug.tmx'))
+    source = streaming.TileArrayChunks(tmx.tilemap.tilesheet, tmx.layers,
+                                       (8, 8))
+    streamer = streaming.WorldStreamer(source, margin=0)
+    human_player = game.Scene.create_human_player(tmx.player_start_position,
+                                                  tmx.store)
+    streamed = game.StreamedScene(streamer, tmx.player_start_position,
+                                  human_player, tmx.npcs)
+    assert streamed.pathfinder is None
+
+    # nothing's loaded yet, so the unloaded world is in the way
+    viewport = render_scene(streamed)
+    player_rect = human_player.walkabout.rect
+    assert streamer.loaded == {}
+    assert streamed.collide_check(player_rect.move(1, 0))
+
+    streamer.wait()
+    viewport = render_scene(streamed)
+    expected = render_scene(scene)
+    assert viewport.rect == expected.rect
+    assert set(streamer.loaded) == set(source.chunks_in_rect(viewport.rect))
+    assert (pygame.image.tostring(viewport.surface, 'RGB') ==
+            pygame.image.tostring(expected.surface, 'RGB'))
+
+    for x in range(viewport.rect.left, viewport.rect.right - 8, 4):
+        rect = pygame.Rect((x, player_rect.top), (8, 8))
+        assert streamed.collide_check(rect) == scene.collide_check(rect)
+
+    assert streamed.collide_check(pygame.Rect((-1, 0), (8, 8)))
+
+    # npcs walk until the tiles are in the way, like in the scene,
+    # once the regions they walk through are loaded
+    streamer.update(source.rect)
+    streamer.wait()
+
+    for moving_scene in (scene, streamed):
+        npc = moving_scene.npcs[0]
+        npc.velocity = physics.Velocity(0, -200)
+
+        for __ in range(20):
+            moving_scene.move_npcs(0.1)
+
+    assert (streamed.npcs[0].walkabout.rect.top ==
+            scene.npcs[0].walkabout.rect.top)
+    assert not streamed.tiles_block(streamed.npcs[0].walkabout.rect)
+    streamer.stop()
+
+
+def test_streamed_scene_loads_ahead_of_the_player():
+    """Test the human player's walking velocity being passed to the
+    world, so regions ahead are loaded.
+
+    """
+
+    class World(object):
+        rect = pygame.Rect(0, 0, 640, 640)
+        depth = 1
+        updates = []
+
+        def update(self, rect, velocity=(0, 0)):
+            self.updates.append((rect, velocity))
+
+        def blit_layer(self, viewport, layer):
+            pass
+
+    human_player = game.Scene.create_human_player((320, 320))
+    scene = game.StreamedScene(World(), (320, 320), human_player)
+    render_scene(scene)
+    human_player.walkabout.action = constants.Action.walk
+    human_player.walkabout.direction = constants.Direction.west
+    render_scene(scene)
+    human_player.walkabout.direction = constants.Direction.south
+    render_scene(scene)
+    assert ([velocity for __, velocity in World.updates] ==
+            [(0, 0), (-20, 0), (0, 20)])
+    assert all(rect.collidepoint(human_player.walkabout.rect.center)
+               for rect, __ in World.updates)
@@ -17,14 +17,17 @@ Example:
 """
 
 import os
+import random
 import zipfile
 from io import BytesIO
 
+import numpy
 import pygame
 import pytest
 
 from hypatia import util
 from hypatia import tiles
+from hypatia import pathfinding
 
 try:
     os.chdir('demo')
@@ -147,6 +150,14 @@ def test_tilemap():
     # there are 208 impassable rects in the debug tilemap
     assert len(tilemap.impassable_rects) == 208
 
+    # the impassability grid covers the same tiles, from any layer
+    tile_width, tile_height = tilemap.tilesheet.tile_size
+    impassable_tiles = set((rect.x // tile_width, rect.y // tile_height)
+                           for rect in tilemap.impassable_rects)
+    impassable_x, impassable_y = numpy.nonzero(tilemap.impassability.T)
+    assert set(zip(impassable_x.tolist(),
+                   impassable_y.tolist())) == impassable_tiles
+
     # make sure from string/to string works reproducibly
     assert map_string == tilemap.to_string()
 
@@ -154,3 +165,232 @@ def test_tilemap():
     assert tilemap[(2, 4)] is tilemap.tilesheet[11]
     assert tilemap.get_info((2 * 16, 4 * 16)) is tilemap.tilesheet[11]
     assert tilemap.get_info((2 * 16, 4 * 16)) is tilemap[(2, 4)]
+
+
+def test_regions_follow_edits():
+    """Test TileMap.regions, updated as tiles are set, grouping tiles
+    the same way as labelling the whole map from scratch.
+
+    """
+
+    random.seed(0)
+    width, height = 12, 9
+    tilemap = tiles.TileMap('debug', [[[11] * width
+                                       for __ in range(height)]])
+
+    for __ in range(150):
+        coord = (random.randrange(width), random.randrange(height))
+        tilemap.set_tile(coord, 0, random.choice((11, 99)))
+        from_scratch = pathfinding.label_regions(~tilemap.impassability)
+
+        # the same groups, whatever their numbers
+        pairs = set(zip(tilemap.regions.ravel().tolist(),
+                        from_scratch.ravel().tolist()))
+        assert len(pairs) == len(numpy.unique(tilemap.regions))
+        assert len(pairs) == len(numpy.unique(from_scratch))
+        assert (tilemap.regions[tilemap.impassability] == 0).all()
+
+
+def test_replace_tiles_matches_set_tile():
+    """Test replacing tiles in bulk leaving the tilemap just like
+    setting them one at a time, and region views following it.
+
+    """
+
+    random.seed(1)
+    tile_ids = [[[random.choice((11, 99, 40)) for __ in range(10)]
+                 for __ in range(8)] for __ in range(2)]
+    bulk = tiles.TileMap('debug', tile_ids)
+    one_at_a_time = tiles.TileMap('debug', tile_ids, bulk.tilesheet)
+    view = bulk.tile_ids_in_rect(pygame.Rect(2, 1, 5, 5))
+    assert view.shape == (2, 5, 5)
+    assert not view.flags.writeable
+
+    changed = []
+    bulk.tile_listeners.append(lambda tilemap, coords: changed.append(coords))
+    expected = bulk.count_tiles([99, 40], (2, 1, 5, 5))
+    mask = bulk.tile_mask([99, 40], (2, 1, 5, 5)).any(axis=0)
+    expected_coords = sorted((int(x) + 2, int(y) + 1)
+                             for y, x in zip(*numpy.nonzero(mask)))
+    assert bulk.replace_tiles([99, 40], 11, (2, 1, 5, 5)) == expected
+
+    # one call, each tile once, however many of its layers changed
+    assert len(changed) == 1 and sorted(changed[0]) == expected_coords
+    assert not bulk.tile_mask([99, 40], (2, 1, 5, 5)).any()
+    assert (view == 11).all()
+
+    for z, y, x in zip(*numpy.nonzero(numpy.isin(tile_ids, [99, 40]))):
+
+        if 2 <= x < 7 and 1 <= y < 6:
+            one_at_a_time.set_tile((x, y), z, 11)
+
+    assert (bulk.tile_ids == one_at_a_time.tile_ids).all()
+    assert (bulk.impassability == one_at_a_time.impassability).all()
+    assert (bulk.opacity == one_at_a_time.opacity).all()
+    assert (sorted(rect.topleft for rect in bulk.impassable_rects) ==
+            sorted(rect.topleft for rect in one_at_a_time.impassable_rects))
+
+    for z in range(2):
+        assert (pygame.image.tostring(bulk.layer_images[z], 'RGBA') ==
+                pygame.image.tostring(one_at_a_time.layer_images[z], 'RGBA'))
+        assert (bulk.animated_tile_stack[z] ==
+                one_at_a_time.animated_tile_stack[z])
+
+    pairs = set(zip(bulk.regions.ravel().tolist(),
+                    one_at_a_time.regions.ravel().tolist()))
+    assert len(pairs) == len(numpy.unique(bulk.regions))
+
+    with pytest.raises(tiles.BadTileID):
+        tiles.TileMap('debug', [[[0, 5000]]])
+
+
+def test_binary_tilemap(tmpdir):
+    """Test tilemap.bin reading back the same tiles and planes,
+    compressed, from bytes, and uncompressed, memory-mapped.
+
+    """
+
+    resource = util.Resource('scenes', 'debug')
+    map_string = resource['tilemap.txt'].strip()
+    tilemap = tiles.TileMap.from_string(map_string)
+    compressed = tilemap.to_binary()
+    assert len(compressed) * 4 < len(map_string)
+
+    path = str(tmpdir.join('tilemap.bin'))
+
+    with open(path, 'wb') as binary_file:
+        binary_file.write(tilemap.to_binary(compress=False))
+
+    for source in (compressed, BytesIO(compressed), path):
+        binary = tiles.BinaryTilemap.read(source)
+        assert binary.tilesheet_name == 'debug'
+        assert binary.dimensions_in_tiles == tilemap.dimensions_in_tiles
+        assert (binary.planes['tile_ids'] == tilemap.tile_ids).all()
+        assert (binary.planes['impassability'] ==
+                tilemap.impassability).all()
+        assert (binary.planes['opacity'] == tilemap.opacity).all()
+
+    # read in place
+    mapped = tiles.BinaryTilemap.read(path).planes['tile_ids']
+    assert isinstance(mapped, numpy.memmap)
+    assert not mapped.flags.writeable
+
+    from_binary = tiles.TileMap.from_binary(path)
+    assert from_binary.to_string() == map_string
+    from_binary.set_tile((0, 0), 0, 11)
+
+    # raw bytes, e.g., read from a zip, are never taken for a path,
+    # even where they're a str (Python 2)
+    zip_path = str(tmpdir.join('scene.zip'))
+
+    with zipfile.ZipFile(zip_path, 'w') as scene_zip:
+        scene_zip.writestr('tilemap.bin', tilemap.to_binary(compress=False))
+
+    with zipfile.ZipFile(zip_path) as scene_zip:
+        raw = scene_zip.read('tilemap.bin')
+
+    for source in (raw, bytearray(raw), memoryview(raw)):
+        binary = tiles.BinaryTilemap.read(source)
+        assert (binary.planes['tile_ids'] == tilemap.tile_ids).all()
+
+    with pytest.raises(ValueError):
+        tiles.BinaryTilemap.read(BytesIO(map_string.encode('utf-8')))
+
+    # stored planes are used, not derived again, if they fit
+    tile_ids = numpy.full((1, 2, 3), 11, dtype=numpy.int16)
+    impassability = numpy.zeros((2, 3), dtype=bool)
+    impassability[1, 2] = True
+    planes = {'tile_ids': tile_ids, 'impassability': impassability}
+    stored = tiles.BinaryTilemap('debug', planes).to_bytes()
+    from_binary = tiles.TileMap.from_binary(stored)
+    assert (from_binary.impassability == impassability).all()
+    assert from_binary.impassable_rects == [pygame.Rect(32, 16, 16, 16)]
+    assert not from_binary.reachable((0, 0), (2, 1))
+
+    for bad_plane in (impassability.astype(numpy.uint8),
+                      impassability[:, :2]):
+        planes['impassability'] = bad_plane
+        stored = tiles.BinaryTilemap('debug', planes).to_bytes()
+
+        with pytest.raises(ValueError):
+            tiles.TileMap.from_binary(stored)
+
+
+def test_scene_prefers_binary_tilemap():
+    """Test a scene with a tilemap.bin loading it instead of its
+    tilemap.txt, which is left unread.
+
+    """
+
+    from hypatia import game
+
+    tile_ids = [[[11] * 25 for __ in range(25)]]
+    tile_ids[0][0][0] = 99
+    tilemap_bin = tiles.TileMap('debug', tile_ids).to_binary()
+
+    # tilemap.bin which happens to be valid UTF-8 stays binary
+    assert isinstance(util.Resource.decode_file('tilemap.bin', b'HTMB'),
+                      bytes)
+
+    debug_files = util.Resource.read_files('scenes', 'debug')
+    decoded_files = {file_name: util.Resource.decode_file(file_name, data)
+                     for file_name, data in debug_files.items()}
+    decoded_files['tilemap.bin'] = tilemap_bin
+    decoded_files['tilemap.txt'] = 'not a tilemap'
+    util.Resource.DECODED_CACHE[('scenes', 'binary')] = decoded_files
+
+    try:
+        assert (('tilesheets', 'debug') in
+                game.Scene.manifest_from_resource('binary'))
+        scene = game.Scene.from_resource('binary')
+        assert scene.tilemap.tile_ids.tolist() == tile_ids
+    finally:
+        del util.Resource.DECODED_CACHE[('scenes', 'binary')]
+
+
+def test_tilemap_text_codec(monkeypatch, tmpdir):
+    """Test the streaming tilemap.txt reader and writer against
+    formatting and parsing tile IDs one at a time, in batches which
+    split layers.
+
+    """
+
+    monkeypatch.setattr(tiles, 'TEXT_BATCH_TILES', 50)
+    random.seed(2)
+    tile_ids = numpy.array([[[random.choice([-1, 0, 7, 11, 99, 120, 1234])
+                              for __ in range(9)]
+                             for __ in range(13)]
+                            for __ in range(3)])
+
+    for digits, separator in ((2, ' '), (3, ','), (1, ', ')):
+        expected = 'debug\n' + '\n\n'.join(
+            '\n'.join(separator.join('%0*d' % (digits, tile_id)
+                                     for tile_id in row)
+                      for row in layer)
+            for layer in tile_ids.tolist()
+        ) + '\n'
+        path = str(tmpdir.join('tilemap.txt'))
+
+        with open(path, 'w') as text_file:
+            tiles.write_tilemap_text(text_file, 'debug', tile_ids, digits,
+                                     separator)
+
+        with open(path) as text_file:
+            assert text_file.read() == expected
+
+        for mode in ('r', 'rb'):
+
+            with open(path, mode) as text_file:
+                tilesheet_name, read_ids = tiles.read_tilemap_text(
+                    text_file, separator.strip() or ' '
+                )
+
+            assert tilesheet_name == 'debug'
+            assert read_ids.dtype == numpy.int16
+            assert (read_ids == tile_ids).all()
+
+    with pytest.raises(ValueError):
+        tiles.read_tilemap_text(['debug', '1 2 3', '4 5'])
+
+    with pytest.raises(ValueError):
+        tiles.read_tilemap_text(['debug', '1 2', '4 x'])
@@ -9,6 +9,7 @@ is completely functional.
 """
 
 import os
+from io import BytesIO
 
 try:
     import ConfigParser as configparser
@@ -18,6 +19,7 @@ except ImportError:
 import pygame
 import pytest
 import pyganim
+from PIL import Image
 
 from hypatia import util
 
@@ -37,3 +39,37 @@ def test_resource():
     assert 'walk_north.gif' in resource
     assert isinstance(resource['walk_north.gif'], pyganim.PygAnimation)
     assert isinstance(resource['walk_north.ini'], configparser.ConfigParser)
+
+
+def test_decode_gif():
+    """Test util.decode_gif() keeping a frame per frame, sharing
+    repeated frames, and defaulting missing frame durations.
+
+    """
+
+    red, green, blue, clear = [Image.new('RGBA', (4, 4), color)
+                               for color in ((255, 0, 0, 255),
+                                             (0, 255, 0, 255),
+                                             (0, 0, 255, 255),
+                                             (0, 0, 0, 0))]
+    gif_file = BytesIO()
+
+    # the clear frame, drawn over the red one, repeats it; Pillow
+    # would merge a second red frame into the first while saving
+    red.save(gif_file, 'GIF', save_all=True,
+             append_images=[clear, green, blue],
+             duration=[50, 70, 0, 20], disposal=1)
+    gif_file.seek(0)
+    frames = util.decode_gif(gif_file)
+
+    # the two red frames share a buffer, and a surface
+    assert [duration for __, __, duration in frames] == [0.05, 0.07, 0.1,
+                                                         0.02]
+    assert all(size == (4, 4) for __, size, __ in frames)
+    assert frames[0][0] == red.tobytes()
+    assert frames[1][0] is frames[0][0]
+    assert frames[2][0] == green.tobytes()
+
+    gif = util.gif_from_frames(frames)
+    assert gif.numFrames == 4
+    assert gif.getFrame(1) is gif.getFrame(0)